@@ -1,10 +1,13 @@
 import openai
+import queue
+import threading
 import time
 import re
 import json
 import os
+import hashlib
 from datetime import datetime
-from selenium import webdriver
+from uuid import uuid4
 from selenium.webdriver.common.by import By
 from selenium.webdriver.common.keys import Keys
 from selenium.common.exceptions import (
@@ -12,10 +15,387 @@ from selenium.common.exceptions import (
     WebDriverException, TimeoutException
 )
 from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
+from browser_profile import RunMetrics, start_chrome
+from step_parser import IncrementalStepParser, parse_steps
+
+def new_chrome_driver(profile="default"):
+    return start_chrome(profile)
+
+# In-page version of AIUIExecutor._find_elem_fallback_reference: scores every
+# candidate in one execute_script and returns the winner with its breakdown.
+# Candidates are visited in the same order and ties go to the first one, so it
+# picks the element the reference implementation would.
+FALLBACK_RESOLVER_JS = """
+const locator = (arguments[0] || "").trim().toLowerCase();
+const inputMode = arguments[1];
+const tags = inputMode ? ["input", "textarea", "select"] : ["input", "button", "a", "textarea", "select", "*"];
+const fieldTags = ["input", "textarea", "select"];
+const labelText = {};
+for (const label of document.getElementsByTagName("label")) {
+    const forId = label.getAttribute("for");
+    if (forId && !(forId in labelText)) labelText[forId] = label.innerText || "";
+}
+const isDisplayed = (el) => {
+    if (typeof el.checkVisibility === "function") {
+        return el.checkVisibility({opacityProperty: true, visibilityProperty: true}) && el.getClientRects().length > 0;
+    }
+    const style = window.getComputedStyle(el);
+    return el.getClientRects().length > 0 && style.visibility !== "hidden" && style.visibility !== "collapse"
+        && style.opacity !== "0";
+};
+const seen = new Set();
+let best = null;
+let scanned = 0;
+for (const tag of tags) {
+    for (const el of document.getElementsByTagName(tag)) {
+        if (seen.has(el)) continue;
+        seen.add(el);
+        scanned++;
+        if (!isDisplayed(el) || el.matches(":disabled")) continue;
+        const id = el.getAttribute("id") || "";
+        const fields = {
+            text: (el.innerText || "").trim().toLowerCase(),
+            placeholder: (el.getAttribute("placeholder") || "").toLowerCase(),
+            aria_label: (el.getAttribute("aria-label") || "").toLowerCase(),
+            value: (typeof el.value === "string" ? el.value : (el.getAttribute("value") || "")).toLowerCase(),
+            label_for: id ? (labelText[id] || "").trim().toLowerCase() : "",
+        };
+        const names = Object.keys(fields);
+        let score = 0;
+        let matched = names.filter((name) => fields[name] === locator);
+        if (matched.length) {
+            score = 3;
+        } else if ((matched = names.filter((name) => fields[name].includes(locator))).length) {
+            score = 2;
+        } else if (!inputMode || fieldTags.includes(el.tagName.toLowerCase())) {
+            score = 1;
+        }
+        if (score > 0 && (best === null || score > best.score)) {
+            best = {element: el, score: score, matched: matched, tag: el.tagName.toLowerCase(), fields: fields};
+            if (score === 3) break;
+        }
+    }
+    if (best && best.score === 3) break;
+}
+if (best) best.scanned = scanned;
+return best;
+"""
+
+# Marks the top-level document; any frame added, removed or re-pointed sets the
+# dirty flag, and a navigation replaces the window object and loses the token
+FRAME_INDEX_WATCH_JS = """
+const token = arguments[0];
+if (window.__aiFrameIndexObserver) window.__aiFrameIndexObserver.disconnect();
+window.__aiFrameIndexToken = token;
+window.__aiFrameIndexDirty = false;
+const isFrame = (node) => node.nodeType === 1
+    && (node.tagName === "IFRAME" || node.tagName === "FRAME" || node.querySelector("iframe, frame") !== null);
+const observer = new MutationObserver((records) => {
+    for (const record of records) {
+        const changed = record.type === "attributes"
+            ? isFrame(record.target)
+            : [...record.addedNodes, ...record.removedNodes].some(isFrame);
+        if (changed) {
+            window.__aiFrameIndexDirty = true;
+            observer.disconnect();
+            return;
+        }
+    }
+});
+observer.observe(document, {childList: true, subtree: true, attributes: true, attributeFilter: ["src", "name", "id"]});
+window.__aiFrameIndexObserver = observer;
+"""
+
+FRAME_INDEX_CHECK_JS = "return window.__aiFrameIndexToken === arguments[0] && !window.__aiFrameIndexDirty;"
+
+FRAME_INDEX_OF_JS = """
+for (let i = 0; i < window.frames.length; i++) {
+    if (window.frames[i] === arguments[0].contentWindow) return i;
+}
+return -1;
+"""
+
+class FrameIndex:
+    """
+    The frames of the current page, and the frame each locator and framePath last
+    resolved to, as paths of window.frames indexes. Built on first use after a
+    navigation and dropped when the page is replaced or its frames change, so a
+    later step switches straight to the right frame instead of searching.
+    Lookups must be made from the top-level document.
+    """
+    def __init__(self, driver, max_depth=2):
+        self.driver = driver
+        self.max_depth = max_depth
+        self.token = None
+        self.paths = None
+        self.locations = {}
+        self.frame_paths = {}
+        self.stats = {"builds": 0, "hits": 0, "misses": 0, "invalidations": 0}
+
+    def invalidate(self):
+        if self.token is not None:
+            self.stats["invalidations"] += 1
+        self.token = None
+        self.paths = None
+        self.locations.clear()
+        self.frame_paths.clear()
+
+    def switch_to(self, path):
+        self.driver.switch_to.default_content()
+        for index in path:
+            self.driver.switch_to.frame(index)
+
+    def all_paths(self):
+        """Every frame down to max_depth, parents before their children."""
+        self._ensure_current()
+        if self.paths is None:
+            self.stats["builds"] += 1
+            self.paths = []
+            self._walk((), 0)
+            self.driver.switch_to.default_content()
+        return self.paths
+
+    def location(self, key):
+        self._ensure_current()
+        path = self.locations.get(key)
+        self.stats["hits" if path is not None else "misses"] += 1
+        return path
+
+    def remember(self, key, path):
+        self.locations[key] = path
+
+    def forget(self, key):
+        self.locations.pop(key, None)
+
+    def frame_path(self, frame_path):
+        self._ensure_current()
+        path = self.frame_paths.get(tuple(frame_path))
+        self.stats["hits" if path is not None else "misses"] += 1
+        return path
+
+    def remember_frame_path(self, frame_path, path):
+        self.frame_paths[tuple(frame_path)] = path
+
+    def forget_frame_path(self, frame_path):
+        self.frame_paths.pop(tuple(frame_path), None)
+
+    def _ensure_current(self):
+        if self.token is not None and self.driver.execute_script(FRAME_INDEX_CHECK_JS, self.token):
+            return
+        self.invalidate()
+        self.token = uuid4().hex
+        self.driver.execute_script(FRAME_INDEX_WATCH_JS, self.token)
+
+    def _walk(self, path, depth):
+        # The driver is in the frame at `path`
+        count = self.driver.execute_script("return window.frames.length;")
+        for index in range(count):
+            child = path + (index,)
+            self.paths.append(child)
+            if depth + 1 < self.max_depth:
+                try:
+                    self.switch_to(child)
+                    self._walk(child, depth + 1)
+                except WebDriverException:
+                    continue
+
+# Counts in-flight fetch/XHR requests and stamps the last DOM change. Registered
+# for every new document (and run again on demand), so it sees a page's own
+# requests from its first script on; it installs itself once per document.
+PACING_JS = """
+(function () {
+    if (window.__aiPacing) return;
+    const state = {inflight: 0, lastChange: performance.now()};
+    window.__aiPacing = state;
+    const touch = () => { state.lastChange = performance.now(); };
+    const started = () => { state.inflight++; touch(); };
+    const finished = () => { state.inflight = Math.max(0, state.inflight - 1); touch(); };
+    if (window.fetch) {
+        const fetch = window.fetch;
+        window.fetch = function () {
+            started();
+            let result;
+            try {
+                result = fetch.apply(this, arguments);
+            } catch (e) {
+                finished();
+                throw e;
+            }
+            return result.finally(finished);
+        };
+    }
+    const send = XMLHttpRequest.prototype.send;
+    XMLHttpRequest.prototype.send = function () {
+        started();
+        this.addEventListener("loadend", finished, {once: true});
+        try {
+            return send.apply(this, arguments);
+        } catch (e) {
+            finished();
+            throw e;
+        }
+    };
+    new MutationObserver(touch).observe(document, {childList: true, subtree: true, attributes: true, characterData: true});
+})();
+"""
+
+PACING_STATE_JS = PACING_JS + """
+const state = window.__aiPacing;
+return {ready: document.readyState, inflight: state.inflight, idle: performance.now() - state.lastChange};
+"""
+
+class StepPacer:
+    """
+    Paces replay steps on what the page is doing instead of fixed sleeps. The page
+    is quiet once it has loaded, has no fetch/XHR in flight and has not changed
+    for `quiet_ms`. Waits never run past the step's deadline, and a lookup gives
+    up early once the page has been quiet for `idle_grace_ms` without the element
+    showing up.
+    """
+    def __init__(self, driver, quiet_ms=300, settle_timeout=3, idle_grace_ms=1000, poll_interval=0.1):
+        self.driver = driver
+        self.quiet_ms = quiet_ms
+        self.settle_timeout = settle_timeout
+        self.idle_grace_ms = idle_grace_ms
+        self.poll_interval = poll_interval
+        self.stats = {"settle_ms": 0, "settle_timeouts": 0, "gave_up_idle": 0, "gave_up_deadline": 0}
+
+    def install(self):
+        # The registration belongs to the current window (target), and every run
+        # gets a new one: a fresh driver, or a pool checkout's new browser context
+        try:
+            self.driver.execute_cdp_cmd("Page.addScriptToEvaluateOnNewDocument", {"source": PACING_JS})
+        except Exception as e:
+            print(f"Pacing script registration failed, installing per document: {e}")
+
+    def state(self):
+        try:
+            return self.driver.execute_script(PACING_STATE_JS)
+        except WebDriverException:
+            # Mid-navigation, or the current frame went away
+            return None
+
+    def is_quiet(self, state, quiet_ms):
+        return (
+            state is not None and state["ready"] == "complete"
+            and state["inflight"] == 0 and state["idle"] >= quiet_ms
+        )
+
+    def settle(self, deadline):
+        """Waits for the page to be quiet, for at most settle_timeout and never past `deadline`."""
+        started = time.monotonic()
+        limit = min(deadline, started + self.settle_timeout)
+        try:
+            while not self.is_quiet(self.state(), self.quiet_ms):
+                if time.monotonic() >= limit:
+                    self.stats["settle_timeouts"] += 1
+                    return False
+                time.sleep(self.poll_interval)
+            return True
+        finally:
+            self.stats["settle_ms"] += round((time.monotonic() - started) * 1000)
+
+    def poll(self, probe, deadline):
+        """probe()'s first truthy result, or None at the deadline or once the page has gone idle without one."""
+        while True:
+            result = probe()
+            if result:
+                return result
+            if time.monotonic() >= deadline:
+                self.stats["gave_up_deadline"] += 1
+                return None
+            if self.is_quiet(self.state(), self.idle_grace_ms):
+                self.stats["gave_up_idle"] += 1
+                return None
+            time.sleep(self.poll_interval)
+
+PLAN_SYSTEM_PROMPT = (
+    "You are an expert UI automation agent. Given a user command describing UI operations, "
+    "generate a JSON array of steps. Each step should have: "
+    "eventType (click/input/navigate/press_enter/wait/wait_js), locatorType (url/xpath/css/id/name/label/button_text), "
+    "locator (the selector or URL or label/button text), value (for input or wait), and optionally framePath (an array of frame-identifiers, xpath, css or name, "
+    "if the element is inside one or more frames), and window (window handle or title if action is on a different window). "
+    "For input operations, analyze the UI: find the LABEL or visible text (even if nested inside divs, tables, etc.), and produce an xpath that finds the input associated with that label, NOT just by id/name."
+    "For click operations, use any clickable element (button, input[type=button|submit|image], link, role=button, or onclick handler)."
+    "For wait_js, the value should be a JS expression to wait for (returns true when ready)."
+    "If the element is inside a frame/iframe, provide the framePath as an array of locators needed to reach it."
+    "Only output a JSON array. Do NOT explain or provide any text outside the JSON array."
+    "Example:\n"
+    "[{\"eventType\": \"navigate\", \"locatorType\": \"url\", \"locator\": \"https://example.com\"},"
+    "{\"eventType\": \"input\", \"locatorType\": \"label\", \"locator\": \"Username\", \"value\": \"myuser\"},"
+    "{\"eventType\": \"click\", \"locatorType\": \"button_text\", \"locator\": \"Sign In\"},"
+    "{\"eventType\": \"wait_js\", \"value\": \"return typeof window.myAppReady !== 'undefined' && window.myAppReady===true;\"}]"
+)
+# Cached plans are keyed on this, so editing the prompt retires them
+PLAN_PROMPT_VERSION = hashlib.sha256(PLAN_SYSTEM_PROMPT.encode("utf-8")).hexdigest()[:16]
+
+class PlanStream:
+    """
+    Steps of a plan as they arrive. `steps` (an iterator) is consumed on a
+    background thread from construction on; iterating the PlanStream blocks only
+    until the next step is available. `steps_received` holds every step so far,
+    `error` what ended the plan early, if anything.
+    """
+    _END = object()
+
+    def __init__(self, steps):
+        self.queue = queue.Queue()
+        self.steps_received = []
+        self.error = None
+        self.started = time.perf_counter()
+        self.first_step_s = None
+        self.complete_s = None
+        self.thread = threading.Thread(target=self._consume, args=(steps,), daemon=True)
+        self.thread.start()
+
+    def __iter__(self):
+        while True:
+            item = self.queue.get()
+            if item is self._END:
+                # Leave the marker for any later iteration
+                self.queue.put(item)
+                return
+            yield item
+
+    def wait(self, timeout=None):
+        self.thread.join(timeout)
+        return self.steps_received
+
+    def to_dict(self):
+        return {
+            "steps": len(self.steps_received),
+            "first_step_s": self.first_step_s,
+            "complete_s": self.complete_s,
+            "error": None if self.error is None else str(self.error),
+        }
+
+    def _consume(self, steps):
+        try:
+            for step in steps:
+                if self.first_step_s is None:
+                    self.first_step_s = round(time.perf_counter() - self.started, 3)
+                self.steps_received.append(step)
+                self.queue.put(step)
+        except Exception as e:
+            print(f"AI error: {e}")
+            self.error = e
+        finally:
+            self.complete_s = round(time.perf_counter() - self.started, 3)
+            self.queue.put(self._END)
 
 class AIUIExecutor:
-    def __init__(self, model, api_key, api_base, screenshot_dir='screenshots', report_path='extent_report.html'):
+    def __init__(self, model, api_key, api_base, screenshot_dir='screenshots', report_path='extent_report.html', driver_pool=None,
+                 browser_profile="default", step_timeout=15, plan_cache=None, pinned_only=False):
+        self.driver_pool = driver_pool
+        # A PlanCache; with pinned_only, prompts without an approved plan are not sent to the model
+        self.plan_cache = plan_cache
+        self.pinned_only = pinned_only
+        self.last_plan_source = None
+        # Everything one step waits for (page, frames, element, settling) shares this budget
+        self.step_timeout = step_timeout
+        # Used when there is no pool; a pool starts its drivers with its own factory
+        self.browser_profile = browser_profile
+        self.last_run_metrics = None
         self.client = openai.OpenAI(
             api_key=api_key,
             base_url=api_base
@@ -28,52 +408,22 @@ class AIUIExecutor:
             os.makedirs(screenshot_dir)
 
     def ai_parse_steps(self, prompt):
-        system_prompt = (
-            "You are an expert UI automation agent. Given a user command describing UI operations, "
-            "generate a JSON array of steps. Each step should have: "
-            "eventType (click/input/navigate/press_enter/wait/wait_js), locatorType (url/xpath/css/id/name/label/button_text), "
-            "locator (the selector or URL or label/button text), value (for input or wait), and optionally framePath (an array of frame-identifiers, xpath, css or name, "
-            "if the element is inside one or more frames), and window (window handle or title if action is on a different window). "
-            "For input operations, analyze the UI: find the LABEL or visible text (even if nested inside divs, tables, etc.), and produce an xpath that finds the input associated with that label, NOT just by id/name."
-            "For click operations, use any clickable element (button, input[type=button|submit|image], link, role=button, or onclick handler)."
-            "For wait_js, the value should be a JS expression to wait for (returns true when ready)."
-            "If the element is inside a frame/iframe, provide the framePath as an array of locators needed to reach it."
-            "Only output a JSON array. Do NOT explain or provide any text outside the JSON array."
-            "Example:\n"
-            "[{\"eventType\": \"navigate\", \"locatorType\": \"url\", \"locator\": \"https://example.com\"},"
-            "{\"eventType\": \"input\", \"locatorType\": \"label\", \"locator\": \"Username\", \"value\": \"myuser\"},"
-            "{\"eventType\": \"click\", \"locatorType\": \"button_text\", \"locator\": \"Sign In\"},"
-            "{\"eventType\": \"wait_js\", \"value\": \"return typeof window.myAppReady !== 'undefined' && window.myAppReady===true;\"}]"
-        )
-        messages = [
-            {"role": "system", "content": system_prompt},
-            {"role": "user", "content": prompt}
-        ]
+        cached = self._cached_plan(prompt)
+        if cached is not None:
+            return cached
+        self.last_plan_source = "model"
         raw = None
         try:
             response = self.client.chat.completions.create(
                 model=self.model,
-                messages=messages,
+                messages=self._plan_messages(prompt),
                 max_tokens=1200,
                 temperature=0.2
             )
             raw = response.choices[0].message.content
-
-            # Try to extract the first valid JSON array using regex
-            match = re.search(r'(\[[\s\S]*?\])', raw)
-            if match:
-                json_str = match.group(1)
-            else:
-                # Fallback: try to find the first "[" and last "]" if not a pure array
-                start = raw.find('[')
-                end = raw.rfind(']')
-                if start != -1 and end != -1:
-                    json_str = raw[start:end+1]
-                else:
-                    raise ValueError("No JSON array found in AI response.")
-
-            # Ensure special characters are escaped and JSON is valid
-            steps = json.loads(json_str)
+            steps = parse_steps(raw)
+            if steps and self.plan_cache is not None:
+                self.plan_cache.put(prompt, self.model, PLAN_PROMPT_VERSION, steps)
             return steps
         except Exception as e:
             print(f"AI error: {e}")
@@ -83,10 +433,81 @@ class AIUIExecutor:
                 print("No AI raw response available (request failed before response was received).")
             return []
 
+    def iter_plan_steps(self, prompt):
+        """Yields the plan's steps as the model streams them, or all at once from the plan cache."""
+        cached = self._cached_plan(prompt)
+        if cached is not None:
+            yield from cached
+            return
+        self.last_plan_source = "model"
+        parser = IncrementalStepParser()
+        steps = []
+        stream = self.client.chat.completions.create(
+            model=self.model,
+            messages=self._plan_messages(prompt),
+            max_tokens=1200,
+            temperature=0.2,
+            stream=True
+        )
+        try:
+            for chunk in stream:
+                text = chunk.choices[0].delta.content if chunk.choices else None
+                if not text:
+                    continue
+                for step in parser.feed(text):
+                    steps.append(step)
+                    yield step
+                if parser.done:
+                    break
+        finally:
+            close = getattr(stream, "close", None)
+            if close:
+                close()
+        if not parser.started:
+            raise ValueError("No JSON array found in AI response.")
+        if not parser.done:
+            raise ValueError("AI response ended inside the JSON array.")
+        if steps and self.plan_cache is not None:
+            self.plan_cache.put(prompt, self.model, PLAN_PROMPT_VERSION, steps)
+
+    def stream_plan(self, prompt):
+        """
+        Starts planning in the background and returns the PlanStream; pass it to
+        run_steps so the browser starts while the model is still answering.
+        """
+        return PlanStream(self.iter_plan_steps(prompt))
+
+    def _cached_plan(self, prompt):
+        # The cached plan; [] in pinned-only mode when there is none; None to ask the model
+        if self.plan_cache is None:
+            return None
+        steps = self.plan_cache.get(prompt, self.model, PLAN_PROMPT_VERSION, pinned_only=self.pinned_only)
+        if steps is not None:
+            self.last_plan_source = "cache"
+            return steps
+        if self.pinned_only:
+            self.last_plan_source = None
+            print("No pinned plan for this prompt; not asking the model in pinned-only mode.")
+            return []
+        return None
+
+    def _plan_messages(self, prompt):
+        return [
+            {"role": "system", "content": PLAN_SYSTEM_PROMPT},
+            {"role": "user", "content": prompt}
+        ]
+
+    def pin_plan(self, prompt, steps):
+        """Pins `steps` as the approved plan for `prompt` on this model."""
+        return self.plan_cache is not None and self.plan_cache.pin(prompt, self.model, PLAN_PROMPT_VERSION, steps)
+
     def run_steps(self, steps, log_callback=None):
         driver = None
         logs = []
         self.extent_logs = []
+        self.last_run_metrics = None
+        run_started = time.perf_counter()
+        first_step_at = None
 
         def log(msg, status="INFO", screenshot=None):
             logs.append(msg)
@@ -123,33 +544,43 @@ class AIUIExecutor:
                 log(f"Highlight/screenshot error: {e}", "INFO")
                 return None
 
-        def wait_for_js_ready(timeout=20, custom_ready_js=None):
+        def wait_for_js_ready(deadline, custom_ready_js):
             try:
-                WebDriverWait(driver, timeout).until(
-                    lambda d: d.execute_script("return document.readyState;") == "complete"
+                WebDriverWait(driver, max(0, deadline - time.monotonic())).until(
+                    lambda d: d.execute_script(custom_ready_js)
                 )
-                if custom_ready_js:
-                    WebDriverWait(driver, timeout).until(
-                        lambda d: d.execute_script(custom_ready_js)
-                    )
             except TimeoutException:
                 log(f"Timeout waiting for JS ready (custom: {custom_ready_js})", "FAIL")
 
-        def switch_to_frame_path(frame_path):
+        def switch_to_frame_path(frame_path, report=True):
             driver.switch_to.default_content()
             if not frame_path:
                 return True
+            cached = frame_index.frame_path(frame_path)
+            if cached is not None:
+                try:
+                    frame_index.switch_to(cached)
+                    return True
+                except WebDriverException:
+                    frame_index.forget_frame_path(frame_path)
+                    driver.switch_to.default_content()
+            path = []
             for frame_locator in frame_path:
                 frame_elem = self._find_elem(driver, 'xpath', frame_locator, log)
                 if frame_elem:
                     try:
+                        path.append(driver.execute_script(FRAME_INDEX_OF_JS, frame_elem))
                         driver.switch_to.frame(frame_elem)
                     except NoSuchFrameException:
-                        log(f"Frame not found: {frame_locator}", "FAIL")
+                        if report:
+                            log(f"Frame not found: {frame_locator}", "FAIL")
                         return False
                 else:
-                    log(f"Frame element not found: {frame_locator}", "FAIL")
+                    if report:
+                        log(f"Frame element not found: {frame_locator}", "FAIL")
                     return False
+            if -1 not in path:
+                frame_index.remember_frame_path(frame_path, tuple(path))
             return True
 
         def auto_switch_to_frames(locator_type, locator):
@@ -160,50 +591,59 @@ class AIUIExecutor:
                     return elem
             except Exception:
                 pass
-            frames = driver.find_elements(By.TAG_NAME, "iframe") + driver.find_elements(By.TAG_NAME, "frame")
-            for idx, frame in enumerate(frames):
+            key = (locator_type, locator)
+            cached = frame_index.location(key)
+            if cached is not None:
                 try:
-                    driver.switch_to.default_content()
-                    driver.switch_to.frame(frame)
+                    frame_index.switch_to(cached)
                     elem = self._find_elem(driver, locator_type, locator, log)
                     if elem:
-                        log(f"Auto switched to frame index {idx}", "INFO")
+                        log(f"Switched to indexed frame {'->'.join(map(str, cached))}", "INFO")
                         return elem
-                    subframes = driver.find_elements(By.TAG_NAME, "iframe") + driver.find_elements(By.TAG_NAME, "frame")
-                    for subidx, subframe in enumerate(subframes):
-                        try:
-                            driver.switch_to.frame(subframe)
-                            elem = self._find_elem(driver, locator_type, locator, log)
-                            if elem:
-                                log(f"Auto switched to nested frame index {idx}->{subidx}", "INFO")
-                                return elem
-                        except Exception:
-                            continue
-                except Exception:
+                except WebDriverException:
+                    pass
+                frame_index.forget(key)
+                driver.switch_to.default_content()
+            for path in frame_index.all_paths():
+                try:
+                    frame_index.switch_to(path)
+                    elem = self._find_elem(driver, locator_type, locator, log)
+                    if elem:
+                        frame_index.remember(key, path)
+                        log(f"Auto switched to frame {'->'.join(map(str, path))}", "INFO")
+                        return elem
+                except WebDriverException:
                     continue
             driver.switch_to.default_content()
             return None
 
-        def wait_for_element(locator_type, locator, timeout=15):
-            try:
-                by_map = {
-                    "xpath": By.XPATH,
-                    "css": By.CSS_SELECTOR,
-                    "id": By.ID,
-                    "name": By.NAME
-                }
-                if locator_type in by_map:
-                    return WebDriverWait(driver, timeout).until(
-                        EC.visibility_of_element_located((by_map[locator_type], locator))
-                    )
-            except TimeoutException:
-                log(f"Timeout waiting for element: {locator}", "FAIL")
-                return None
+        def wait_for_element(locator_type, locator, frame_path, deadline):
+            # Lookups are instant (no implicit wait); between them the pacer waits for the page to change
+            seen = []
+
+            def probe():
+                if frame_path:
+                    elem = self._find_elem(driver, locator_type, locator, log)
+                else:
+                    elem = auto_switch_to_frames(locator_type, locator)
+                seen[:] = [elem] if elem is not None else []
+                try:
+                    return elem if elem is not None and elem.is_displayed() else None
+                except WebDriverException:
+                    return None
+
+            elem = pacer.poll(probe, deadline)
+            if elem is None and not seen:
+                log(f"Element not found before the page went idle or the step deadline: {locator}", "INFO")
+            # An element that never became visible is still better than the fallback scan
+            return elem or (seen[0] if seen else None)
 
         def switch_to_window(window_title_or_handle):
             try:
                 if not window_title_or_handle:
                     return True
+                # The frame index describes one window's page
+                frame_index.invalidate()
                 if window_title_or_handle in driver.window_handles:
                     driver.switch_to.window(window_title_or_handle)
                     return True
@@ -218,13 +658,18 @@ class AIUIExecutor:
                 return False
 
         try:
-            options = webdriver.ChromeOptions()
-            options.add_argument("--disable-infobars")
-            options.add_argument("--disable-extensions")
-            options.add_argument("--start-maximized")
-            driver = webdriver.Chrome(options=options)
-            driver.implicitly_wait(7)
+            driver = self.driver_pool.checkout() if self.driver_pool else new_chrome_driver(self.browser_profile)
+            metrics = RunMetrics(driver, self.browser_profile if isinstance(self.browser_profile, str) else "custom")
+            frame_index = FrameIndex(driver)
+            pacer = StepPacer(driver)
+            pacer.install()
+            # All waiting is done by the pacer against each step's deadline
+            driver.implicitly_wait(0)
+            # With a PlanStream this blocks until the model has produced each step
             for idx, step in enumerate(steps):
+                if first_step_at is None:
+                    first_step_at = time.perf_counter()
+                deadline = time.monotonic() + self.step_timeout
                 event = step.get("eventType")
                 locator_type = step.get("locatorType")
                 locator = step.get("locator")
@@ -241,16 +686,19 @@ class AIUIExecutor:
 
                     if event == "navigate" and locator_type == "url":
                         driver.get(locator)
-                        wait_for_js_ready()
+                        frame_index.invalidate()
+                        if not pacer.settle(deadline):
+                            log(f"Page still busy after load: {locator}", "INFO")
                         log(f"Navigated to {locator}", "PASS", highlight_and_screenshot(driver.find_element(By.TAG_NAME, "body"), "navigate"))
                         continue
 
                     if event == "wait_js":
-                        wait_for_js_ready(custom_ready_js=value)
+                        wait_for_js_ready(deadline, value)
                         log(f"Waited for JS: {value}", "PASS")
                         continue
 
-                    if frame_path and not switch_to_frame_path(frame_path):
+                    if frame_path and not pacer.poll(lambda: switch_to_frame_path(frame_path, report=False), deadline):
+                        switch_to_frame_path(frame_path)
                         log(f"Failed to switch to frame path: {frame_path}", "FAIL", None)
                         continue
                     elif not frame_path:
@@ -258,9 +706,7 @@ class AIUIExecutor:
 
                     elem = None
                     if event in ["input", "click", "press_enter"]:
-                        elem = wait_for_element(locator_type, locator)
-                        if not elem:
-                            elem = auto_switch_to_frames(locator_type, locator)
+                        elem = wait_for_element(locator_type, locator, frame_path, deadline)
 
                     if event == "input":
                         if not elem:
@@ -307,16 +753,31 @@ class AIUIExecutor:
                         log(f"Waited for {duration} seconds", "PASS")
                     else:
                         log(f"Unknown event: {event}", "INFO")
-                    time.sleep(1)
+                    if event in ["input", "click", "press_enter"]:
+                        pacer.settle(deadline)
                 except Exception as e:
                     log(f"Exception during step: {e}", "FAIL", None)
+                finally:
+                    metrics.sample()
+            self.last_run_metrics = {
+                **metrics.finish(),
+                "time_to_first_step_s": None if first_step_at is None else round(first_step_at - run_started, 3),
+                "frame_index": dict(frame_index.stats),
+                "pacing": dict(pacer.stats),
+            }
+            if isinstance(steps, PlanStream):
+                self.last_run_metrics["plan"] = steps.to_dict()
+            log("Run metrics: " + ", ".join(f"{k}={v}" for k, v in self.last_run_metrics.items()), "INFO")
             self._generate_extent_report()
             return logs
         except Exception as e:
             log(f"Exception occurred: {e}", "FAIL")
         finally:
             if driver:
-                driver.quit()
+                if self.driver_pool:
+                    self.driver_pool.checkin(driver)
+                else:
+                    driver.quit()
 
     def _find_elem(self, driver, locator_type, locator, log=None):
         try:
@@ -373,6 +834,25 @@ class AIUIExecutor:
             return None
 
     def _find_elem_fallback(self, driver, locator_type, locator, log=None, input_mode=False):
+        try:
+            best = driver.execute_script(FALLBACK_RESOLVER_JS, locator, input_mode)
+        except WebDriverException as e:
+            if log:
+                log(f"In-page fallback resolver failed, scanning over WebDriver: {e}", "INFO")
+            return self._find_elem_fallback_reference(driver, locator_type, locator, log, input_mode)
+        if not best:
+            return None
+        if log:
+            matched = ", ".join(best["matched"]) or "none"
+            log(f"Fallback picked <{best['tag']}> score {best['score']} (matched: {matched}) "
+                f"out of {best['scanned']} elements", "INFO")
+        return best["element"]
+
+    def _find_elem_fallback_reference(self, driver, locator_type, locator, log=None, input_mode=False):
+        """
+        Scores candidates over WebDriver, several round-trips per element. Kept as the
+        reference for FALLBACK_RESOLVER_JS, which must pick the same element.
+        """
         try:
             locator_lc = (locator or "").strip().lower()
             candidates = []
@@ -431,6 +911,10 @@ class AIUIExecutor:
             '.PASS{color:green;} .FAIL{color:red;} .INFO{color:blue;}',
             '</style></head><body>',
             f'<h2>Extent Report - {datetime.now().strftime("%Y-%m-%d %H:%M:%S")}</h2>',
+        ]
+        if self.last_run_metrics:
+            html.append('<p>' + ' | '.join(f'{k}: {v}' for k, v in self.last_run_metrics.items()) + '</p>')
+        html += [
             '<table><tr><th>Time</th><th>Status</th><th>Message</th><th>Screenshot</th></tr>'
         ]
         for entry in self.extent_logs:
@@ -1,7 +1,11 @@
 import streamlit as st
+import atexit
 import json
 import os
-from ai_executor import AIUIExecutor
+import threading
+from ai_executor import AIUIExecutor, new_chrome_driver
+from browser_profile import BROWSER_PROFILES, BrowserPool, prepare_window
+from plan_cache import PlanCache
 from datetime import datetime
 
 st.set_page_config(page_title="AI UI Real-Time Operation Creator", layout="wide")
@@ -25,6 +29,22 @@ with st.sidebar:
     api_base = st.text_input("API Base URL", ai_config.get("api_base", "https://your-bedrock-endpoint"))
     screenshot_dir = st.text_input("Screenshot Directory", "screenshots")
     report_path = st.text_input("Extent Report Path", "extent_report.html")
+    profile_names = list(BROWSER_PROFILES)
+    saved_profile = ai_config.get("browser_profile", "default")
+    browser_profile = st.selectbox(
+        "Browser Profile", profile_names,
+        # A saved profile that no longer exists falls back to the first one
+        index=profile_names.index(saved_profile) if saved_profile in profile_names else 0,
+        help="ci: headless, small window, no images/fonts, third-party trackers blocked."
+    )
+    pinned_only = st.checkbox(
+        "Pinned plans only", value=bool(ai_config.get("pinned_plans_only", False)),
+        help="Replay approved plans without calling the model; prompts without one fail."
+    )
+    stream_plan = st.checkbox(
+        "Start executing while the AI is still planning", value=bool(ai_config.get("stream_plan", True)),
+        help="Streams the plan and runs each step as soon as it arrives, while the browser starts in parallel."
+    )
     st.markdown("""
         <small>Your API key and base URL are used only in your browser session and never sent anywhere else.</small>
     """, unsafe_allow_html=True)
@@ -33,7 +53,54 @@ if not api_key or not model or not api_base:
     st.warning("Please configure your AI API Key, Model, and Base URL in the sidebar or ai_config_sonnet.json.")
     st.stop()
 
-ai_executor = AIUIExecutor(model, api_key, api_base, screenshot_dir=screenshot_dir, report_path=report_path)
+class ActivePool:
+    """
+    The one browser pool of this Streamlit server, shared by every session and
+    rerun so replays reuse warm browsers. Switching the browser profile shuts the
+    old pool down (idle browsers are quit now, checked-out ones when their run
+    returns them) before the new one starts; the last pool is shut down when the
+    server exits.
+    """
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.profile = None
+        self.pool = None
+        atexit.register(self.shutdown)
+
+    def get(self, profile):
+        with self.lock:
+            if self.pool is None or self.profile != profile:
+                if self.pool is not None:
+                    self.pool.shutdown()
+                self.pool = BrowserPool(
+                    lambda: new_chrome_driver(profile), size=int(ai_config.get("browser_pool_size", 1)),
+                    prepare=lambda driver: prepare_window(driver, profile),
+                )
+                self.profile = profile
+                self.pool.start()
+            return self.pool
+
+    def shutdown(self):
+        with self.lock:
+            if self.pool is not None:
+                self.pool.shutdown()
+                self.pool = None
+
+@st.cache_resource
+def get_active_pool():
+    return ActivePool()
+
+@st.cache_resource
+def get_plan_cache():
+    return PlanCache(
+        ai_config.get("plan_cache_path", "plan_cache.sqlite3"),
+        ttl=float(ai_config.get("plan_cache_ttl_hours", 168)) * 3600,
+        max_entries=int(ai_config.get("plan_cache_max_entries", 1000)),
+    )
+
+ai_executor = AIUIExecutor(model, api_key, api_base, screenshot_dir=screenshot_dir, report_path=report_path,
+                           driver_pool=get_active_pool().get(browser_profile), browser_profile=browser_profile,
+                           plan_cache=get_plan_cache(), pinned_only=pinned_only)
 
 prompt = st.text_area(
     "Describe your UI operation(s) to run on your browser:",
@@ -133,14 +200,31 @@ def generate_extent_report(logs, report_path):
         f.write(html)
 
 if st.button("Execute UI Operation"):
-    with st.spinner("Asking AI to plan steps..."):
-        steps = ai_executor.ai_parse_steps(prompt)
+    logs = []
+    plan_error = None
+    if stream_plan and not pinned_only:
+        with st.spinner("Executing steps as the AI plans them..."):
+            plan = ai_executor.stream_plan(prompt)
+            result = ai_executor.run_steps(plan, log_callback=lambda m: logs.append(m))
+            steps = plan.wait()
+            plan_error = plan.error
+        if plan_error is not None and steps:
+            st.warning(f"The AI plan ended early ({plan_error}); only the steps received were executed.")
+    else:
+        with st.spinner("Asking AI to plan steps..."):
+            steps = ai_executor.ai_parse_steps(prompt)
+        if steps:
+            source = "plan cache" if ai_executor.last_plan_source == "cache" else "AI"
+            st.success(f"Plan ready (from {source})! Executing in your browser...")
+            result = ai_executor.run_steps(steps, log_callback=lambda m: logs.append(m))
     if not steps:
-        st.error("AI could not generate a plan from your request. Try rephrasing.")
+        if pinned_only:
+            st.error("No pinned plan for this request. Turn off 'Pinned plans only' to ask the AI.")
+        else:
+            st.error("AI could not generate a plan from your request. Try rephrasing.")
     else:
-        st.success("AI plan ready! Executing in your browser...")
-        logs = []
-        result = ai_executor.run_steps(steps, log_callback=lambda m: logs.append(m))
+        if plan_error is None:
+            st.session_state['last_plan'] = {"prompt": prompt, "steps": steps}
 
         st.write("### Step Validation")
         for i, step in enumerate(steps):
@@ -159,6 +243,9 @@ if st.button("Execute UI Operation"):
         st.write("----")
         st.write("**Execution Log:**")
         st.text("\n".join([log.get('message','') for log in logs]))
+        if ai_executor.last_run_metrics:
+            st.write("**Run Metrics:**")
+            st.json(ai_executor.last_run_metrics)
 
         generate_extent_report(logs, report_path)
         st.markdown(f"**Extent Report:** [{report_path}]({report_path})")
@@ -183,3 +270,11 @@ if st.button("Execute UI Operation"):
                 st.download_button("Download Test Data", test_data_json, file_name="test_data.json")
             except Exception as e:
                 st.error(f"Test data error: {e}")
+
+last_plan = st.session_state.get('last_plan')
+if last_plan:
+    st.write("### Plan Cache")
+    if st.button("Pin last plan as approved"):
+        ai_executor.pin_plan(last_plan["prompt"], last_plan["steps"])
+        st.success("Plan pinned; this request will replay it without asking the AI.")
+    st.json(get_plan_cache().stats())
@@ -0,0 +1,126 @@
+"""
+Starting Chrome for replay runs with a browser profile: how Chrome is started
+(headless, window size) and what it does not load (images, fonts, third-party
+URLs). The profiles, the browser pool and the process accounting come from
+backend/, which the generated Java glue is built from too, so a profile name
+means the same browser in both.
+"""
+import os
+import sys
+import time
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+from selenium import webdriver
+
+# The repository root, so backend/ imports as the `backend` package
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if REPO_ROOT not in sys.path:
+    sys.path.append(REPO_ROOT)
+
+from backend.browser_pool import BrowserPool
+from backend.browser_profile import BROWSER_PROFILES, blocked_url_patterns, chrome_arguments, resolve_profile
+from backend.process_usage import ACCOUNTING_AVAILABLE, driver_process_usage, own_rss
+
+
+def chrome_options(profile):
+    options = webdriver.ChromeOptions()
+    for arg in chrome_arguments(profile):
+        options.add_argument(arg)
+    if profile["block_images"]:
+        options.add_experimental_option("prefs", {"profile.managed_default_content_settings.images": 2})
+    return options
+
+
+def start_chrome(profile="default"):
+    driver = webdriver.Chrome(options=chrome_options(resolve_profile(profile)))
+    prepare_window(driver, profile)
+    return driver
+
+
+def prepare_window(driver, profile="default"):
+    # CDP settings belong to one window (target); run again after switching to a new one
+    profile = resolve_profile(profile)
+    try:
+        driver.execute_cdp_cmd("Performance.enable", {})
+        blocked = blocked_url_patterns(profile)
+        if blocked:
+            driver.execute_cdp_cmd("Network.enable", {})
+            driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": blocked})
+    except Exception as e:
+        print(f"Could not apply browser profile over CDP: {e}")
+
+
+class RunMetrics:
+    """
+    Wall time of one replay run and its peak memory: the RSS of chromedriver and
+    every Chrome process it spawned and of the executor itself (both need
+    psutil), and the page's JS heap, sampled after each step. The executor's
+    lifetime peak (ru_maxrss) is reported separately, as it spans earlier runs.
+    """
+    def __init__(self, driver, profile_name):
+        self.driver = driver
+        self.profile_name = profile_name
+        self.started = time.perf_counter()
+        self.steps = 0
+        self.peak_browser_rss = None
+        self.peak_js_heap = None
+        self.peak_executor_rss = None
+        self.elapsed = None
+        self._sample_executor()
+
+    def sample(self):
+        self.steps += 1
+        rss = self._browser_rss()
+        if rss is not None:
+            self.peak_browser_rss = max(self.peak_browser_rss or 0, rss)
+        heap = self._js_heap()
+        if heap is not None:
+            self.peak_js_heap = max(self.peak_js_heap or 0, heap)
+        self._sample_executor()
+
+    def finish(self):
+        self.elapsed = time.perf_counter() - self.started
+        return self.to_dict()
+
+    def to_dict(self):
+        def mb(size):
+            return None if size is None else round(size / (1024 * 1024), 1)
+
+        process_peak_rss = None
+        if resource is not None:
+            # ru_maxrss is in KiB on Linux
+            process_peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+        return {
+            "profile": self.profile_name,
+            "steps": self.steps,
+            "elapsed_s": None if self.elapsed is None else round(self.elapsed, 2),
+            "peak_browser_rss_mb": mb(self.peak_browser_rss),
+            "peak_js_heap_mb": mb(self.peak_js_heap),
+            "peak_executor_rss_mb": mb(self.peak_executor_rss),
+            "executor_process_peak_rss_mb": mb(process_peak_rss),
+            # False when psutil is missing: the RSS figures above are then None
+            "resource_accounting_available": ACCOUNTING_AVAILABLE,
+        }
+
+    def _sample_executor(self):
+        rss = own_rss()
+        if rss is not None:
+            self.peak_executor_rss = max(self.peak_executor_rss or 0, rss)
+
+    def _browser_rss(self):
+        usage = driver_process_usage(self.driver)
+        return None if usage is None else usage["rss"]
+
+    def _js_heap(self):
+        try:
+            metrics = self.driver.execute_cdp_cmd("Performance.getMetrics", {})["metrics"]
+        except Exception:
+            return None
+        for metric in metrics:
+            if metric.get("name") == "JSHeapUsedSize":
+                return metric.get("value")
+        return None
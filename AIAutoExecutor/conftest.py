@@ -0,0 +1,24 @@
+import pytest
+
+from stub_openai_server import StubOpenAIServer
+
+
+@pytest.fixture
+def stub():
+    server = StubOpenAIServer().start()
+    yield server
+    server.stop()
+
+
+@pytest.fixture
+def make_executor(stub, tmp_path):
+    """AIUIExecutor against the stub server; skipped where openai or selenium is not installed."""
+    ai_executor = pytest.importorskip("ai_executor")
+
+    def make(plan_cache=None, pinned_only=False):
+        return ai_executor.AIUIExecutor(
+            "stub-model", "test-key", stub.api_base, screenshot_dir=str(tmp_path / "screenshots"),
+            plan_cache=plan_cache, pinned_only=pinned_only,
+        )
+
+    return make
@@ -0,0 +1,138 @@
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+
+
+def normalize_prompt(prompt):
+    # Whitespace only: case and punctuation can be test data ("myuser", "Sign In")
+    return re.sub(r"\s+", " ", (prompt or "").strip())
+
+
+def plan_key(prompt, model, prompt_version):
+    return hashlib.sha256(
+        json.dumps([normalize_prompt(prompt), model, prompt_version]).encode("utf-8")
+    ).hexdigest()
+
+
+class PlanCache:
+    """
+    Step plans returned by the model, in SQLite, keyed by the normalized prompt,
+    the model and the planning system prompt's version. Entries expire `ttl`
+    seconds after they were stored and the least recently used are evicted past
+    `max_entries`. Pinned plans (approved by a person) never expire, are never
+    evicted and are not replaced by a fresh model answer.
+    """
+    def __init__(self, path, ttl=7 * 86400, max_entries=1000):
+        self.path = path
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.lock = threading.Lock()
+        self.counters = {"hits": 0, "pinned_hits": 0, "misses": 0, "expired": 0, "stores": 0, "evictions": 0}
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS plans ("
+            " key TEXT PRIMARY KEY, prompt TEXT, model TEXT, prompt_version TEXT, steps TEXT,"
+            " created_at REAL, last_used REAL, hits INTEGER DEFAULT 0, pinned INTEGER DEFAULT 0)"
+        )
+        self.conn.execute("CREATE INDEX IF NOT EXISTS plans_last_used ON plans (pinned, last_used)")
+        self.conn.commit()
+
+    def get(self, prompt, model, prompt_version, pinned_only=False):
+        key = plan_key(prompt, model, prompt_version)
+        now = time.time()
+        with self.lock:
+            row = self.conn.execute("SELECT steps, created_at, pinned FROM plans WHERE key = ?", (key,)).fetchone()
+            if row is not None and not row[2] and (pinned_only or now - row[1] > self.ttl):
+                if not pinned_only:
+                    self.conn.execute("DELETE FROM plans WHERE key = ?", (key,))
+                    self.conn.commit()
+                    self.counters["expired"] += 1
+                row = None
+            if row is None:
+                self.counters["misses"] += 1
+                return None
+            self.conn.execute("UPDATE plans SET last_used = ?, hits = hits + 1 WHERE key = ?", (now, key))
+            self.conn.commit()
+            self.counters["pinned_hits" if row[2] else "hits"] += 1
+            return json.loads(row[0])
+
+    def put(self, prompt, model, prompt_version, steps):
+        key = plan_key(prompt, model, prompt_version)
+        now = time.time()
+        with self.lock:
+            self.conn.execute(
+                "INSERT INTO plans (key, prompt, model, prompt_version, steps, created_at, last_used)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?)"
+                " ON CONFLICT(key) DO UPDATE SET steps = excluded.steps, created_at = excluded.created_at,"
+                " last_used = excluded.last_used WHERE pinned = 0",
+                (key, normalize_prompt(prompt), model, prompt_version, json.dumps(steps), now, now),
+            )
+            self.counters["stores"] += 1
+            self._evict(now)
+            self.conn.commit()
+
+    def pin(self, prompt, model, prompt_version, steps=None):
+        """Pins the cached plan, or stores `steps` as the pinned plan."""
+        key = plan_key(prompt, model, prompt_version)
+        now = time.time()
+        with self.lock:
+            if steps is not None:
+                self.conn.execute(
+                    "INSERT OR REPLACE INTO plans (key, prompt, model, prompt_version, steps, created_at, last_used, pinned)"
+                    " VALUES (?, ?, ?, ?, ?, ?, ?, 1)",
+                    (key, normalize_prompt(prompt), model, prompt_version, json.dumps(steps), now, now),
+                )
+                pinned = True
+            else:
+                pinned = self.conn.execute("UPDATE plans SET pinned = 1 WHERE key = ?", (key,)).rowcount > 0
+            self.conn.commit()
+            return pinned
+
+    def unpin(self, prompt, model, prompt_version):
+        key = plan_key(prompt, model, prompt_version)
+        with self.lock:
+            # The plan stays cached and ages out from now
+            changed = self.conn.execute(
+                "UPDATE plans SET pinned = 0, created_at = ? WHERE key = ?", (time.time(), key)
+            ).rowcount > 0
+            self.conn.commit()
+            return changed
+
+    def is_pinned(self, prompt, model, prompt_version):
+        key = plan_key(prompt, model, prompt_version)
+        with self.lock:
+            row = self.conn.execute("SELECT pinned FROM plans WHERE key = ?", (key,)).fetchone()
+        return bool(row and row[0])
+
+    def stats(self):
+        with self.lock:
+            entries, pinned = self.conn.execute("SELECT COUNT(*), COALESCE(SUM(pinned), 0) FROM plans").fetchone()
+            lookups = self.counters["hits"] + self.counters["pinned_hits"] + self.counters["misses"]
+            return {
+                **self.counters,
+                "hit_rate": round((lookups - self.counters["misses"]) / lookups, 3) if lookups else None,
+                "entries": entries,
+                "pinned": pinned,
+            }
+
+    def _evict(self, now):
+        # Caller holds the lock
+        expired = self.conn.execute(
+            "DELETE FROM plans WHERE pinned = 0 AND created_at < ?", (now - self.ttl,)
+        ).rowcount
+        unpinned = self.conn.execute("SELECT COUNT(*) FROM plans WHERE pinned = 0").fetchone()[0]
+        overflow = unpinned - self.max_entries
+        if overflow > 0:
+            self.conn.execute(
+                "DELETE FROM plans WHERE key IN"
+                " (SELECT key FROM plans WHERE pinned = 0 ORDER BY last_used LIMIT ?)",
+                (overflow,),
+            )
+        self.counters["evictions"] += expired + max(overflow, 0)
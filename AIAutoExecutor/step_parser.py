@@ -0,0 +1,73 @@
+import json
+
+
+class IncrementalStepParser:
+    """
+    Pulls the elements of the first top-level JSON array out of text that arrives
+    in pieces, returning each step object from feed() as soon as its closing brace
+    arrives. Text before the array (prose, a ``` fence) and after it is ignored.
+    Strings may hold brackets and escaped quotes, and steps may nest arrays
+    (framePath) to any depth.
+    """
+    def __init__(self):
+        self.started = False
+        self.done = False
+        self.depth = 0
+        self.in_string = False
+        self.escape = False
+        self.pieces = None
+
+    def feed(self, text):
+        steps = []
+        if self.done:
+            return steps
+        start = 0 if self.pieces is not None else None
+        for i, ch in enumerate(text):
+            if not self.started:
+                if ch == "[":
+                    self.started = True
+                    self.depth = 1
+                continue
+            if self.in_string:
+                if self.escape:
+                    self.escape = False
+                elif ch == "\\":
+                    self.escape = True
+                elif ch == '"':
+                    self.in_string = False
+            elif ch == '"':
+                self.in_string = True
+            elif ch in "{[":
+                if self.depth == 1:
+                    self.pieces = []
+                    start = i
+                self.depth += 1
+            elif ch in "}]":
+                self.depth -= 1
+                if self.depth == 0:
+                    self.done = True
+                    return steps
+                if self.depth == 1 and self.pieces is not None:
+                    element = "".join(self.pieces) + text[start:i + 1]
+                    self.pieces = None
+                    start = None
+                    try:
+                        value = json.loads(element)
+                    except ValueError as e:
+                        raise ValueError(f"Invalid step in AI response: {e}: {element[:200]}")
+                    if isinstance(value, dict):
+                        steps.append(value)
+        if self.pieces is not None:
+            self.pieces.append(text[start:])
+        return steps
+
+
+def parse_steps(text):
+    """Every step of the first JSON array in `text`, which must be complete."""
+    parser = IncrementalStepParser()
+    steps = parser.feed(text)
+    if not parser.started:
+        raise ValueError("No JSON array found in AI response.")
+    if not parser.done:
+        raise ValueError("AI response ended inside the JSON array.")
+    return steps
@@ -0,0 +1,169 @@
+"""
+Local OpenAI-compatible stub for exercising the executor without a real model:
+POST /v1/chat/completions answers every prompt with a fixed step plan, and
+GET /stats reports how many completions were requested (a plan cache hit makes
+none). Requests with "stream": true are answered as server-sent events, the plan
+split into `chunk_size`-character deltas `chunk_delay` seconds apart. `wrapper`
+puts the plan inside other text, as models often answer ("{plan}" marks where).
+
+    python stub_openai_server.py --port 8999 --plan plan.json
+
+then point the executor at api_base http://127.0.0.1:8999/v1 with any API key.
+"""
+import argparse
+import json
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+DEFAULT_URL = "https://example.com"
+
+
+def default_plan(prompt):
+    # Navigates to the first URL in the prompt, so distinct prompts get distinct plans
+    match = re.search(r"https?://[^\s,\"']+", prompt or "")
+    return [{"eventType": "navigate", "locatorType": "url", "locator": match.group(0) if match else DEFAULT_URL}]
+
+
+class StubOpenAIServer:
+    """Serves the stub on a background thread; `plan` is a fixed step list, or None for default_plan()."""
+    def __init__(self, plan=None, host="127.0.0.1", port=0, latency=0.0, chunk_size=16, chunk_delay=0.0,
+                 wrapper="{plan}"):
+        self.plan = plan
+        self.wrapper = wrapper
+        self.latency = latency
+        self.chunk_size = chunk_size
+        self.chunk_delay = chunk_delay
+        self.requests = 0
+        self.lock = threading.Lock()
+        self.httpd = ThreadingHTTPServer((host, port), self._handler())
+        self.thread = None
+
+    @property
+    def api_base(self):
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}/v1"
+
+    def start(self):
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def completion(self, body):
+        number, content = self._answer(body)
+        return {
+            "id": f"chatcmpl-stub-{number}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": body.get("model", "stub"),
+            "choices": [{"index": 0, "message": {"role": "assistant", "content": content}, "finish_reason": "stop"}],
+            "usage": {"prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0},
+        }
+
+    def completion_chunks(self, body):
+        """The streamed answer, one chat.completion.chunk at a time."""
+        number, content = self._answer(body)
+        base = {"id": f"chatcmpl-stub-{number}", "object": "chat.completion.chunk",
+                "created": int(time.time()), "model": body.get("model", "stub")}
+        yield {**base, "choices": [{"index": 0, "delta": {"role": "assistant", "content": ""}, "finish_reason": None}]}
+        for i in range(0, len(content), self.chunk_size):
+            if self.chunk_delay:
+                time.sleep(self.chunk_delay)
+            delta = {"content": content[i:i + self.chunk_size]}
+            yield {**base, "choices": [{"index": 0, "delta": delta, "finish_reason": None}]}
+        yield {**base, "choices": [{"index": 0, "delta": {}, "finish_reason": "stop"}]}
+
+    def _answer(self, body):
+        with self.lock:
+            self.requests += 1
+            number = self.requests
+        if self.latency:
+            time.sleep(self.latency)
+        prompt = next((m.get("content", "") for m in reversed(body.get("messages", [])) if m.get("role") == "user"), "")
+        plan = json.dumps(self.plan if self.plan is not None else default_plan(prompt))
+        return number, self.wrapper.replace("{plan}", plan)
+
+    def _handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                if not self.path.rstrip("/").endswith("/chat/completions"):
+                    return self._send(404, {"error": {"message": f"Unknown path {self.path}"}})
+                length = int(self.headers.get("Content-Length") or 0)
+                try:
+                    body = json.loads(self.rfile.read(length) or b"{}")
+                except ValueError:
+                    return self._send(400, {"error": {"message": "Invalid JSON body"}})
+                if body.get("stream"):
+                    return self._stream(server.completion_chunks(body))
+                self._send(200, server.completion(body))
+
+            def do_GET(self):
+                if self.path.rstrip("/") == "/stats":
+                    return self._send(200, {"requests": server.requests})
+                self._send(404, {"error": {"message": f"Unknown path {self.path}"}})
+
+            def _send(self, status, payload):
+                data = json.dumps(payload).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def _stream(self, chunks):
+                # No Content-Length: the body ends when the connection closes
+                self.send_response(200)
+                self.send_header("Content-Type", "text/event-stream")
+                self.send_header("Cache-Control", "no-cache")
+                self.send_header("Connection", "close")
+                self.end_headers()
+                self.close_connection = True
+                try:
+                    for chunk in chunks:
+                        self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode("utf-8"))
+                        self.wfile.flush()
+                    self.wfile.write(b"data: [DONE]\n\n")
+                    self.wfile.flush()
+                except (BrokenPipeError, ConnectionResetError):
+                    # The client stopped reading once it had the whole plan
+                    pass
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8999)
+    parser.add_argument("--plan", help="JSON file with the step list to answer with")
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds to wait before answering")
+    parser.add_argument("--chunk-size", type=int, default=16, help="characters per streamed delta")
+    parser.add_argument("--chunk-delay", type=float, default=0.0, help="seconds between streamed deltas")
+    args = parser.parse_args()
+
+    plan = None
+    if args.plan:
+        with open(args.plan) as f:
+            plan = json.load(f)
+    server = StubOpenAIServer(plan, args.host, args.port, args.latency, args.chunk_size, args.chunk_delay)
+    print(f"Stub OpenAI API on {server.api_base}", flush=True)
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.httpd.server_close()
+
+
+if __name__ == "__main__":
+    main()
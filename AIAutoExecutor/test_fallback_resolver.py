@@ -0,0 +1,40 @@
+import pathlib
+
+import pytest
+
+webdriver = pytest.importorskip("selenium.webdriver")
+
+FIXTURE = pathlib.Path(__file__).resolve().parent.parent / "test_data" / "fallback_resolver.html"
+LOCATORS = [
+    "Username", "user", "Email address", "e-mail", "password", "Sign In", "sign", "help", "Notes",
+    "country", "india", "Reset password", "search", "results", "pin", "nothing here", "",
+]
+
+
+@pytest.fixture(scope="module")
+def driver():
+    options = webdriver.ChromeOptions()
+    for arg in ("--headless=new", "--disable-gpu", "--disable-dev-shm-usage", "--no-sandbox"):
+        options.add_argument(arg)
+    try:
+        driver = webdriver.Chrome(options=options)
+    except Exception as e:
+        pytest.skip(f"Chrome is not available: {e}")
+    driver.get(FIXTURE.as_uri())
+    yield driver
+    driver.quit()
+
+
+def describe(element):
+    return element.get_attribute("outerHTML")[:80] if element else None
+
+
+@pytest.mark.parametrize("input_mode", [False, True])
+@pytest.mark.parametrize("locator", LOCATORS)
+def test_in_page_resolver_picks_the_reference_element(make_executor, driver, locator, input_mode):
+    ai_executor = pytest.importorskip("ai_executor")
+    expected = make_executor()._find_elem_fallback_reference(driver, "text", locator, input_mode=input_mode)
+    # Run directly: _find_elem_fallback falls back to the reference when the script fails
+    best = driver.execute_script(ai_executor.FALLBACK_RESOLVER_JS, locator, input_mode)
+    picked = best["element"] if best else None
+    assert picked == expected, (describe(picked), describe(expected))
@@ -0,0 +1,144 @@
+import pytest
+
+import plan_cache
+from plan_cache import PlanCache, normalize_prompt, plan_key
+
+PROMPT = "Go to https://example.com and click Sign In"
+STEPS = [{"eventType": "navigate", "locatorType": "url", "locator": "https://example.com"}]
+OTHER_STEPS = [{"eventType": "click", "locatorType": "text", "locator": "Sign In"}]
+
+
+class Clock:
+    def __init__(self, now=1_000_000.0):
+        self.now = now
+
+    def time(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(plan_cache, "time", clock)
+    return clock
+
+
+@pytest.fixture
+def cache(tmp_path, clock):
+    return PlanCache(str(tmp_path / "plans.sqlite3"), ttl=3600, max_entries=2)
+
+
+def test_normalize_prompt_only_collapses_whitespace():
+    assert normalize_prompt("  Go to\n https://a.com\t now ") == "Go to https://a.com now"
+    assert normalize_prompt("Enter \"MyUser\"") == "Enter \"MyUser\""
+    assert normalize_prompt(None) == ""
+
+
+def test_key_covers_prompt_model_and_prompt_version():
+    key = plan_key(PROMPT, "model-a", "v1")
+    assert plan_key("  " + PROMPT.replace(" ", "   ") + "\n", "model-a", "v1") == key
+    assert plan_key(PROMPT.lower(), "model-a", "v1") != key
+    assert plan_key(PROMPT, "model-b", "v1") != key
+    assert plan_key(PROMPT, "model-a", "v2") != key
+
+
+def test_hit_and_miss(cache):
+    assert cache.get(PROMPT, "m", "v1") is None
+    cache.put(PROMPT, "m", "v1", STEPS)
+    assert cache.get(PROMPT, "m", "v1") == STEPS
+    assert cache.get(" " + PROMPT + "  ", "m", "v1") == STEPS
+    assert cache.get(PROMPT, "m", "v2") is None
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["stores"], stats["entries"]) == (2, 2, 1, 1)
+    assert stats["hit_rate"] == 0.5
+
+
+def test_entries_expire_after_ttl(cache, clock):
+    cache.put(PROMPT, "m", "v1", STEPS)
+    clock.now += 3599
+    assert cache.get(PROMPT, "m", "v1") == STEPS
+    clock.now += 2
+    assert cache.get(PROMPT, "m", "v1") is None
+    assert cache.stats()["expired"] == 1
+    assert cache.stats()["entries"] == 0
+
+
+def test_least_recently_used_entry_is_evicted(cache, clock):
+    cache.put("first", "m", "v1", STEPS)
+    clock.now += 1
+    cache.put("second", "m", "v1", STEPS)
+    clock.now += 1
+    assert cache.get("first", "m", "v1") == STEPS
+    clock.now += 1
+    cache.put("third", "m", "v1", STEPS)
+    assert cache.get("second", "m", "v1") is None
+    assert cache.get("first", "m", "v1") == STEPS
+    assert cache.get("third", "m", "v1") == STEPS
+    assert cache.stats()["evictions"] == 1
+
+
+def test_pinned_plan_survives_eviction_and_ttl(cache, clock):
+    assert cache.pin(PROMPT, "m", "v1", STEPS)
+    for idx in range(5):
+        clock.now += 1
+        cache.put(f"prompt {idx}", "m", "v1", OTHER_STEPS)
+    clock.now += 10 * 3600
+    cache.put("late", "m", "v1", OTHER_STEPS)
+    assert cache.get(PROMPT, "m", "v1") == STEPS
+    assert cache.is_pinned(PROMPT, "m", "v1")
+    assert cache.stats()["pinned_hits"] == 1
+
+
+def test_model_answer_does_not_replace_pinned_plan(cache):
+    cache.pin(PROMPT, "m", "v1", STEPS)
+    cache.put(PROMPT, "m", "v1", OTHER_STEPS)
+    assert cache.get(PROMPT, "m", "v1") == STEPS
+
+
+def test_unpinned_plan_ages_out_from_unpinning(cache, clock):
+    cache.pin(PROMPT, "m", "v1", STEPS)
+    clock.now += 10 * 3600
+    assert cache.unpin(PROMPT, "m", "v1")
+    clock.now += 3599
+    assert cache.get(PROMPT, "m", "v1") == STEPS
+    clock.now += 2
+    assert cache.get(PROMPT, "m", "v1") is None
+
+
+def test_pinned_only_lookup_ignores_unpinned_plans(cache):
+    cache.put(PROMPT, "m", "v1", STEPS)
+    assert cache.get(PROMPT, "m", "v1", pinned_only=True) is None
+    # Not expired by a pinned-only lookup
+    assert cache.get(PROMPT, "m", "v1") == STEPS
+
+
+def test_cache_hit_makes_no_api_call(make_executor, stub, cache):
+    executor = make_executor(cache)
+    steps = executor.ai_parse_steps("Go to https://a.example and log in")
+    assert executor.last_plan_source == "model"
+    assert steps == [{"eventType": "navigate", "locatorType": "url", "locator": "https://a.example"}]
+    assert stub.requests == 1
+
+    assert executor.ai_parse_steps("  Go to https://a.example   and log in\n") == steps
+    assert executor.last_plan_source == "cache"
+    assert stub.requests == 1
+
+    executor.ai_parse_steps("Go to https://b.example and log in")
+    assert executor.last_plan_source == "model"
+    assert stub.requests == 2
+
+
+def test_pinned_only_never_calls_the_model(make_executor, stub, cache):
+    make_executor(cache).ai_parse_steps(PROMPT)
+    assert stub.requests == 1
+
+    executor = make_executor(cache, pinned_only=True)
+    assert executor.ai_parse_steps(PROMPT) == []
+    assert executor.ai_parse_steps("Go to https://unknown.example") == []
+    assert executor.last_plan_source is None
+    assert stub.requests == 1
+
+    assert executor.pin_plan(PROMPT, STEPS)
+    assert executor.ai_parse_steps(PROMPT) == STEPS
+    assert executor.last_plan_source == "cache"
+    assert stub.requests == 1
@@ -0,0 +1,59 @@
+import pytest
+
+from browser_profile import BrowserPool
+
+ai_executor = pytest.importorskip("ai_executor")
+
+
+class FakeDriver:
+    """Just enough of a Chrome driver for the pool: windows are CDP targets, contexts own targets."""
+    def __init__(self):
+        self.window_handles = ["home"]
+        self.current_window_handle = "home"
+        self.current_url = "about:blank"
+        self.contexts = {}
+        self.targets = 0
+        self.registered = []
+        self.switch_to = self
+
+    def window(self, handle):
+        self.current_window_handle = handle
+
+    def execute_cdp_cmd(self, cmd, params):
+        if cmd == "Target.createBrowserContext":
+            context_id = f"context-{len(self.contexts) + 1}"
+            self.contexts[context_id] = []
+            return {"browserContextId": context_id}
+        if cmd == "Target.createTarget":
+            self.targets += 1
+            target_id = f"target-{self.targets}"
+            self.contexts[params["browserContextId"]].append(target_id)
+            self.window_handles.append(target_id)
+            return {"targetId": target_id}
+        if cmd == "Target.disposeBrowserContext":
+            for target_id in self.contexts.pop(params["browserContextId"]):
+                self.window_handles.remove(target_id)
+        if cmd == "Page.addScriptToEvaluateOnNewDocument":
+            self.registered.append(self.current_window_handle)
+        return {}
+
+    def close(self):
+        self.window_handles.remove(self.current_window_handle)
+
+    def quit(self):
+        pass
+
+
+def test_pacing_script_is_registered_in_every_checkout(monkeypatch):
+    driver = FakeDriver()
+    pool = BrowserPool(lambda: driver, size=1)
+    # No background warming, so the second checkout gets the same driver back
+    monkeypatch.setattr(pool, "_refill", lambda: None)
+    windows = []
+    for _ in range(2):
+        assert pool.checkout() is driver
+        windows.append(driver.current_window_handle)
+        ai_executor.StepPacer(driver).install()
+        pool.checkin(driver)
+    assert windows == ["target-1", "target-2"]
+    assert driver.registered == windows
@@ -0,0 +1,121 @@
+import json
+
+import pytest
+
+from plan_cache import PlanCache
+from step_parser import IncrementalStepParser, parse_steps
+
+# Strings holding brackets, braces, escaped quotes and backslashes, and nested arrays
+PLAN = [
+    {"eventType": "navigate", "locatorType": "url", "locator": "https://example.com/?q=[1]{2}"},
+    {"eventType": "input", "locatorType": "xpath", "locator": "//input[@name=\"user\"]",
+     "value": "he said \"hi\" \\o/ ]}", "framePath": [[0, 1], [2]]},
+    {"eventType": "click", "locatorType": "text", "locator": "Sign In", "framePath": []},
+]
+WRAPPED = "Here is the plan:\n```json\n{plan}\n```\nLet me know if [anything] should change."
+
+
+def chunks(text, size):
+    return [text[i:i + size] for i in range(0, len(text), size)]
+
+
+def feed_all(parser, pieces):
+    steps = []
+    for piece in pieces:
+        steps += parser.feed(piece)
+    return steps
+
+
+@pytest.mark.parametrize("text", [
+    json.dumps(PLAN), json.dumps(PLAN, indent=2), WRAPPED.replace("{plan}", json.dumps(PLAN)),
+])
+def test_every_chunk_size_gives_the_same_steps(text):
+    for size in range(1, len(text) + 1):
+        parser = IncrementalStepParser()
+        assert feed_all(parser, chunks(text, size)) == PLAN, f"chunk size {size}"
+        assert parser.done
+
+
+def test_each_step_is_returned_as_soon_as_it_closes():
+    text = json.dumps(PLAN)
+    # Offset of each step's closing brace: just before the "]" of the plan cut after it
+    ends = [len(json.dumps(PLAN[:idx + 1])) - 2 for idx in range(len(PLAN))]
+    parser = IncrementalStepParser()
+    received = 0
+    for pos, ch in enumerate(text):
+        received += len(parser.feed(ch))
+        assert received == sum(1 for end in ends if end <= pos)
+
+
+def test_prose_and_fences_around_the_array_are_ignored():
+    text = WRAPPED.replace("{plan}", json.dumps(PLAN))
+    assert parse_steps(text) == PLAN
+    # Nothing after the closing bracket is parsed, brackets in prose included
+    parser = IncrementalStepParser()
+    parser.feed(text)
+    assert parser.feed('[{"eventType": "late"}]') == []
+
+
+def test_only_step_objects_are_returned():
+    assert parse_steps('[1, "two", [3], {"eventType": "wait", "value": 1}, null]') == [
+        {"eventType": "wait", "value": 1}
+    ]
+
+
+def test_missing_or_unfinished_array_is_an_error():
+    with pytest.raises(ValueError, match="No JSON array"):
+        parse_steps("I cannot help with that.")
+    with pytest.raises(ValueError, match="ended inside"):
+        parse_steps(json.dumps(PLAN)[:-1])
+
+
+def test_invalid_step_is_an_error():
+    parser = IncrementalStepParser()
+    with pytest.raises(ValueError, match="Invalid step"):
+        parser.feed('[{"eventType": navigate}]')
+
+
+@pytest.mark.parametrize("chunk_size", [1, 2, 3, 5, 8, 13, 64, 4096])
+@pytest.mark.parametrize("wrapper", ["{plan}", WRAPPED])
+def test_streamed_plan_from_stub(make_executor, stub, chunk_size, wrapper):
+    stub.plan = PLAN
+    stub.chunk_size = chunk_size
+    stub.wrapper = wrapper
+    executor = make_executor()
+    plan = executor.stream_plan("Log in")
+    assert list(plan) == PLAN
+    assert plan.wait(5) == PLAN
+    assert plan.error is None
+    assert executor.last_plan_source == "model"
+    assert stub.requests == 1
+
+
+def test_first_step_arrives_before_the_plan_is_complete(make_executor, stub):
+    stub.plan = PLAN
+    stub.chunk_size = 8
+    stub.chunk_delay = 0.01
+    plan = make_executor().stream_plan("Log in")
+    first = next(iter(plan))
+    assert first == PLAN[0]
+    assert plan.complete_s is None
+    assert plan.wait(5) == PLAN
+    assert plan.first_step_s < plan.complete_s
+
+
+def test_unfinished_stream_keeps_the_steps_received(make_executor, stub):
+    # The answer is cut off inside the last step; a wrapper without "{plan}" is the whole answer
+    plan_text = json.dumps(PLAN)
+    stub.wrapper = plan_text[:plan_text.rindex("{")] + '{"eventType": "cli'
+    plan = make_executor().stream_plan("Log in")
+    assert list(plan) == PLAN[:2]
+    assert "ended inside" in str(plan.error)
+
+
+def test_streamed_plan_is_cached_and_replayed(make_executor, stub, tmp_path):
+    cache = PlanCache(str(tmp_path / "plans.sqlite3"))
+    stub.plan = PLAN
+    executor = make_executor(cache)
+    assert executor.stream_plan("Log in").wait(5) == PLAN
+    assert executor.stream_plan(" Log  in ").wait(5) == PLAN
+    assert executor.last_plan_source == "cache"
+    assert stub.requests == 1
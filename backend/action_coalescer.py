@@ -0,0 +1,48 @@
+from datetime import datetime
+
+TYPING_EVENTS = ("input", "change", "blur", "enter")
+DEFAULT_COALESCE_WINDOW_MS = 1000
+
+def _parse_timestamp(value):
+    if not value:
+        return None
+    try:
+        return datetime.fromisoformat(value.replace("Z", "+00:00"))
+    except ValueError:
+        return None
+
+def _element_key(action):
+    locator = action.get("chosenXpath") or action.get("locator") or action.get("objectName", "")
+    return (locator, action.get("frameChain", ""), action.get("windowTitle", ""))
+
+def coalesce_actions(actions, window_ms=DEFAULT_COALESCE_WINDOW_MS):
+    """
+    Folds consecutive typing events (input/change/blur/enter) on the same element
+    into a single action carrying the final value. An event joins the burst when it
+    arrives within window_ms of the previous one; window_ms=0 disables coalescing.
+    """
+    if not window_ms:
+        return list(actions)
+    coalesced = []
+    last_time = None
+    for action in actions:
+        timestamp = _parse_timestamp(action.get("timestamp"))
+        previous = coalesced[-1] if coalesced else None
+        if (
+            previous is not None
+            and action.get("eventType") in TYPING_EVENTS
+            and previous.get("eventType") in TYPING_EVENTS
+            and _element_key(previous) == _element_key(action)
+            and timestamp is not None and last_time is not None
+            and (timestamp - last_time).total_seconds() * 1000 <= window_ms
+        ):
+            merged = dict(previous)
+            merged["actualValue"] = action.get("actualValue", "")
+            merged["eventType"] = action.get("eventType", "")
+            merged["timestamp"] = action.get("timestamp", "")
+            merged["coalescedCount"] = previous.get("coalescedCount", 1) + action.get("coalescedCount", 1)
+            coalesced[-1] = merged
+        else:
+            coalesced.append(action)
+        last_time = timestamp
+    return coalesced
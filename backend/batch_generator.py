@@ -0,0 +1,236 @@
+"""
+Batch generation: many features in one run, fanned out over a process pool.
+
+Each feature gets its own directory (feature file, runner, actions.json) under
+the batch workspace. Step definitions are not generated per feature: every
+runner points at the shared glue package (see code_generator.SHARED_GLUE_PACKAGE),
+written once next to a merged object repository and test data, so the suite has
+no duplicate step definitions.
+
+    python batch_generator.py --dir recordings/ --out generated/batch --workers 4
+    python batch_generator.py --spec features.json --out generated/batch --execution parallel
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import shutil
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from action_coalescer import coalesce_actions, DEFAULT_COALESCE_WINDOW_MS
+from browser_profile import BROWSER_PROFILES
+from code_generator import (
+    MANIFEST_NAME, SHARED_GLUE_PACKAGE, forget_manifest, feature_base, feature_artifact, json_artifact, runner_artifact,
+    shared_glue_artifacts, step_kinds, stream_artifacts,
+)
+
+ACTIONS_FILE = "actions.json"
+
+
+def specs_from_directory(directory):
+    """One spec per saved actions.json below `directory`, named after the folder holding it."""
+    specs = []
+    for root, _, files in sorted(os.walk(directory)):
+        if ACTIONS_FILE not in files:
+            continue
+        name = os.path.basename(os.path.abspath(root))
+        spec = {"feature_name": name, "actions_path": os.path.join(root, ACTIONS_FILE)}
+        for key, file_name in (("object_repo_path", "object_repo.json"), ("test_data_path", "test_data.json")):
+            if file_name in files:
+                spec[key] = os.path.join(root, file_name)
+        specs.append(spec)
+    return specs
+
+
+def resolve_under(root, path):
+    """`path`, relative to `root`, with symlinks resolved; ValueError if it leads outside `root`."""
+    root = os.path.realpath(root)
+    resolved = os.path.realpath(os.path.join(root, path))
+    if os.path.commonpath([root, resolved]) != root:
+        raise ValueError(f"{path} is outside the recordings directory")
+    return resolved
+
+
+def load_spec(spec, root=None):
+    """Reads the spec's *_path files in; with `root`, every path must stay inside it."""
+    loaded = dict(spec)
+    for key in ("actions", "object_repo", "test_data"):
+        path = spec.get(f"{key}_path")
+        if key not in loaded and path:
+            if root is not None:
+                path = resolve_under(root, path)
+            with open(path) as f:
+                loaded[key] = json.load(f)
+        loaded.setdefault(key, [])
+    return loaded
+
+
+def generate_batch_feature(spec, workspace, base, glue_package=SHARED_GLUE_PACKAGE, execution="serial"):
+    """Process-pool worker: writes one feature's own artifacts and returns what the shared files need."""
+    started = time.perf_counter()
+    spec = load_spec(spec)
+    loaded = time.perf_counter()
+    actions = coalesce_actions(spec["actions"], spec.get("coalesce_window_ms", DEFAULT_COALESCE_WINDOW_MS))
+    coalesced = time.perf_counter()
+    feature_name = spec.get("feature_name") or base
+    directory = os.path.join(workspace, base)
+    os.makedirs(directory, exist_ok=True)
+    artifacts = [
+        json_artifact(ACTIONS_FILE, "actions_json", actions),
+        feature_artifact(actions, feature_name, spec.get("scenario_outline", "")),
+        runner_artifact(feature_name, features_dir=f"generated/{base}", glue=glue_package, execution=execution),
+    ]
+    files = {}
+    for event, artifact, value in stream_artifacts(artifacts, directory):
+        if event == "end":
+            files[artifact.name] = {k: value[k] for k in ("status", "sha256", "size")}
+    finished = time.perf_counter()
+    return {
+        "feature_name": feature_name,
+        "base": base,
+        "files": files,
+        "step_kinds": step_kinds(actions),
+        "object_repo": spec["object_repo"],
+        "test_data": spec["test_data"],
+        "timings_ms": {
+            "load": round((loaded - started) * 1000, 1),
+            "coalesce": round((coalesced - loaded) * 1000, 1),
+            "generate": round((finished - coalesced) * 1000, 1),
+            "total": round((finished - started) * 1000, 1),
+        },
+    }
+
+
+def merge_by_object_name(lists):
+    """Merges object repo / test data entries across features; the first feature to define a name wins."""
+    merged = {}
+    conflicts = []
+    for feature_name, entries in lists:
+        for entry in entries:
+            name = entry.get("objectName")
+            if name is None:
+                continue
+            if name not in merged:
+                merged[name] = (feature_name, entry)
+            elif merged[name][1] != entry:
+                conflicts.append({"objectName": name, "kept": merged[name][0], "ignored": feature_name})
+    return [entry for _, entry in merged.values()], conflicts
+
+
+def unique_bases(specs):
+    bases = []
+    seen = set()
+    for idx, spec in enumerate(specs):
+        base = feature_base(spec.get("feature_name") or f"feature_{idx + 1}")
+        candidate, counter = base, 2
+        while candidate in seen:
+            candidate = f"{base}_{counter}"
+            counter += 1
+        seen.add(candidate)
+        bases.append(candidate)
+    return bases
+
+
+def remove_stale_features(workspace, bases):
+    # Feature directories an earlier batch in this workspace generated, for features no longer in it
+    for name in os.listdir(workspace):
+        directory = os.path.join(workspace, name)
+        if name not in bases and os.path.isfile(os.path.join(directory, MANIFEST_NAME)):
+            forget_manifest(directory)
+            shutil.rmtree(directory, ignore_errors=True)
+
+
+def run_batch(specs, workspace, workers=None, glue_package=SHARED_GLUE_PACKAGE, data_mode="json", execution="serial",
+              browser_profile="default"):
+    """
+    Generates every spec into `workspace` and yields one event dict per finished
+    feature (in completion order), then the shared files and a summary.
+    """
+    started = time.perf_counter()
+    os.makedirs(workspace, exist_ok=True)
+    bases = unique_bases(specs)
+    results = [None] * len(specs)
+    failed = 0
+    # spawn: the backend process runs driver and worker threads that a fork would copy mid-flight
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=workers, mp_context=context) as pool:
+        futures = {
+            pool.submit(generate_batch_feature, spec, workspace, base, glue_package, execution): idx
+            for idx, (spec, base) in enumerate(zip(specs, bases))
+        }
+        for future in as_completed(futures):
+            idx = futures[future]
+            try:
+                result = future.result()
+            except Exception as e:
+                failed += 1
+                yield {"event": "feature", "index": idx, "base": bases[idx], "status": "failed", "error": str(e)}
+                continue
+            results[idx] = result
+            yield {
+                "event": "feature", "index": idx, "status": "success",
+                **{k: result[k] for k in ("feature_name", "base", "files", "step_kinds", "timings_ms")},
+            }
+
+    shared_started = time.perf_counter()
+    done = [r for r in results if r is not None]
+    kinds = []
+    for result in done:
+        kinds += [kind for kind in result["step_kinds"] if kind not in kinds]
+    object_repo, repo_conflicts = merge_by_object_name((r["feature_name"], r["object_repo"]) for r in done)
+    test_data, data_conflicts = merge_by_object_name((r["feature_name"], r["test_data"]) for r in done)
+    artifacts = [
+        json_artifact("object_repo.json", "object_repo_json", object_repo),
+        json_artifact("test_data.json", "test_data_json", test_data),
+    ] + shared_glue_artifacts(glue_package, data_mode, object_repo, test_data, execution, browser_profile)
+    files = {}
+    for event, artifact, value in stream_artifacts(artifacts, workspace):
+        if event == "end":
+            files[artifact.name] = {k: value[k] for k in ("status", "sha256", "size")}
+    remove_stale_features(workspace, bases)
+    yield {
+        "event": "shared",
+        "files": files,
+        "step_kinds": kinds,
+        "conflicts": {"object_repo": repo_conflicts, "test_data": data_conflicts},
+        "timings_ms": {"total": round((time.perf_counter() - shared_started) * 1000, 1)},
+    }
+    yield {
+        "event": "done",
+        "features": len(specs),
+        "failed": failed,
+        "timings_ms": {"total": round((time.perf_counter() - started) * 1000, 1)},
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--dir", help="directory searched for saved actions.json files")
+    source.add_argument("--spec", help="JSON file with a list of feature specs")
+    parser.add_argument("--out", default="./generated/batch", help="batch workspace")
+    parser.add_argument("--workers", type=int, default=None, help="process pool size (default: CPU count)")
+    parser.add_argument("--glue-package", default=SHARED_GLUE_PACKAGE, help="package of the shared step definitions")
+    parser.add_argument("--data-mode", choices=["json", "precompiled"], default="json",
+                        help="load object repo/test data from JSON, or compile them into a Java class")
+    parser.add_argument("--execution", choices=["serial", "parallel"], default="serial",
+                        help="run scenarios one browser at a time, or concurrently with one browser per thread")
+    parser.add_argument("--browser-profile", choices=list(BROWSER_PROFILES), default="default",
+                        help="browser profile the generated glue starts (overridable with -Dbdd.browserProfile)")
+    args = parser.parse_args()
+
+    if args.dir:
+        specs = specs_from_directory(args.dir)
+    else:
+        with open(args.spec) as f:
+            specs = json.load(f)
+    for event in run_batch(
+        specs, args.out, workers=args.workers, glue_package=args.glue_package, data_mode=args.data_mode,
+        execution=args.execution, browser_profile=args.browser_profile,
+    ):
+        print(json.dumps(event), flush=True)
+
+
+if __name__ == "__main__":
+    main()
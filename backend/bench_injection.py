@@ -0,0 +1,89 @@
+"""
+Benchmark: recorder injection by WebDriver frame walking vs CDP registration.
+
+Serves a frame tree (depth x fanout) of HTML pages from localhost, then for each strategy
+measures page load plus the time until every frame records, and checks the recorder reached all
+frames. Needs Chrome and chromedriver, like the backend itself.
+
+    python bench_injection.py --depth 3 --fanout 4
+"""
+import argparse
+import functools
+import os
+import tempfile
+import threading
+import time
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+from selenium import webdriver
+from selenium_manager import SeleniumSessionManager
+
+class QuietHandler(SimpleHTTPRequestHandler):
+    def log_message(self, *args):
+        pass
+
+COUNT_RECORDERS_JS = """
+function count(win) {
+    var n = 0;
+    try { n = win.__robustRecorderInstalled ? 1 : 0; } catch (e) { return 0; }
+    for (var i = 0; i < win.frames.length; i++) n += count(win.frames[i]);
+    return n;
+}
+return count(window);
+"""
+
+def build_frame_tree(directory, depth, fanout):
+    def write(path, level):
+        children = []
+        if level < depth:
+            for idx in range(fanout):
+                child = f"{path}_{idx}"
+                write(child, level + 1)
+                children.append(f'<iframe src="{child}.html" width="200" height="120"></iframe>')
+        with open(os.path.join(directory, f"{path}.html"), "w") as f:
+            f.write(f"<html><body><input name='{path}'>{''.join(children)}</body></html>")
+    write("frame", 0)
+    return sum(fanout ** level for level in range(depth + 1))
+
+def run(depth, fanout):
+    manager = SeleniumSessionManager()
+    with tempfile.TemporaryDirectory() as directory:
+        total = build_frame_tree(directory, depth, fanout)
+        handler = functools.partial(QuietHandler, directory=directory)
+        server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        url = f"http://127.0.0.1:{server.server_port}/frame.html"
+
+        options = webdriver.ChromeOptions()
+        driver = webdriver.Chrome(options=options)
+        try:
+            start = time.perf_counter()
+            driver.get(url)
+            manager._inject_js_all_windows_and_frames(driver)
+            walk_time = time.perf_counter() - start
+            walk_count = driver.execute_script(COUNT_RECORDERS_JS)
+        finally:
+            driver.quit()
+
+        driver = manager._new_driver()
+        try:
+            start = time.perf_counter()
+            driver.get(url)
+            manager._register_frame_targets(driver)
+            cdp_time = time.perf_counter() - start
+            cdp_count = driver.execute_script(COUNT_RECORDERS_JS)
+        finally:
+            driver.quit()
+            server.shutdown()
+
+    print(f"Frame tree: depth={depth} fanout={fanout} documents={total}")
+    # Both timings cover page load plus getting the recorder into every frame
+    print(f"{'strategy':<24}{'load+inject (s)':>16}{'frames recording':>18}")
+    print(f"{'webdriver frame walk':<24}{walk_time:>16.3f}{walk_count:>18}")
+    print(f"{'cdp registration':<24}{cdp_time:>16.3f}{cdp_count:>18}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--depth", type=int, default=3)
+    parser.add_argument("--fanout", type=int, default=4)
+    args = parser.parse_args()
+    run(args.depth, args.fanout)
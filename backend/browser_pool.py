@@ -0,0 +1,190 @@
+import queue
+import threading
+import time
+
+
+class PooledDriver:
+    def __init__(self, driver):
+        self.driver = driver
+        self.created_at = time.time()
+        # Set while checked out: the window the driver started with, and the
+        # browser context the session runs in
+        self.home_window = None
+        self.context_id = None
+
+    def age(self):
+        return time.time() - self.created_at
+
+
+class BrowserPool:
+    """
+    Keeps `size` launched drivers warm so a session can start without paying the
+    Chrome cold start. Drivers are health-checked on checkout, recycled after
+    `max_age` seconds and reset on checkin. Each checkout runs in a fresh browser
+    context (Target.createBrowserContext), so cookies, storage and IndexedDB of
+    every origin the session visited go away with the context on checkin; a
+    driver whose context could not be created is quit instead of reused.
+    `factory` creates a new driver; `prepare(driver)` (optional) runs on each
+    checkout's new window, as CDP settings belong to one window.
+    AIAutoExecutor runs its replays on this pool too.
+    """
+    def __init__(self, factory, size=2, max_age=1800, prepare=None):
+        self.factory = factory
+        self.size = size
+        self.max_age = max_age
+        self.prepare = prepare
+        self.idle = queue.Queue()
+        self.checked_out = {}
+        self.lock = threading.Lock()
+        self.warming = 0
+        self.closed = False
+
+    def start(self):
+        self._refill()
+
+    def checkout(self):
+        while True:
+            try:
+                pooled = self.idle.get_nowait()
+            except queue.Empty:
+                pooled = self._launch()
+            if pooled.age() < self.max_age and self._is_healthy(pooled.driver):
+                break
+            self._quit(pooled.driver)
+        self._open_context(pooled)
+        if self.prepare:
+            self.prepare(pooled.driver)
+        with self.lock:
+            self.checked_out[id(pooled.driver)] = pooled
+        self._refill()
+        return pooled.driver
+
+    def checkin(self, driver):
+        with self.lock:
+            pooled = self.checked_out.pop(id(driver), None)
+        if (
+            pooled is None or self.closed
+            or pooled.age() >= self.max_age
+            or self.idle.qsize() >= self.size
+            or not self._reset(pooled)
+        ):
+            self._quit(driver)
+            self._refill()
+            return
+        self.idle.put(pooled)
+
+    def discard(self, driver):
+        with self.lock:
+            self.checked_out.pop(id(driver), None)
+        self._quit(driver)
+        self._refill()
+
+    def stats(self):
+        with self.lock:
+            return {
+                "size": self.size,
+                "idle": self.idle.qsize(),
+                "checked_out": len(self.checked_out),
+                "warming": self.warming,
+            }
+
+    def shutdown(self):
+        self.closed = True
+        while True:
+            try:
+                pooled = self.idle.get_nowait()
+            except queue.Empty:
+                break
+            self._quit(pooled.driver)
+
+    def _launch(self):
+        return PooledDriver(self.factory())
+
+    def _refill(self):
+        # Warm replacements in the background so checkout never waits on them
+        with self.lock:
+            missing = self.size - self.idle.qsize() - self.warming
+            if self.closed or missing <= 0:
+                return
+            self.warming += missing
+        for _ in range(missing):
+            threading.Thread(target=self._warm_one, daemon=True).start()
+
+    def _warm_one(self):
+        try:
+            pooled = self._launch()
+            if self.closed:
+                # Shut down while this one was starting
+                self._quit(pooled.driver)
+            else:
+                self.idle.put(pooled)
+        except Exception as e:
+            print(f"[POOL] Failed to warm browser: {e}")
+        finally:
+            with self.lock:
+                self.warming -= 1
+
+    def _is_healthy(self, driver):
+        try:
+            driver.current_window_handle
+            return True
+        except Exception:
+            return False
+
+    def _open_context(self, pooled):
+        # The session works in a new window of a new browser context; the home
+        # window stays on about:blank in the default context
+        driver = pooled.driver
+        pooled.home_window = driver.current_window_handle
+        context_id = None
+        try:
+            context_id = driver.execute_cdp_cmd("Target.createBrowserContext", {})["browserContextId"]
+            target_id = driver.execute_cdp_cmd(
+                "Target.createTarget", {"url": "about:blank", "browserContextId": context_id}
+            )["targetId"]
+            # ChromeDriver's window handles are DevTools target ids
+            driver.switch_to.window(target_id)
+            pooled.context_id = context_id
+        except Exception as e:
+            print(f"[POOL] Could not open a browser context, the driver will not be reused: {e}")
+            if context_id:
+                self._dispose_context(driver, context_id)
+            pooled.context_id = None
+
+    def _reset(self, pooled):
+        # Without its own context the session's data cannot be dropped reliably
+        if pooled.context_id is None:
+            return False
+        driver = pooled.driver
+        try:
+            driver.switch_to.window(pooled.home_window)
+            if not self._dispose_context(driver, pooled.context_id):
+                return False
+            pooled.context_id = None
+            # Windows the session opened in the default context (WebDriver new_window)
+            for handle in driver.window_handles:
+                if handle != pooled.home_window:
+                    driver.switch_to.window(handle)
+                    driver.close()
+            driver.switch_to.window(pooled.home_window)
+            driver.execute_cdp_cmd("Network.clearBrowserCookies", {})
+            if driver.current_url != "about:blank":
+                driver.get("about:blank")
+            return True
+        except Exception as e:
+            print(f"[POOL] Failed to reset browser, discarding it: {e}")
+            return False
+
+    def _dispose_context(self, driver, context_id):
+        try:
+            driver.execute_cdp_cmd("Target.disposeBrowserContext", {"browserContextId": context_id})
+            return True
+        except Exception as e:
+            print(f"[POOL] Failed to dispose browser context {context_id}: {e}")
+            return False
+
+    def _quit(self, driver):
+        try:
+            driver.quit()
+        except Exception:
+            pass
@@ -0,0 +1,53 @@
+"""
+Browser profiles for replay runs. A profile says how the browser is started
+(headless, window size) and what it does not load (images, fonts, third-party
+URLs). The profiles live in browser_profiles.json next to this module; the
+generated Java glue compiles every profile into its BrowserProfile class and
+AIAutoExecutor imports this module, so a profile name means the same browser
+everywhere.
+"""
+import json
+import os
+
+PROFILES_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "browser_profiles.json")
+
+with open(PROFILES_PATH, encoding="utf-8") as f:
+    _table = json.load(f)
+
+# Chrome URL patterns ("*" matches anything) for Network.setBlockedURLs
+FONT_URL_PATTERNS = _table["font_url_patterns"]
+THIRD_PARTY_URL_PATTERNS = _table["third_party_url_patterns"]
+
+# window_size None starts the window maximized; blocked_urls is blocked on top
+# of the fonts and third-party patterns switched on by block_fonts and
+# block_third_party
+BROWSER_PROFILES = _table["profiles"]
+
+
+def resolve_profile(profile):
+    """A profile name, or a dict overriding keys of the "default" profile."""
+    if isinstance(profile, str):
+        if profile not in BROWSER_PROFILES:
+            raise ValueError(f"Unknown browser profile {profile!r}")
+        return dict(BROWSER_PROFILES[profile])
+    return {**BROWSER_PROFILES["default"], **(profile or {})}
+
+
+def chrome_arguments(profile):
+    args = ["--disable-infobars", "--disable-extensions"]
+    if profile["headless"]:
+        args += ["--headless=new", "--disable-gpu", "--disable-dev-shm-usage"]
+    if profile["window_size"]:
+        args.append("--window-size={},{}".format(*profile["window_size"]))
+    else:
+        args.append("--start-maximized")
+    return args
+
+
+def blocked_url_patterns(profile):
+    patterns = list(profile["blocked_urls"])
+    if profile.get("block_third_party"):
+        patterns += THIRD_PARTY_URL_PATTERNS
+    if profile["block_fonts"]:
+        patterns += FONT_URL_PATTERNS
+    return patterns
@@ -0,0 +1,929 @@
+import hashlib
+import io
+import json
+import math
+import os
+import threading
+import zipfile
+
+from browser_profile import BROWSER_PROFILES, blocked_url_patterns, chrome_arguments
+
+INPUT_EVENTS = ["input", "change", "blur", "enter"]
+
+def feature_step(action):
+    event = action.get("eventType")
+    if event == "pageload":
+        return f'Given the page is loaded: "{action.get("actualValue","")}"'
+    if event == "click":
+        return f'When the user clicks on "{action.get("objectName","")}"'
+    if event in INPUT_EVENTS:
+        return f'And the user enters "{action.get("actualValue","")}" into "{action.get("objectName","")}"'
+    if event == "keepalive":
+        return "And session keepalive popup is handled automatically"
+    return None
+
+def feature_header(feature_name, scenario_outline):
+    return f"Feature: {feature_name}\n\n  Scenario: {scenario_outline or feature_name}\n    "
+
+def iter_feature_steps(actions):
+    first = True
+    for action in actions:
+        step = feature_step(action)
+        if step is None:
+            continue
+        yield step if first else "\n    " + step
+        first = False
+
+def iter_feature_file(actions, feature_name, scenario_outline):
+    yield feature_header(feature_name, scenario_outline)
+    yield from iter_feature_steps(actions)
+    yield "\n"
+
+def generate_feature_file(actions, object_repo, feature_name, scenario_outline):
+    return "".join(iter_feature_file(actions, feature_name, scenario_outline))
+
+def step_kind(action):
+    event = action.get("eventType")
+    if event in ("pageload", "click", "keepalive"):
+        return event
+    if event in INPUT_EVENTS:
+        return "input"
+    return None
+
+def step_kinds(actions):
+    """Step definition kinds in order of first use; the only part of the actions the step class depends on."""
+    kinds = []
+    for action in actions:
+        kind = step_kind(action)
+        if kind and kind not in kinds:
+            kinds.append(kind)
+    return kinds
+
+STEP_DEFINITIONS = {
+    "pageload": (
+        '    @Given("the page is loaded: {url}")\n'
+        '    public void page_loaded(String url) {\n'
+        '        driver.get(url);\n'
+        '    }\n'
+    ),
+    "click": (
+        '    @When("the user clicks on {object}")\n'
+        '    public void user_clicks_on(String object) {\n'
+        '        String xpath = (String)objectRepo.get(object).get("chosenXpath");\n'
+        '        driver.findElement(By.xpath(xpath)).click();\n'
+        '    }\n'
+    ),
+    "input": (
+        '    @And("the user enters {value} into {object}")\n'
+        '    public void user_enters(String value, String object) {\n'
+        '        String xpath = (String)objectRepo.get(object).get("chosenXpath");\n'
+        '        driver.findElement(By.xpath(xpath)).sendKeys(value);\n'
+        '    }\n'
+    ),
+    "keepalive": (
+        '    @And("session keepalive popup is handled automatically")\n'
+        '    public void session_keepalive_handled() { /* handled by KeepaliveHandler */ }\n'
+    ),
+}
+
+# Each file is parsed once per JVM and shared read-only by every scenario and thread
+DATA_HELPER_CLASS = """
+class DataHelper {
+    private static final Map<String, Map<String, Map<String, Object>>> OBJECT_REPOS =
+        new java.util.concurrent.ConcurrentHashMap<>();
+    private static final Map<String, Map<String, Object>> TEST_DATA =
+        new java.util.concurrent.ConcurrentHashMap<>();
+
+    public static Map<String, Map<String, Object>> loadObjectRepo(String path) {
+        return OBJECT_REPOS.computeIfAbsent(path, DataHelper::parseObjectRepo);
+    }
+    public static Map<String, Object> loadTestData(String path) {
+        return TEST_DATA.computeIfAbsent(path, DataHelper::parseTestData);
+    }
+    private static Map<String, Map<String, Object>> parseObjectRepo(String path) {
+        try {
+            String json = new String(java.nio.file.Files.readAllBytes(java.nio.file.Paths.get(path)));
+            org.json.JSONArray arr = new org.json.JSONArray(json);
+            Map<String, Map<String, Object>> map = new HashMap<>(arr.length() * 2);
+            for (int i = 0; i < arr.length(); i++) {
+                org.json.JSONObject o = arr.getJSONObject(i);
+                Map<String, Object> entry = new HashMap<>();
+                for(String k : o.keySet()) entry.put(k, o.get(k));
+                map.put(o.getString("objectName"), Collections.unmodifiableMap(entry));
+            }
+            return Collections.unmodifiableMap(map);
+        } catch (Exception e) { throw new RuntimeException(e); }
+    }
+    private static Map<String, Object> parseTestData(String path) {
+        try {
+            String json = new String(java.nio.file.Files.readAllBytes(java.nio.file.Paths.get(path)));
+            org.json.JSONArray arr = new org.json.JSONArray(json);
+            Map<String, Object> map = new HashMap<>(arr.length() * 2);
+            for (int i = 0; i < arr.length(); i++) {
+                org.json.JSONObject o = arr.getJSONObject(i);
+                map.put(o.getString("objectName"), o.get("actualValue"));
+            }
+            return Collections.unmodifiableMap(map);
+        } catch (Exception e) { throw new RuntimeException(e); }
+    }
+}
+"""
+
+
+def generate_java_step_definitions(feature_name, actions, object_repo, test_data):
+    return step_definitions_header(feature_name) + step_definitions_body(step_kinds(actions))
+
+def step_definitions_header(feature_name):
+    imports = (
+        "import io.cucumber.java.en.*;\n"
+        "import org.openqa.selenium.*;\n"
+        "import org.openqa.selenium.chrome.ChromeDriver;\n"
+        "import java.util.*;\n"
+        "import util.KeepaliveHandler;\n"
+    )
+    class_def = f"public class {feature_name.replace(' ', '')}Steps "+"{\n"
+    return imports + class_def
+
+def step_definitions_body(kinds):
+    # Everything after the class line; depends only on which step kinds are used
+    setup_vars = (
+        "    private WebDriver driver;\n"
+        "    private KeepaliveHandler keepaliveHandler;\n"
+        "    private Map<String, Map<String, Object>> objectRepo;\n"
+        "    private Map<String, Object> testData;\n"
+    )
+    before = (
+        "    @Before\n"
+        "    public void setUp() throws Exception {\n"
+        "        driver = new ChromeDriver();\n"
+        "        keepaliveHandler = new KeepaliveHandler(driver);\n"
+        "        keepaliveHandler.start();\n"
+        "        objectRepo = DataHelper.loadObjectRepo(\"generated/object_repo.json\");\n"
+        "        testData = DataHelper.loadTestData(\"generated/test_data.json\");\n"
+        "    }\n"
+    )
+    after = (
+        "    @After\n"
+        "    public void tearDown() {\n"
+        "        if (keepaliveHandler != null) keepaliveHandler.stop();\n"
+        "        if (driver != null) driver.quit();\n"
+        "    }\n"
+    )
+    step_lines = [STEP_DEFINITIONS[kind] for kind in kinds]
+    class_end = "}\n"
+    return setup_vars + before + after + "".join(step_lines) + class_end + DATA_HELPER_CLASS
+
+def generate_java_cucumber_runner(feature_name, features_dir="generated", glue=".", execution="serial"):
+    name = feature_name.replace(' ', '_').lower()
+    class_name = feature_name.replace(' ', '') + "Runner"
+    if execution == "parallel":
+        # JUnit Platform suite: the cucumber engine runs its scenarios concurrently as
+        # configured by junit-platform.properties; each runner gets its own report
+        return f"""import org.junit.platform.suite.api.ConfigurationParameter;
+import org.junit.platform.suite.api.IncludeEngines;
+import org.junit.platform.suite.api.SelectFile;
+import org.junit.platform.suite.api.Suite;
+
+@Suite
+@IncludeEngines("cucumber")
+@SelectFile("{features_dir}/{name}.feature")
+@ConfigurationParameter(key = "cucumber.glue", value = "{glue}")
+@ConfigurationParameter(key = "cucumber.plugin", value = "summary, html:target/cucumber-reports/{name}.html")
+public class {class_name} {{}}
+"""
+    return f"""import org.junit.runner.RunWith;
+import io.cucumber.junit.Cucumber;
+import io.cucumber.junit.CucumberOptions;
+
+@RunWith(Cucumber.class)
+@CucumberOptions(
+    features = "{features_dir}/{name}.feature",
+    glue = {{"{glue}"}},
+    plugin = {{"pretty", "html:target/cucumber-reports.html"}}
+)
+public class {class_name} {{}}
+"""
+
+# ---- Shared glue library ----
+
+# Package of the step definitions every feature shares in "shared" glue mode,
+# alongside the hand-written com.dhinki.bddgenerator.stepdefinitions glue
+SHARED_GLUE_PACKAGE = "com.dhinki.bddgenerator.generated"
+SHARED_GLUE_DIR = "src/test/java"
+
+def shared_glue_path(package, class_name):
+    return "/".join([SHARED_GLUE_DIR] + package.split(".") + [f"{class_name}.java"])
+
+SHARED_RESOURCES_DIR = "src/test/resources"
+
+SHARED_DATA_SOURCES = {
+    "json": (
+        '        objectRepo = DataHelper.loadObjectRepo(System.getProperty("bdd.objectRepo", "generated/object_repo.json"));\n'
+        '        testData = DataHelper.loadTestData(System.getProperty("bdd.testData", "generated/test_data.json"));\n'
+    ),
+    "precompiled": (
+        '        objectRepo = ObjectRepositoryIndex.OBJECTS;\n'
+        '        testData = ObjectRepositoryIndex.TEST_DATA;\n'
+    ),
+}
+
+# How the shared step definitions get and give back their browser: "serial" starts
+# one per scenario, "parallel" reuses one per worker thread through DriverFactory
+SHARED_DRIVER_LIFECYCLES = {
+    "serial": (
+        "        driver = BrowserProfile.start();\n",
+        "        if (driver != null) BrowserProfile.release(driver);\n",
+    ),
+    "parallel": (
+        "        driver = DriverFactory.get();\n",
+        "        if (driver != null) DriverFactory.reset();\n",
+    ),
+}
+
+def generate_shared_step_definitions(package=SHARED_GLUE_PACKAGE, data_mode="json", execution="serial"):
+    """
+    One step definitions class with every step kind. Its text never depends on a
+    feature, so it is written once per workspace and features only add their
+    feature file and runner. `data_mode` "precompiled" reads the object repository
+    and test data from the generated ObjectRepositoryIndex class instead of JSON;
+    `execution` "parallel" takes the browser from DriverFactory instead of
+    starting and quitting one per scenario.
+    """
+    acquire, release = SHARED_DRIVER_LIFECYCLES[execution]
+    return f"""package {package};
+
+import io.cucumber.java.After;
+import io.cucumber.java.Before;
+import io.cucumber.java.en.*;
+import org.openqa.selenium.*;
+import org.openqa.selenium.chrome.ChromeDriver;
+import java.util.*;
+import util.KeepaliveHandler;
+
+public class GeneratedSteps {{
+    private WebDriver driver;
+    private KeepaliveHandler keepaliveHandler;
+    private Map<String, Map<String, Object>> objectRepo;
+    private Map<String, Object> testData;
+    @Before
+    public void setUp() throws Exception {{
+{acquire}        keepaliveHandler = new KeepaliveHandler(driver);
+        keepaliveHandler.start();
+{SHARED_DATA_SOURCES[data_mode]}    }}
+    @After
+    public void tearDown() {{
+        if (keepaliveHandler != null) keepaliveHandler.stop();
+{release}    }}
+""" + "".join(STEP_DEFINITIONS.values()) + "}\n"
+
+def generate_shared_data_helper(package=SHARED_GLUE_PACKAGE):
+    return f"package {package};\n\nimport java.util.*;\n\npublic " + DATA_HELPER_CLASS.lstrip("\n")
+
+# Cucumber runs each scenario on one thread from start to finish, so a browser kept
+# per thread is never shared, and there are never more browsers than threads
+DRIVER_FACTORY_CLASS = """
+// Cucumber runs each scenario on one thread from start to finish, so a browser kept
+// per thread is never shared, and there are never more browsers than threads
+public final class DriverFactory {
+    private static final Queue<WebDriver> DRIVERS = new ConcurrentLinkedQueue<>();
+    private static final ThreadLocal<WebDriver> DRIVER = new ThreadLocal<>();
+    // The window each browser started with; getWindowHandles() has no order to find it by
+    private static final ThreadLocal<String> HOME_WINDOW = new ThreadLocal<>();
+
+    static {
+        Runtime.getRuntime().addShutdownHook(new Thread(() -> {
+            for (WebDriver driver : DRIVERS) {
+                try { driver.quit(); } catch (Exception ignored) { }
+            }
+        }));
+    }
+
+    private DriverFactory() { }
+
+    /** The calling thread's browser, started on first use. */
+    public static WebDriver get() {
+        WebDriver driver = DRIVER.get();
+        if (driver == null) {
+            driver = %(start)s;
+            DRIVERS.add(driver);
+            DRIVER.set(driver);
+            HOME_WINDOW.set(driver.getWindowHandle());
+        }
+        return driver;
+    }
+
+    /** Clears what one scenario left behind; a browser that no longer responds is quit and replaced on next use. */
+    public static void reset() {
+        WebDriver driver = DRIVER.get();
+        if (driver == null) return;
+%(sample)s        try {
+            String home = HOME_WINDOW.get();
+            for (String handle : driver.getWindowHandles()) {
+                if (!handle.equals(home)) {
+                    driver.switchTo().window(handle).close();
+                }
+            }
+            // A scenario that closed the home window leaves no window to reuse: the browser is replaced
+            driver.switchTo().window(home);
+            driver.manage().deleteAllCookies();
+            ((JavascriptExecutor) driver).executeScript(
+                "try { window.localStorage.clear(); window.sessionStorage.clear(); } catch (e) { }");
+            driver.get("about:blank");
+        } catch (WebDriverException e) {
+            discard();
+        }
+    }
+
+    /** Quits the calling thread's browser. */
+    public static void discard() {
+        WebDriver driver = DRIVER.get();
+        DRIVER.remove();
+        HOME_WINDOW.remove();
+        if (driver == null) return;
+        DRIVERS.remove(driver);
+        try { driver.quit(); } catch (Exception ignored) { }
+    }
+}
+"""
+
+# java-bdd's own utils.DriverFactory is this template with plain ChromeDrivers;
+# test_code_generator checks the two stay the same
+REPO_DRIVER_FACTORY_PACKAGE = "com.dhinki.bddgenerator.utils"
+REPO_DRIVER_FACTORY_PATH = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+    "java-bdd", "src", "main", "java", *REPO_DRIVER_FACTORY_PACKAGE.split("."), "DriverFactory.java",
+)
+
+def generate_driver_factory(package=SHARED_GLUE_PACKAGE, browser_profile=True):
+    """
+    Per-thread browsers for parallel scenarios. With `browser_profile` they are
+    started and sampled by the generated BrowserProfile class; without it they are
+    plain ChromeDrivers, as in java-bdd's utils.DriverFactory.
+    """
+    imports = [
+        "org.openqa.selenium.JavascriptExecutor",
+        "org.openqa.selenium.WebDriver",
+        "org.openqa.selenium.WebDriverException",
+    ]
+    if not browser_profile:
+        imports.append("org.openqa.selenium.chrome.ChromeDriver")
+    imports += ["java.util.*", "java.util.concurrent.ConcurrentLinkedQueue"]
+    return (
+        f"package {package};\n\n"
+        + "".join(f"import {name};\n" for name in imports)
+        + DRIVER_FACTORY_CLASS % {
+            "start": "BrowserProfile.start()" if browser_profile else "new ChromeDriver()",
+            "sample": "        BrowserProfile.sample(driver);\n" if browser_profile else "",
+        }
+    )
+
+BROWSER_PROFILE_CLASS = """
+/**
+ * How test browsers are started, chosen with -Dbdd.browserProfile=<name>. The
+ * run's time, browsers started and peak memory are printed when the JVM exits.
+ */
+public final class BrowserProfile {
+    private static final Map<String, BrowserProfile> PROFILES = new LinkedHashMap<>();
+    private static final long RUN_STARTED = System.nanoTime();
+    private static final AtomicInteger BROWSERS = new AtomicInteger();
+    private static final AtomicLong PEAK_JS_HEAP = new AtomicLong();
+
+    static {
+%(profiles)s        Runtime.getRuntime().addShutdownHook(new Thread(BrowserProfile::report));
+    }
+
+    private final List<String> arguments;
+    private final boolean blockImages;
+    private final List<String> blockedUrls;
+
+    private BrowserProfile(List<String> arguments, boolean blockImages, List<String> blockedUrls) {
+        this.arguments = arguments;
+        this.blockImages = blockImages;
+        this.blockedUrls = blockedUrls;
+    }
+
+    public static BrowserProfile current() {
+        String name = System.getProperty("bdd.browserProfile", %(default)s);
+        BrowserProfile profile = PROFILES.get(name);
+        if (profile == null) {
+            throw new IllegalArgumentException("Unknown browser profile " + name + ", expected one of " + PROFILES.keySet());
+        }
+        return profile;
+    }
+
+    /** A new browser started with the current profile. */
+    public static WebDriver start() {
+        return current().newDriver();
+    }
+
+    /** Records the browser's memory, then quits it. */
+    public static void release(WebDriver driver) {
+        sample(driver);
+        try { driver.quit(); } catch (Exception ignored) { }
+    }
+
+    public WebDriver newDriver() {
+        ChromeOptions options = new ChromeOptions();
+        options.addArguments(arguments);
+        if (blockImages) {
+            options.setExperimentalOption("prefs", Map.of("profile.managed_default_content_settings.images", 2));
+        }
+        ChromeDriver driver = new ChromeDriver(options);
+        BROWSERS.incrementAndGet();
+        driver.executeCdpCommand("Performance.enable", new HashMap<>());
+        if (!blockedUrls.isEmpty()) {
+            driver.executeCdpCommand("Network.enable", new HashMap<>());
+            driver.executeCdpCommand("Network.setBlockedURLs", Map.of("urls", blockedUrls));
+        }
+        return driver;
+    }
+
+    /** Keeps the largest JS heap seen in any browser; never fails the scenario. */
+    @SuppressWarnings("unchecked")
+    public static void sample(WebDriver driver) {
+        if (!(driver instanceof ChromeDriver)) return;
+        try {
+            Map<String, Object> result = ((ChromeDriver) driver).executeCdpCommand("Performance.getMetrics", new HashMap<>());
+            for (Map<String, Object> metric : (List<Map<String, Object>>) result.get("metrics")) {
+                if ("JSHeapUsedSize".equals(metric.get("name"))) {
+                    PEAK_JS_HEAP.accumulateAndGet(((Number) metric.get("value")).longValue(), Math::max);
+                }
+            }
+        } catch (Exception ignored) { }
+    }
+
+    private static void report() {
+        long heap = 0;
+        for (MemoryPoolMXBean pool : ManagementFactory.getMemoryPoolMXBeans()) {
+            if (pool.getType() == MemoryType.HEAP) heap += pool.getPeakUsage().getUsed();
+        }
+        System.out.printf(
+            "[BDD] browser profile %%s: %%d browser(s), %%.1f s, peak JVM heap %%.1f MB, peak browser JS heap %%.1f MB%%n",
+            System.getProperty("bdd.browserProfile", %(default)s), BROWSERS.get(),
+            (System.nanoTime() - RUN_STARTED) / 1e9, heap / 1048576.0, PEAK_JS_HEAP.get() / 1048576.0);
+    }
+}
+"""
+
+def java_string_list(values):
+    return "List.of(" + ", ".join(json.dumps(value) for value in values) + ")"
+
+def generate_browser_profile(package=SHARED_GLUE_PACKAGE, default_profile="default"):
+    """Every profile in browser_profile.BROWSER_PROFILES, `default_profile` used unless -Dbdd.browserProfile says otherwise."""
+    profiles = "".join(
+        f"        PROFILES.put({json.dumps(name)}, new BrowserProfile(\n"
+        f"            {java_string_list(chrome_arguments(profile))},\n"
+        f"            {'true' if profile['block_images'] else 'false'},\n"
+        f"            {java_string_list(blocked_url_patterns(profile))}));\n"
+        for name, profile in BROWSER_PROFILES.items()
+    )
+    return (
+        f"package {package};\n\n"
+        "import org.openqa.selenium.WebDriver;\n"
+        "import org.openqa.selenium.chrome.ChromeDriver;\n"
+        "import org.openqa.selenium.chrome.ChromeOptions;\n"
+        "import java.lang.management.ManagementFactory;\n"
+        "import java.lang.management.MemoryPoolMXBean;\n"
+        "import java.lang.management.MemoryType;\n"
+        "import java.util.*;\n"
+        "import java.util.concurrent.atomic.AtomicInteger;\n"
+        "import java.util.concurrent.atomic.AtomicLong;\n"
+    ) + BROWSER_PROFILE_CLASS % {"profiles": profiles, "default": json.dumps(default_profile)}
+
+def generate_junit_platform_properties():
+    # Picked up from the test classpath by every JUnit Platform runner; a -D system
+    # property of the same name overrides a value here
+    return (
+        "# Scenarios run concurrently, one thread (and browser) per CPU core\n"
+        "cucumber.execution.parallel.enabled=true\n"
+        "cucumber.execution.parallel.config.strategy=dynamic\n"
+        "cucumber.execution.parallel.config.dynamic.factor=1\n"
+    )
+
+# Entries per generated initializer method, well below the JVM's 64KB method size limit
+INDEX_ENTRIES_PER_METHOD = 100
+
+def java_literal(value):
+    # JSON string escapes (ASCII only, \n not \u000a) are valid Java string literals
+    if isinstance(value, bool):
+        return "Boolean.TRUE" if value else "Boolean.FALSE"
+    if isinstance(value, int):
+        return f"{value}L" if abs(value) > 2**31 - 1 else str(value)
+    if isinstance(value, float) and math.isfinite(value):
+        return repr(value) + "d"
+    if isinstance(value, str):
+        return json.dumps(value)
+    # Nested lists/objects are kept as their JSON text
+    return json.dumps(json.dumps(value))
+
+def generate_object_repository_index(object_repo, test_data, package=SHARED_GLUE_PACKAGE):
+    """
+    The object repository and test data compiled into a Java class, so a run does
+    no JSON parsing at all. Class initialization is lazy and thread-safe, and the
+    maps are read-only. Null values are left out.
+    """
+    def index_methods(prefix, map_type, lines):
+        methods = []
+        for start in range(0, len(lines), INDEX_ENTRIES_PER_METHOD):
+            name = f"{prefix}{start // INDEX_ENTRIES_PER_METHOD}"
+            body = "".join(f"        m.put({line});\n" for line in lines[start:start + INDEX_ENTRIES_PER_METHOD])
+            methods.append((name, f"    private static void {name}({map_type} m) {{\n{body}    }}\n"))
+        return methods
+
+    object_lines = []
+    for entry in object_repo:
+        name = entry.get("objectName")
+        if name is None:
+            continue
+        fields = ", ".join(f"{json.dumps(k)}, {java_literal(v)}" for k, v in entry.items() if v is not None)
+        object_lines.append(f"{java_literal(name)}, entry({fields})")
+    data_lines = [
+        f"{java_literal(entry['objectName'])}, {java_literal(entry.get('actualValue'))}"
+        for entry in test_data
+        if entry.get("objectName") is not None and entry.get("actualValue") is not None
+    ]
+    object_methods = index_methods("objects", "Map<String, Map<String, Object>>", object_lines)
+    data_methods = index_methods("testData", "Map<String, Object>", data_lines)
+    calls = lambda methods, var: "".join(f"        {name}({var});\n" for name, _ in methods)
+    return (
+        f"package {package};\n\n"
+        "import java.util.*;\n\n"
+        "public final class ObjectRepositoryIndex {\n"
+        "    public static final Map<String, Map<String, Object>> OBJECTS;\n"
+        "    public static final Map<String, Object> TEST_DATA;\n\n"
+        "    static {\n"
+        f"        Map<String, Map<String, Object>> objects = new HashMap<>({max(len(object_lines) * 2, 16)});\n"
+        + calls(object_methods, "objects") +
+        "        OBJECTS = Collections.unmodifiableMap(objects);\n"
+        f"        Map<String, Object> testData = new HashMap<>({max(len(data_lines) * 2, 16)});\n"
+        + calls(data_methods, "testData") +
+        "        TEST_DATA = Collections.unmodifiableMap(testData);\n"
+        "    }\n\n"
+        "    private ObjectRepositoryIndex() {}\n\n"
+        "    private static Map<String, Object> entry(Object... keysAndValues) {\n"
+        "        Map<String, Object> entry = new HashMap<>(keysAndValues.length);\n"
+        "        for (int i = 0; i < keysAndValues.length; i += 2) entry.put((String) keysAndValues[i], keysAndValues[i + 1]);\n"
+        "        return Collections.unmodifiableMap(entry);\n"
+        "    }\n"
+        + "".join(method for _, method in object_methods + data_methods) +
+        "}\n"
+    )
+
+
+# ---- Generation pipeline ----
+
+# Bump when a generator's output changes so existing manifests stop matching
+GENERATOR_VERSION = 3
+MANIFEST_NAME = ".manifest.json"
+WRITE_CHUNK_SIZE = 64 * 1024
+
+
+def iter_json_array(items):
+    """Same text as json.dump(items, f, indent=2), one item at a time."""
+    if not items:
+        yield "[]"
+        return
+    yield "[\n"
+    for idx, item in enumerate(items):
+        text = "  " + json.dumps(item, indent=2).replace("\n", "\n  ")
+        yield text if idx == 0 else ",\n" + text
+    yield "\n]"
+
+
+def fingerprint(*inputs):
+    digest = hashlib.sha256(str(GENERATOR_VERSION).encode())
+    for value in inputs:
+        digest.update(json.dumps(value, sort_keys=True, separators=(",", ":")).encode())
+    return digest.hexdigest()
+
+
+class Cached:
+    """A segment of an artifact that is looked up in the generation cache under `key` before rendering."""
+    def __init__(self, key, render):
+        self.key = key
+        self.render = render
+
+
+class Artifact:
+    """
+    One generated file. `inputs` fingerprints exactly what its content depends on.
+    `segments` are literal strings (cheap parts such as names) and Cached segments
+    whose `render` returns an iterator of text chunks.
+    """
+    def __init__(self, name, kind, inputs, segments):
+        self.name = name
+        self.kind = kind
+        self.inputs = inputs
+        self.segments = segments
+
+
+def feature_base(feature_name):
+    return feature_name.replace(' ', '_').lower()
+
+
+def json_artifact(name, kind, items):
+    return Artifact(name, kind, fingerprint(items), [
+        Cached(fingerprint("json", items), lambda: iter_json_array(items)),
+    ])
+
+
+def feature_artifact(actions, feature_name, scenario_outline):
+    return Artifact(f"{feature_base(feature_name)}.feature", "feature_file",
+                    fingerprint(feature_name, scenario_outline, actions), [
+        feature_header(feature_name, scenario_outline),
+        Cached(fingerprint("feature_steps", actions), lambda: iter_feature_steps(actions)),
+        "\n",
+    ])
+
+
+def steps_artifact(feature_name, kinds):
+    return Artifact(f"{feature_base(feature_name)}_Steps.java", "step_definitions",
+                    fingerprint(feature_name, kinds), [
+        step_definitions_header(feature_name),
+        Cached(fingerprint("step_definitions_body", kinds), lambda: iter([step_definitions_body(kinds)])),
+    ])
+
+
+def runner_artifact(feature_name, features_dir="generated", glue=".", execution="serial"):
+    return Artifact(f"{feature_base(feature_name)}_Runner.java", "runner",
+                    fingerprint(feature_name, features_dir, glue, execution), [
+        Cached(fingerprint("runner", feature_name, features_dir, glue, execution),
+               lambda: iter([generate_java_cucumber_runner(feature_name, features_dir, glue, execution)])),
+    ])
+
+
+def shared_glue_artifacts(package=SHARED_GLUE_PACKAGE, data_mode="json", object_repo=None, test_data=None,
+                          execution="serial", browser_profile="default"):
+    artifacts = [
+        Artifact(shared_glue_path(package, "GeneratedSteps"), "shared_step_definitions",
+                 fingerprint(package, data_mode, execution), [
+            Cached(fingerprint("shared_steps", package, data_mode, execution),
+                   lambda: iter([generate_shared_step_definitions(package, data_mode, execution)])),
+        ]),
+        Artifact(shared_glue_path(package, "DataHelper"), "shared_data_helper", fingerprint(package), [
+            Cached(fingerprint("shared_data_helper", package), lambda: iter([generate_shared_data_helper(package)])),
+        ]),
+        Artifact(shared_glue_path(package, "BrowserProfile"), "browser_profile",
+                 fingerprint(package, browser_profile, BROWSER_PROFILES), [
+            Cached(fingerprint("browser_profile", package, browser_profile, BROWSER_PROFILES),
+                   lambda: iter([generate_browser_profile(package, browser_profile)])),
+        ]),
+    ]
+    if execution == "parallel":
+        artifacts += [
+            Artifact(shared_glue_path(package, "DriverFactory"), "driver_factory", fingerprint(package), [
+                Cached(fingerprint("driver_factory", package), lambda: iter([generate_driver_factory(package)])),
+            ]),
+            Artifact(f"{SHARED_RESOURCES_DIR}/junit-platform.properties", "junit_platform_properties",
+                     fingerprint(), [
+                Cached(fingerprint("junit_platform_properties"), lambda: iter([generate_junit_platform_properties()])),
+            ]),
+        ]
+    if data_mode == "precompiled":
+        object_repo, test_data = object_repo or [], test_data or []
+        artifacts.append(Artifact(
+            shared_glue_path(package, "ObjectRepositoryIndex"), "object_repository_index",
+            fingerprint(package, object_repo, test_data), [
+                Cached(fingerprint("object_repository_index", package, object_repo, test_data),
+                       lambda: iter([generate_object_repository_index(object_repo, test_data, package)])),
+            ]))
+    return artifacts
+
+
+def build_artifacts(actions, object_repo, test_data, feature_name, scenario_outline,
+                    glue_mode="per_feature", glue_package=SHARED_GLUE_PACKAGE, data_mode="json",
+                    execution="serial", browser_profile="default"):
+    """
+    Artifacts for one feature. In "per_feature" glue mode the feature gets its own
+    step definitions class; in "shared" mode it only gets its feature file and a
+    runner whose glue is `glue_package`, and the shared library is emitted (and
+    skipped once unchanged) alongside; with `data_mode` "precompiled" that includes
+    the object repository and test data compiled into a Java class, and with
+    `execution` "parallel" a per-thread DriverFactory, a JUnit Platform runner and
+    the junit-platform.properties that run scenarios concurrently. The shared
+    library starts browsers with `browser_profile` (see browser_profile.py).
+    """
+    # Segment keys leave out the feature name wherever the text does not contain it,
+    # so renaming a feature only re-renders the runner and the two header lines
+    artifacts = [
+        json_artifact("actions.json", "actions_json", actions),
+        json_artifact("object_repo.json", "object_repo_json", object_repo),
+        json_artifact("test_data.json", "test_data_json", test_data),
+        feature_artifact(actions, feature_name, scenario_outline),
+    ]
+    if glue_mode == "shared":
+        runner = runner_artifact(feature_name, glue=glue_package, execution=execution)
+        return artifacts + [runner] + shared_glue_artifacts(
+            glue_package, data_mode, object_repo, test_data, execution, browser_profile
+        )
+    return artifacts + [steps_artifact(feature_name, step_kinds(actions)), runner_artifact(feature_name)]
+
+
+def iter_segments(artifact, cache, outcome):
+    """Text chunks of an artifact, served from `cache` where possible and stored into it otherwise."""
+    for segment in artifact.segments:
+        if isinstance(segment, str):
+            yield segment
+            continue
+        text = cache.get(segment.key) if cache else None
+        if text is not None:
+            outcome["hits"] += 1
+            for start in range(0, len(text), WRITE_CHUNK_SIZE):
+                yield text[start:start + WRITE_CHUNK_SIZE]
+            continue
+        outcome["misses"] += 1
+        parts = []
+        kept = 0
+        for text in segment.render():
+            # Stop collecting once the segment is too large to cache; keep streaming it
+            if parts is not None:
+                kept += len(text)
+                if cache and kept <= cache.max_entry_bytes:
+                    parts.append(text)
+                else:
+                    parts = None
+            yield text
+        if cache and parts is not None:
+            cache.put(segment.key, "".join(parts))
+
+
+class GenerationManifest:
+    """
+    Input fingerprint, content hash and size of every file last generated into
+    `directory`, kept in a JSON file next to them. When several features are
+    generated into one directory, each entry also lists the features ("owners")
+    whose latest run included the file.
+    """
+    def __init__(self, directory):
+        self.path = os.path.join(directory, MANIFEST_NAME)
+        self.lock = threading.Lock()
+
+    def load(self):
+        try:
+            with open(self.path) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def is_current(self, directory, artifact):
+        entry = self.load().get(artifact.name)
+        if not entry or entry.get("inputs") != artifact.inputs:
+            return False
+        try:
+            return os.path.getsize(os.path.join(directory, artifact.name)) == entry.get("size")
+        except OSError:
+            return False
+
+    def record(self, name, entry):
+        with self.lock:
+            entries = self.load()
+            owners = entries.get(name, {}).get("owners")
+            entries[name] = entry if owners is None else {**entry, "owners": owners}
+            self._save(entries)
+
+    def prune(self, directory, keep, owner=None):
+        """
+        Deletes recorded files not named in `keep`, and directories they leave
+        empty, and drops them from the manifest. Returns the deleted names.
+        Without `owner` every such file goes. With one, `keep` is that owner's
+        run: the files are marked as its own, and a file left out stops being
+        its own and is deleted only once no other owner has it.
+        """
+        with self.lock:
+            entries = self.load()
+            stale = []
+            for name, entry in entries.items():
+                if owner is None:
+                    if name not in keep:
+                        stale.append(name)
+                    continue
+                owners = entry.get("owners", [])
+                if name in keep and owner not in owners:
+                    entry["owners"] = owners + [owner]
+                elif name not in keep and owner in owners:
+                    owners.remove(owner)
+                    if not owners:
+                        stale.append(name)
+            for name in stale:
+                del entries[name]
+                path = os.path.join(directory, name)
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    pass
+                parent = os.path.dirname(path)
+                while os.path.abspath(parent) != os.path.abspath(directory):
+                    try:
+                        os.rmdir(parent)
+                    except OSError:
+                        break
+                    parent = os.path.dirname(parent)
+            if stale or owner is not None:
+                self._save(entries)
+        return stale
+
+    def _save(self, entries):
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(entries, f, indent=2)
+        os.replace(tmp_path, self.path)
+
+
+_manifests = {}
+_manifests_lock = threading.Lock()
+
+def get_manifest(directory):
+    with _manifests_lock:
+        return _manifests.setdefault(os.path.abspath(directory), GenerationManifest(directory))
+
+def forget_manifest(directory):
+    with _manifests_lock:
+        _manifests.pop(os.path.abspath(directory), None)
+
+
+def stream_artifacts(artifacts, directory, cache=None, owner=None):
+    """
+    Writes each artifact to `directory` while yielding its chunks, so neither the
+    caller nor this function holds a whole file in memory. Artifacts whose input
+    fingerprint matches the manifest are not regenerated; their existing file is
+    streamed instead. Other artifacts take their segments from `cache` (a
+    GenerationCache) when it has them. Yields ("start", artifact, status), ("chunk", artifact, text)
+    and ("end", artifact, info) events. `artifacts` is everything `directory` should
+    hold for `owner` (the feature they are generated for, None when the directory
+    holds a single run): once all are through, files an earlier run of that owner
+    generated there that are not among them (another glue, data or execution mode)
+    are deleted, unless another owner's latest run still includes them.
+    """
+    manifest = get_manifest(directory)
+    for artifact in artifacts:
+        path = os.path.join(directory, artifact.name)
+        if manifest.is_current(directory, artifact):
+            yield "start", artifact, "unchanged"
+            with open(path, encoding="utf-8", newline="") as f:
+                while True:
+                    text = f.read(WRITE_CHUNK_SIZE)
+                    if not text:
+                        break
+                    yield "chunk", artifact, text
+            yield "end", artifact, {"path": path, "status": "unchanged", **manifest.load()[artifact.name]}
+            continue
+
+        yield "start", artifact, "written"
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        outcome = {"hits": 0, "misses": 0}
+        digest = hashlib.sha256()
+        size = 0
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        try:
+            with open(tmp_path, "w", encoding="utf-8", newline="") as f:
+                for text in iter_segments(artifact, cache, outcome):
+                    data = text.encode("utf-8")
+                    digest.update(data)
+                    size += len(data)
+                    f.write(text)
+                    yield "chunk", artifact, text
+            os.replace(tmp_path, path)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+        entry = {"inputs": artifact.inputs, "sha256": digest.hexdigest(), "size": size}
+        manifest.record(artifact.name, entry)
+        yield "end", artifact, {"path": path, "status": "written", "cache": outcome, **entry}
+    manifest.prune(directory, {artifact.name for artifact in artifacts}, owner)
+
+
+class _ZipSink:
+    # Write-only buffer for ZipFile: everything written since the last take() is handed out
+    def __init__(self):
+        self.buffer = io.BytesIO()
+
+    def write(self, data):
+        return self.buffer.write(data)
+
+    def flush(self):
+        pass
+
+    def take(self):
+        data = self.buffer.getvalue()
+        self.buffer.seek(0)
+        self.buffer.truncate()
+        return data
+
+
+def iter_zip(events):
+    """Turns stream_artifacts() events into a zip archive streamed in chunks."""
+    sink = _ZipSink()
+    with zipfile.ZipFile(sink, "w", compression=zipfile.ZIP_DEFLATED) as archive:
+        entry = None
+        for event, artifact, value in events:
+            if event == "start":
+                entry = archive.open(artifact.name, "w", force_zip64=True)
+            elif event == "chunk":
+                entry.write(value.encode("utf-8"))
+            else:
+                entry.close()
+                entry = None
+            data = sink.take()
+            if data:
+                yield data
+    yield sink.take()
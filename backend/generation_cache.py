@@ -0,0 +1,133 @@
+import os
+import threading
+from collections import OrderedDict
+
+
+class GenerationCache:
+    """
+    Content-addressed cache of generated text. Keys are fingerprints of exactly the
+    inputs the text depends on, so an entry never goes stale and is shared by every
+    feature that renders the same thing. The most recently used entries stay in
+    memory up to `max_memory_bytes`; older ones spill to `directory` and are
+    dropped oldest-first once the spill exceeds `max_disk_bytes`.
+    """
+    def __init__(self, directory, max_memory_bytes=16 * 1024 * 1024, max_disk_bytes=256 * 1024 * 1024,
+                 max_entry_bytes=4 * 1024 * 1024):
+        self.directory = directory
+        self.max_memory_bytes = max_memory_bytes
+        self.max_disk_bytes = max_disk_bytes
+        self.max_entry_bytes = max_entry_bytes
+        self.memory = OrderedDict()
+        self.memory_bytes = 0
+        self.disk = OrderedDict()
+        self.disk_bytes = 0
+        self.lock = threading.Lock()
+        self.counters = {"memory_hits": 0, "disk_hits": 0, "misses": 0, "stores": 0, "spills": 0, "disk_evictions": 0}
+        os.makedirs(directory, exist_ok=True)
+        self._scan_disk()
+
+    def get(self, key):
+        with self.lock:
+            text = self.memory.get(key)
+            if text is not None:
+                self.memory.move_to_end(key)
+                self.counters["memory_hits"] += 1
+                return text
+            if key not in self.disk:
+                self.counters["misses"] += 1
+                return None
+        try:
+            with open(self._path(key), encoding="utf-8", newline="") as f:
+                text = f.read()
+        except OSError:
+            with self.lock:
+                self._forget_disk(key)
+                self.counters["misses"] += 1
+            return None
+        with self.lock:
+            self.counters["disk_hits"] += 1
+            self._remember(key, text)
+        return text
+
+    def put(self, key, text):
+        if len(text) > self.max_entry_bytes:
+            return
+        with self.lock:
+            self.counters["stores"] += 1
+            self._remember(key, text)
+
+    def stats(self):
+        with self.lock:
+            lookups = self.counters["memory_hits"] + self.counters["disk_hits"] + self.counters["misses"]
+            hits = lookups - self.counters["misses"]
+            return {
+                **self.counters,
+                "hit_rate": round(hits / lookups, 3) if lookups else None,
+                "memory_entries": len(self.memory),
+                "memory_bytes": self.memory_bytes,
+                "disk_entries": len(self.disk),
+                "disk_bytes": self.disk_bytes,
+            }
+
+    def _path(self, key):
+        return os.path.join(self.directory, key[:2], key)
+
+    def _remember(self, key, text):
+        # Caller holds the lock
+        if key in self.memory:
+            self.memory.move_to_end(key)
+            return
+        self.memory[key] = text
+        self.memory_bytes += len(text)
+        while self.memory_bytes > self.max_memory_bytes and len(self.memory) > 1:
+            old_key, old_text = self.memory.popitem(last=False)
+            self.memory_bytes -= len(old_text)
+            self._spill(old_key, old_text)
+
+    def _spill(self, key, text):
+        if key in self.disk:
+            self.disk.move_to_end(key)
+            return
+        path = self._path(key)
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp_path = f"{path}.tmp"
+            with open(tmp_path, "w", encoding="utf-8", newline="") as f:
+                f.write(text)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            print(f"[GENERATION-CACHE] Could not spill {key}: {e}")
+            return
+        size = len(text.encode("utf-8"))
+        self.disk[key] = size
+        self.disk_bytes += size
+        self.counters["spills"] += 1
+        while self.disk_bytes > self.max_disk_bytes and self.disk:
+            old_key = next(iter(self.disk))
+            self._forget_disk(old_key)
+            self.counters["disk_evictions"] += 1
+            try:
+                os.remove(self._path(old_key))
+            except OSError:
+                pass
+
+    def _forget_disk(self, key):
+        size = self.disk.pop(key, None)
+        if size is not None:
+            self.disk_bytes -= size
+
+    def _scan_disk(self):
+        # Entries spilled by an earlier process, oldest first
+        entries = []
+        for root, _, files in os.walk(self.directory):
+            for name in files:
+                if name.endswith(".tmp"):
+                    continue
+                try:
+                    stat = os.stat(os.path.join(root, name))
+                except OSError:
+                    continue
+                entries.append((stat.st_mtime, name, stat.st_size))
+        for _, key, size in sorted(entries):
+            self.disk[key] = size
+            self.disk_bytes += size
@@ -0,0 +1,244 @@
+import json
+import os
+import shutil
+import threading
+import time
+from uuid import uuid4
+
+from code_generator import forget_manifest, get_manifest
+
+JOB_FILE = "job.json"
+
+
+class JobBusyError(Exception):
+    pass
+
+
+class GenerationJob:
+    """
+    One generation run and the workspace directory it writes into. Regenerating
+    into an existing job reuses its workspace, so unchanged artifacts are skipped.
+    """
+    def __init__(self, job_id, workspace, feature_name=None, created_at=None):
+        self.job_id = job_id
+        self.workspace = workspace
+        self.feature_name = feature_name
+        self.status = "pending"
+        self.error = None
+        self.artifacts = {}
+        self.created_at = created_at or time.time()
+        self.updated_at = self.created_at
+        self.lock = threading.Lock()
+
+    def to_dict(self):
+        return {
+            "job_id": self.job_id,
+            "status": self.status,
+            "feature_name": self.feature_name,
+            "error": self.error,
+            "artifacts": dict(self.artifacts),
+            "created_at": self.created_at,
+            "updated_at": self.updated_at,
+        }
+
+    @classmethod
+    def load(cls, workspace):
+        with open(os.path.join(workspace, JOB_FILE)) as f:
+            data = json.load(f)
+        job = cls(data["job_id"], workspace, data.get("feature_name"), data.get("created_at"))
+        job.status = data.get("status", "done")
+        if job.status in ("pending", "running"):
+            # The process that ran it is gone
+            job.status = "failed"
+            job.error = job.error or "interrupted"
+        else:
+            job.error = data.get("error")
+        job.artifacts = data.get("artifacts", {})
+        job.updated_at = data.get("updated_at", job.created_at)
+        return job
+
+    def save(self):
+        path = os.path.join(self.workspace, JOB_FILE)
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(self.to_dict(), f, indent=2)
+        os.replace(tmp_path, path)
+
+
+class JobStore:
+    """
+    Generation jobs under `root`, one workspace directory each. Finished jobs are
+    removed once older than `retention` seconds or when more than `max_jobs`
+    exist; running jobs are never collected.
+    """
+    def __init__(self, root, retention=86400, max_jobs=200):
+        self.root = root
+        self.retention = retention
+        self.max_jobs = max_jobs
+        self.jobs = {}
+        self.lock = threading.Lock()
+        os.makedirs(root, exist_ok=True)
+        self._load_existing()
+
+    def create(self, feature_name=None):
+        job_id = uuid4().hex
+        workspace = os.path.join(self.root, job_id)
+        os.makedirs(workspace)
+        job = GenerationJob(job_id, workspace, feature_name)
+        job.save()
+        with self.lock:
+            self.jobs[job_id] = job
+        return job
+
+    def get(self, job_id):
+        with self.lock:
+            return self.jobs.get(job_id)
+
+    def list(self):
+        with self.lock:
+            jobs = list(self.jobs.values())
+        return [job.to_dict() for job in sorted(jobs, key=lambda j: j.created_at, reverse=True)]
+
+    def begin(self, job, feature_name=None):
+        if not job.lock.acquire(blocking=False):
+            raise JobBusyError(f"Job {job.job_id} is already generating.")
+        job.status = "running"
+        job.error = None
+        job.feature_name = feature_name or job.feature_name
+        job.updated_at = time.time()
+        job.save()
+
+    def record_artifact(self, job, name, info):
+        job.artifacts[name] = info
+        job.updated_at = time.time()
+
+    def finish(self, job, status, error=None):
+        job.status = status
+        job.error = error
+        job.updated_at = time.time()
+        try:
+            job.save()
+        finally:
+            job.lock.release()
+
+    def track(self, job, events):
+        """
+        Passes stream_artifacts() events through, recording each artifact and the
+        outcome on `job`. The returned generator is already started, so closing it
+        (or dropping it) before the first event still finishes the job.
+        """
+        return self._primed(self._track(job, events))
+
+    def track_batch(self, job, events):
+        """Like track(), for batch_generator.run_batch() events; artifacts are recorded as <feature>/<file>."""
+        return self._primed(self._track_batch(job, events))
+
+    def _primed(self, tracked):
+        # Runs up to the bare yield inside the try block that finishes the job
+        next(tracked)
+        return tracked
+
+    def _track(self, job, events):
+        status, error = "failed", None
+        generated = set()
+        try:
+            yield
+            for event in events:
+                kind, artifact, value = event
+                if kind == "end":
+                    generated.add(artifact.name)
+                    self.record_artifact(job, artifact.name, {
+                        k: value[k] for k in ("status", "sha256", "size", "cache") if k in value
+                    })
+                yield event
+            # Files of other features generated into the job are still there
+            self._keep_artifacts(job, generated | set(get_manifest(job.workspace).load()))
+            status = "done"
+        except GeneratorExit:
+            error = "cancelled"
+            raise
+        except Exception as e:
+            error = str(e)
+            raise
+        finally:
+            self.finish(job, status, error)
+
+    def _track_batch(self, job, events):
+        status, error = "failed", None
+        generated = set()
+        try:
+            yield
+            for event in events:
+                if event["event"] == "feature" and event["status"] == "success":
+                    for name, info in event["files"].items():
+                        generated.add(f"{event['base']}/{name}")
+                        self.record_artifact(job, f"{event['base']}/{name}", info)
+                elif event["event"] == "shared":
+                    for name, info in event["files"].items():
+                        generated.add(name)
+                        self.record_artifact(job, name, info)
+                yield event
+            self._keep_artifacts(job, generated)
+            status = "done"
+        except GeneratorExit:
+            error = "cancelled"
+            raise
+        except Exception as e:
+            error = str(e)
+            raise
+        finally:
+            self.finish(job, status, error)
+
+    def _keep_artifacts(self, job, names):
+        # A finished run replaces the listing: files of an earlier run in another mode are gone from disk
+        job.artifacts = {name: info for name, info in job.artifacts.items() if name in names}
+
+    def delete(self, job_id):
+        with self.lock:
+            job = self.jobs.get(job_id)
+            if job is None or job.status == "running":
+                return False
+            del self.jobs[job_id]
+        self._remove_workspace(job)
+        return True
+
+    def gc(self):
+        now = time.time()
+        with self.lock:
+            finished = sorted(
+                (job for job in self.jobs.values() if job.status not in ("pending", "running")),
+                key=lambda j: j.updated_at,
+            )
+            expired = [job for job in finished if now - job.updated_at > self.retention]
+            overflow = len(self.jobs) - len(expired) - self.max_jobs
+            if overflow > 0:
+                expired += [job for job in finished if job not in expired][:overflow]
+            for job in expired:
+                del self.jobs[job.job_id]
+        for job in expired:
+            self._remove_workspace(job)
+        return [job.job_id for job in expired]
+
+    def start_gc(self, interval=300):
+        def gc_job():
+            while True:
+                time.sleep(interval)
+                try:
+                    self.gc()
+                except Exception as e:
+                    print(f"[GENERATION-JOBS] GC exception: {e}")
+
+        threading.Thread(target=gc_job, daemon=True).start()
+
+    def _remove_workspace(self, job):
+        forget_manifest(job.workspace)
+        shutil.rmtree(job.workspace, ignore_errors=True)
+
+    def _load_existing(self):
+        for name in os.listdir(self.root):
+            workspace = os.path.join(self.root, name)
+            try:
+                job = GenerationJob.load(workspace)
+            except (OSError, ValueError, KeyError):
+                continue
+            self.jobs[job.job_id] = job
@@ -0,0 +1,116 @@
+import threading
+import time
+from selenium.common.exceptions import WebDriverException
+from session_worker import PRIORITY_KEEPALIVE
+
+KEEPALIVE_KEYWORDS = ['session', 'keep alive', 'continue', 'still there', 'timeout']
+
+KEEPALIVE_XPATH = "//*[" + " or ".join(
+    "contains(translate(text(), 'ABCDEFGHIJKLMNOPQRSTUVWXYZ', 'abcdefghijklmnopqrstuvwxyz'), '{}')".format(keyword)
+    for keyword in KEEPALIVE_KEYWORDS
+) + "]"
+
+# One round-trip per check: reads the recorder's detector flag and, if it is set,
+# finds the element to click. Prefers the first visible, enabled button inside a
+# keyword match, then falls back to the first visible match. The flag is only
+# cleared here when nothing matches any more; a click clears it otherwise.
+KEEPALIVE_CHECK_JS = """
+if (!window.__robustKeepalivePending || !window.__robustKeepalivePending()) return null;
+function visible(el) {
+    if (!el.getClientRects().length) return false;
+    var style = window.getComputedStyle(el);
+    return style.visibility !== 'hidden' && style.display !== 'none';
+}
+function usable(el) { return visible(el) && !el.disabled; }
+var matches = document.evaluate(arguments[0], document, null, XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null);
+var fallback = null;
+for (var i = 0; i < matches.snapshotLength; i++) {
+    var match = matches.snapshotItem(i);
+    var buttons = match.querySelectorAll("button, input[type=button], input[type=submit]");
+    for (var j = 0; j < buttons.length; j++) {
+        if (usable(buttons[j])) return {element: buttons[j], kind: 'button'};
+    }
+    if (!fallback && usable(match)) fallback = match;
+}
+if (!matches.snapshotLength) window.__robustClearKeepalivePending();
+return fallback ? {element: fallback, kind: 'modal'} : null;
+"""
+
+RECORD_KEEPALIVE_JS = """
+if (window.__robustClearKeepalivePending) window.__robustClearKeepalivePending();
+if (window.__robustRecordKeepalive) window.__robustRecordKeepalive(arguments[0], arguments[1]);
+"""
+
+def handle_keepalive(driver, session_id):
+    target = driver.execute_script(KEEPALIVE_CHECK_JS, KEEPALIVE_XPATH)
+    if not target:
+        return False
+    element = target["element"]
+    try:
+        element.click()
+    except Exception as e:
+        print(f"[KEEPALIVE] Error clicking visible keepalive element: {e}")
+        return False
+    driver.execute_script(RECORD_KEEPALIVE_JS, element, f"keepalive_{target['kind']}")
+    print(f"[KEEPALIVE] Clicked keepalive {target['kind']} for session {session_id}.")
+    return True
+
+
+class KeepaliveScheduler:
+    """
+    One thread for every session's keepalive handling. Each tick queues a single
+    execute_script per session on that session's driver thread; the XPath scan
+    inside it only runs after the DOM changed in a way that mentions a keepalive
+    keyword, and keeps running each tick until a target was clicked or no
+    keyword match is left.
+    """
+    def __init__(self, manager, interval=2):
+        self.manager = manager
+        self.interval = interval
+        self.sessions = set()
+        self.pending = {}
+        self.lock = threading.Lock()
+        self.thread = None
+
+    def add(self, session_id):
+        with self.lock:
+            self.sessions.add(session_id)
+            if not self.thread or not self.thread.is_alive():
+                self.thread = threading.Thread(target=self._run, daemon=True)
+                self.thread.start()
+
+    def remove(self, session_id):
+        with self.lock:
+            self.sessions.discard(session_id)
+
+    def is_scheduled(self, session_id):
+        return session_id in self.sessions
+
+    def _run(self):
+        while True:
+            time.sleep(self.interval)
+            with self.lock:
+                session_ids = list(self.sessions)
+            for session_id in session_ids:
+                record = self.manager.registry.get(session_id)
+                if record is None or record.driver is None:
+                    self.remove(session_id)
+                    self.pending.pop(session_id, None)
+                    continue
+                # The check runs on the session's driver thread; never queue a second one behind it
+                pending = self.pending.get(session_id)
+                if pending and not pending.done():
+                    continue
+                self.pending[session_id] = record.submit(
+                    self._check, record.driver, session_id, priority=PRIORITY_KEEPALIVE
+                )
+
+    def _check(self, driver, session_id):
+        try:
+            return handle_keepalive(driver, session_id)
+        except WebDriverException as e:
+            # Navigation or a dead driver; the session reaper deals with the latter
+            print(f"[KEEPALIVE] Session {session_id} check skipped: {e.msg}")
+        except Exception as e:
+            print(f"[KEEPALIVE-SCHEDULER] Exception: {e}")
+        return False
@@ -1,55 +1,306 @@
-from fastapi import FastAPI, Body
+import asyncio
+from fastapi import FastAPI, Body, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import FileResponse, StreamingResponse
+from starlette.background import BackgroundTask
 import os
 import json
+import queue
 from selenium_manager import SeleniumSessionManager
+from session_registry import SessionLimitError
+from action_coalescer import coalesce_actions, DEFAULT_COALESCE_WINDOW_MS
+from code_generator import (
+    build_artifacts, stream_artifacts, iter_zip, feature_base, SHARED_GLUE_PACKAGE, SHARED_DATA_SOURCES,
+    SHARED_DRIVER_LIFECYCLES,
+)
+from generation_cache import GenerationCache
+from generation_jobs import JobStore, JobBusyError
+from batch_generator import run_batch, specs_from_directory, load_spec, resolve_under
+from browser_profile import BROWSER_PROFILES
 
 app = FastAPI()
 app.add_middleware(
     CORSMiddleware, allow_origins=["*"], allow_credentials=True,
     allow_methods=["*"], allow_headers=["*"]
 )
-selenium_manager = SeleniumSessionManager()
+BROWSER_POOL_SIZE = int(os.environ.get("BROWSER_POOL_SIZE", "2"))
+BROWSER_POOL_MAX_AGE = int(os.environ.get("BROWSER_POOL_MAX_AGE", "1800"))
+MAX_BROWSER_SESSIONS = int(os.environ.get("MAX_BROWSER_SESSIONS", "5"))
+SESSION_IDLE_TTL = int(os.environ.get("SESSION_IDLE_TTL", "1800"))
+SESSION_LAUNCH_WAIT = int(os.environ.get("SESSION_LAUNCH_WAIT", "30"))
+# Opt-in: turns off Chrome site isolation in recording browsers instead of
+# attaching to each cross-site iframe's target
+RECORDER_DISABLE_SITE_ISOLATION = os.environ.get("RECORDER_DISABLE_SITE_ISOLATION", "0") == "1"
+
+selenium_manager = SeleniumSessionManager(
+    coalesce_window_ms=DEFAULT_COALESCE_WINDOW_MS,
+    pool_size=BROWSER_POOL_SIZE,
+    pool_max_age=BROWSER_POOL_MAX_AGE,
+    max_sessions=MAX_BROWSER_SESSIONS,
+    idle_ttl=SESSION_IDLE_TTL,
+    launch_wait=SESSION_LAUNCH_WAIT,
+    disable_site_isolation=RECORDER_DISABLE_SITE_ISOLATION,
+)
 
 GENERATED_FILES_DIR = "./generated"
 os.makedirs(GENERATED_FILES_DIR, exist_ok=True)
+GENERATION_JOB_RETENTION = int(os.environ.get("GENERATION_JOB_RETENTION", "86400"))
+GENERATION_MAX_JOBS = int(os.environ.get("GENERATION_MAX_JOBS", "200"))
+generation_jobs = JobStore(
+    os.path.join(GENERATED_FILES_DIR, "jobs"),
+    retention=GENERATION_JOB_RETENTION,
+    max_jobs=GENERATION_MAX_JOBS,
+)
+# /generate/batch only reads saved recordings from below this directory
+RECORDINGS_DIR = os.environ.get("RECORDINGS_DIR", "./recordings")
+GENERATION_CACHE_MB = int(os.environ.get("GENERATION_CACHE_MB", "16"))
+GENERATION_CACHE_DISK_MB = int(os.environ.get("GENERATION_CACHE_DISK_MB", "256"))
+generation_cache = GenerationCache(
+    os.path.join(GENERATED_FILES_DIR, ".cache"),
+    max_memory_bytes=GENERATION_CACHE_MB * 1024 * 1024,
+    max_disk_bytes=GENERATION_CACHE_DISK_MB * 1024 * 1024,
+)
+
+STREAM_HEARTBEAT_SECONDS = 2
+STREAM_POLL_SECONDS = 0.2
+
+@app.on_event("startup")
+def start_session_services():
+    if selenium_manager.pool:
+        selenium_manager.pool.start()
+    selenium_manager.start_reaper()
+    generation_jobs.start_gc()
+
+@app.on_event("shutdown")
+def shutdown_browser_pool():
+    if selenium_manager.pool:
+        selenium_manager.pool.shutdown()
+
+async def run_in_session(session_id, fn, *args, **kwargs):
+    # Driver calls run on the session's own thread; the event loop only awaits the result
+    return await asyncio.wrap_future(selenium_manager.submit(session_id, fn, *args, **kwargs))
 
 @app.post("/browser/launch")
-def launch_browser(payload: dict = Body(...)):
+async def launch_browser(payload: dict = Body(...)):
+    """
+    Starts a browser session and returns at once with status "launching"; poll
+    /browser/launch_status until it is "ready" (or "failed").
+    """
     url = payload.get("url")
     session_id = payload.get("session_id")
     if not session_id:
         from uuid import uuid4
         session_id = str(uuid4())
-    selenium_manager.launch_browser(url, session_id)
-    return {"session_id": session_id}
+    try:
+        # Waiting for a free slot blocks, so keep it off the event loop
+        await asyncio.to_thread(selenium_manager.launch_browser, url, session_id)
+    except SessionLimitError as e:
+        raise HTTPException(status_code=429, detail=str(e), headers={"Retry-After": str(SESSION_LAUNCH_WAIT)})
+    return selenium_manager.launch_status(session_id)
+
+@app.get("/browser/launch_status")
+async def launch_status(session_id: str):
+    return selenium_manager.launch_status(session_id)
+
+@app.post("/browser/close")
+async def close_browser(payload: dict = Body(...)):
+    session_id = payload.get("session_id")
+    return {"closed": selenium_manager.close_session(session_id)}
+
+@app.post("/browser/cleanup")
+async def cleanup_browsers():
+    return {"closed": await asyncio.to_thread(selenium_manager.cleanup_sessions)}
+
+@app.get("/browser/sessions")
+def list_browser_sessions():
+    return selenium_manager.list_sessions()
 
 @app.post("/browser/inject_recorder")
-def inject_recorder(payload: dict = Body(...)):
+async def inject_recorder(payload: dict = Body(...)):
     session_id = payload.get("session_id")
-    return {"success": selenium_manager.inject_recorder(session_id)}
+    return {"success": await run_in_session(session_id, selenium_manager.inject_recorder, session_id)}
 
 @app.get("/browser/actions")
-def get_actions(session_id: str):
-    return selenium_manager.get_actions(session_id)
+async def get_actions(session_id: str, since: int = 0):
+    return await run_in_session(session_id, selenium_manager.get_actions, session_id, since)
+
+@app.get("/browser/actions/stream")
+async def stream_actions(session_id: str, since: int = 0):
+    """
+    Server-Sent Events feed of recorded actions. Each event is a JSON batch
+    {"actions": [...], "cursor": N}; comment lines are sent as heartbeats.
+    """
+    subscriber = selenium_manager.subscribe_actions(session_id, since)
+
+    async def event_stream():
+        try:
+            idle = 0.0
+            while True:
+                try:
+                    batch = subscriber.get_nowait()
+                except queue.Empty:
+                    await asyncio.sleep(STREAM_POLL_SECONDS)
+                    idle += STREAM_POLL_SECONDS
+                    if idle >= STREAM_HEARTBEAT_SECONDS:
+                        idle = 0.0
+                        yield ": heartbeat\n\n"
+                    continue
+                idle = 0.0
+                yield f"data: {json.dumps(batch)}\n\n"
+                if batch.get("error"):
+                    break
+        finally:
+            selenium_manager.unsubscribe_actions(session_id, subscriber)
+
+    return StreamingResponse(event_stream(), media_type="text/event-stream")
 
 @app.post("/browser/clear_actions")
-def clear_actions(session_id: str = Body(...)):
-    return selenium_manager.clear_actions(session_id)
+async def clear_actions(session_id: str = Body(...)):
+    return await run_in_session(session_id, selenium_manager.clear_actions, session_id)
+
+@app.get("/browser/pool")
+async def browser_pool_status():
+    if not selenium_manager.pool:
+        return {"enabled": False}
+    return {"enabled": True, **selenium_manager.pool.stats()}
 
 @app.get("/browser/driver_status")
-def driver_status(session_id: str):
-    driver = selenium_manager.get_driver(session_id)
+async def driver_status(session_id: str):
+    record = selenium_manager.registry.get(session_id)
+    if record is None:
+        return {"status": "dead"}
+    if record.status == "launching":
+        return {"status": "launching"}
     try:
-        if driver:
-            driver.title  # Try accessing to check if still alive
-            return {"status": "alive"}
+        alive = await asyncio.wrap_future(record.submit(record.is_alive))
     except Exception:
+        alive = False
+    return {"status": "alive" if alive else "dead"}
+
+@app.get("/generate/cache")
+def generation_cache_stats():
+    return generation_cache.stats()
+
+@app.get("/generate/jobs")
+def list_generation_jobs():
+    return {"jobs": generation_jobs.list()}
+
+@app.get("/generate/jobs/{job_id}")
+def generation_job_status(job_id: str):
+    job = generation_jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Unknown job {job_id}")
+    return job.to_dict()
+
+@app.get("/generate/jobs/{job_id}/files/{name:path}")
+def generation_job_file(job_id: str, name: str):
+    job = generation_jobs.get(job_id)
+    # Only names the job itself generated, so the path cannot leave the workspace
+    if job is None or name not in job.artifacts:
+        raise HTTPException(status_code=404, detail=f"No file {name} in job {job_id}")
+    return FileResponse(os.path.join(job.workspace, name), filename=name)
+
+@app.delete("/generate/jobs/{job_id}")
+def delete_generation_job(job_id: str):
+    if generation_jobs.get(job_id) is None:
+        raise HTTPException(status_code=404, detail=f"Unknown job {job_id}")
+    if not generation_jobs.delete(job_id):
+        raise HTTPException(status_code=409, detail=f"Job {job_id} is still running")
+    return {"deleted": job_id}
+
+GLUE_MODES = ["per_feature", "shared"]
+
+def payload_choice(payload, key, choices, default):
+    # Rejected up front: past begin() a bad value would fail mid-stream
+    value = payload.get(key, default)
+    if value not in choices:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unknown {key.replace('_', ' ')} {value}; expected one of {', '.join(choices)}"
+        )
+    return value
+
+def close_events(events):
+    # After the response: a stream the client left early (or never read) finishes its job now
+    try:
+        events.close()
+    except ValueError:
+        # Still mid-step on the threadpool; it finishes the job once collected
         pass
-    return {"status": "dead"}
+
+@app.post("/generate/batch")
+def generate_batch(payload: dict = Body(...)):
+    """
+    Expects payload to contain:
+      - features: [] (optional, specs shaped like the /generate/all payload, data inline;
+        the CLI's *_path keys are rejected)
+      - directory: str (optional, directory below RECORDINGS_DIR searched for saved actions.json files)
+      - workers: int (optional, process pool size)
+      - glue_package: str (optional, package of the shared step definitions)
+      - data_mode: "json" (default) or "precompiled" (object repo/test data as a Java class)
+      - execution: "serial" (default) or "parallel" (scenarios run concurrently, one browser per thread)
+      - browser_profile: str (optional, "default", "headless" or "ci"; how the generated glue starts browsers)
+      - job_id: str (optional, regenerate into that job's workspace)
+
+    Streams NDJSON: a job line, one line per feature as it finishes (with timings),
+    the shared step definitions / merged data files, then a summary.
+    """
+    specs = list(payload.get("features", []))
+    for spec in specs:
+        if not isinstance(spec, dict) or any(key.endswith("_path") for key in spec):
+            raise HTTPException(
+                status_code=400,
+                detail="Features must carry actions, object_repo and test_data inline; file paths are not accepted"
+            )
+    if payload.get("directory"):
+        try:
+            directory = resolve_under(RECORDINGS_DIR, payload["directory"])
+            specs += [load_spec(spec, root=RECORDINGS_DIR) for spec in specs_from_directory(directory)]
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        except OSError as e:
+            raise HTTPException(status_code=400, detail=f"Could not read recordings: {e}")
+    if not specs:
+        raise HTTPException(status_code=400, detail="No features given")
+    data_mode = payload_choice(payload, "data_mode", list(SHARED_DATA_SOURCES), "json")
+    execution = payload_choice(payload, "execution", list(SHARED_DRIVER_LIFECYCLES), "serial")
+    browser_profile = payload_choice(payload, "browser_profile", list(BROWSER_PROFILES), "default")
+
+    job_id = payload.get("job_id")
+    if job_id:
+        job = generation_jobs.get(job_id)
+        if job is None:
+            raise HTTPException(status_code=404, detail=f"Unknown job {job_id}")
+    else:
+        job = generation_jobs.create("batch")
+    try:
+        generation_jobs.begin(job, "batch")
+    except JobBusyError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+
+    try:
+        events = generation_jobs.track_batch(job, run_batch(
+            specs, job.workspace, workers=payload.get("workers"),
+            glue_package=payload.get("glue_package", SHARED_GLUE_PACKAGE),
+            data_mode=data_mode,
+            execution=execution,
+            browser_profile=browser_profile,
+        ))
+    except Exception as e:
+        generation_jobs.finish(job, "failed", str(e))
+        raise
+
+    def ndjson_stream():
+        yield json.dumps({"event": "job", "job_id": job.job_id}) + "\n"
+        for event in events:
+            yield json.dumps(event) + "\n"
+
+    return StreamingResponse(
+        ndjson_stream(), media_type="application/x-ndjson", background=BackgroundTask(close_events, events)
+    )
 
 @app.post("/generate/all")
-def generate_all(payload: dict = Body(...)):
+def generate_all(payload: dict = Body(...), format: str = "json"):
     """
     Expects payload to contain:
       - actions: []
@@ -57,178 +308,102 @@ def generate_all(payload: dict = Body(...)):
       - test_data: []
       - feature_name: str
       - scenario_outline: str
+      - coalesce_window_ms: int (optional, 0 disables typing coalescing)
+      - job_id: str (optional, regenerate into that job's workspace)
+      - glue_mode: "per_feature" (default) or "shared"
+      - glue_package: str (optional, package of the shared step definitions)
+      - data_mode: "json" (default) or "precompiled"; shared glue mode only
+      - execution: "serial" (default) or "parallel"; shared glue mode only
+      - browser_profile: str (optional, "default", "headless" or "ci"); shared glue mode only
+
+    In "shared" glue mode the feature gets no step definitions class of its own;
+    its runner points at the shared glue package, which is written once per
+    workspace. Each job writes into its own workspace under generated/jobs/<job_id>, so
+    concurrent generations never share files. Several features can be generated into
+    one job; regenerating a feature only removes files of its earlier runs that no
+    other feature in the job still uses. `format` picks the response: "json" (every
+    artifact in one body), "ndjson" (a job line, then one line per artifact start,
+    content chunk and end) or "zip". Artifacts are written to disk as they
+    stream; those whose inputs are unchanged since the job's last run are served
+    from disk instead of being regenerated.
     """
-    actions = payload.get("actions", [])
+    coalesce_window_ms = payload.get("coalesce_window_ms", DEFAULT_COALESCE_WINDOW_MS)
+    actions = coalesce_actions(payload.get("actions", []), coalesce_window_ms)
     object_repo = payload.get("object_repo", [])
     test_data = payload.get("test_data", [])
     feature_name = payload.get("feature_name", "Sample Feature")
     scenario_outline = payload.get("scenario_outline", "")
+    glue_mode = payload_choice(payload, "glue_mode", GLUE_MODES, "per_feature")
+    data_mode = payload_choice(payload, "data_mode", list(SHARED_DATA_SOURCES), "json")
+    execution = payload_choice(payload, "execution", list(SHARED_DRIVER_LIFECYCLES), "serial")
+    browser_profile = payload_choice(payload, "browser_profile", list(BROWSER_PROFILES), "default")
+
+    job_id = payload.get("job_id")
+    if job_id:
+        job = generation_jobs.get(job_id)
+        if job is None:
+            raise HTTPException(status_code=404, detail=f"Unknown job {job_id}")
+    else:
+        job = generation_jobs.create(feature_name)
+    try:
+        generation_jobs.begin(job, feature_name)
+    except JobBusyError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+
+    try:
+        artifacts = build_artifacts(
+            actions, object_repo, test_data, feature_name, scenario_outline,
+            glue_mode=glue_mode,
+            glue_package=payload.get("glue_package", SHARED_GLUE_PACKAGE),
+            data_mode=data_mode,
+            execution=execution,
+            browser_profile=browser_profile,
+        )
+        events = generation_jobs.track(job, stream_artifacts(
+            artifacts, job.workspace, cache=generation_cache, owner=feature_base(feature_name)
+        ))
+    except Exception as e:
+        generation_jobs.finish(job, "failed", str(e))
+        raise
+
+    if format == "zip":
+        archive_name = f"{feature_name.replace(' ', '_').lower()}.zip"
+        return StreamingResponse(
+            iter_zip(events), media_type="application/zip",
+            headers={"Content-Disposition": f'attachment; filename="{archive_name}"', "X-Job-Id": job.job_id},
+            background=BackgroundTask(close_events, events)
+        )
+    if format == "ndjson":
+        def ndjson_stream():
+            yield json.dumps({"event": "job", "job_id": job.job_id}) + "\n"
+            for event, artifact, value in events:
+                line = {"event": event, "name": artifact.name, "kind": artifact.kind}
+                if event == "start":
+                    line["status"] = value
+                elif event == "chunk":
+                    line["data"] = value
+                else:
+                    line.update({k: value[k] for k in ("status", "sha256", "size") if k in value})
+                    if "cache" in value:
+                        line["cache"] = value["cache"]
+                yield json.dumps(line) + "\n"
+            yield json.dumps({"event": "done", "status": "success", "job_id": job.job_id}) + "\n"
+        return StreamingResponse(
+            ndjson_stream(), media_type="application/x-ndjson", background=BackgroundTask(close_events, events)
+        )
 
-    # Write JSON files
-    with open(f"{GENERATED_FILES_DIR}/actions.json", "w") as f:
-        json.dump(actions, f, indent=2)
-    with open(f"{GENERATED_FILES_DIR}/object_repo.json", "w") as f:
-        json.dump(object_repo, f, indent=2)
-    with open(f"{GENERATED_FILES_DIR}/test_data.json", "w") as f:
-        json.dump(test_data, f, indent=2)
-
-    # Generate feature file
-    feature_file = generate_feature_file(actions, object_repo, feature_name, scenario_outline)
-    with open(f"{GENERATED_FILES_DIR}/{feature_name.replace(' ', '_').lower()}.feature", "w") as f:
-        f.write(feature_file)
-
-    # Generate step definitions (Java)
-    step_defs = generate_java_step_definitions(feature_name, actions, object_repo, test_data)
-    with open(f"{GENERATED_FILES_DIR}/{feature_name.replace(' ', '_').lower()}_Steps.java", "w") as f:
-        f.write(step_defs)
-
-    # Generate Cucumber runner (Java)
-    runner_code = generate_java_cucumber_runner(feature_name)
-    with open(f"{GENERATED_FILES_DIR}/{feature_name.replace(' ', '_').lower()}_Runner.java", "w") as f:
-        f.write(runner_code)
-
-    return {
-        "status": "success",
-        "feature_file": feature_file,
-        "step_definitions": step_defs,
-        "runner": runner_code,
+    result = {"status": "success", "job_id": job.job_id, "artifacts": {}}
+    texts = {}
+    for event, artifact, value in events:
+        if event == "chunk" and artifact.kind in ("feature_file", "step_definitions", "runner"):
+            texts.setdefault(artifact.kind, []).append(value)
+        elif event == "end":
+            result["artifacts"][artifact.name] = value["status"]
+    for kind, chunks in texts.items():
+        result[kind] = "".join(chunks)
+    result.update({
         "actions_json": actions,
         "object_repo_json": object_repo,
-        "test_data_json": test_data
-    }
-
-def generate_feature_file(actions, object_repo, feature_name, scenario_outline):
-    steps = []
-    for action in actions:
-        if action.get("eventType") == "pageload":
-            steps.append(f'Given the page is loaded: "{action.get("actualValue","")}"')
-        elif action.get("eventType") == "click":
-            steps.append(f'When the user clicks on "{action.get("objectName","")}"')
-        elif action.get("eventType") in ["input", "change", "blur", "enter"]:
-            steps.append(f'And the user enters "{action.get("actualValue","")}" into "{action.get("objectName","")}"')
-        elif action.get("eventType") == "keepalive":
-            steps.append(f"And session keepalive popup is handled automatically")
-    scenario = f'''Scenario: {scenario_outline or feature_name}
-    ''' + "\n    ".join(steps)
-    return f'''Feature: {feature_name}
-
-  {scenario}
-'''
-
-def generate_java_step_definitions(feature_name, actions, object_repo, test_data):
-    obj_map = {o['objectName']: o for o in object_repo}
-    imports = (
-        "import io.cucumber.java.en.*;\n"
-        "import org.openqa.selenium.*;\n"
-        "import org.openqa.selenium.chrome.ChromeDriver;\n"
-        "import java.util.*;\n"
-        "import util.KeepaliveHandler;\n"
-    )
-    class_def = f"public class {feature_name.replace(' ', '')}Steps "+"{\n"
-    setup_vars = (
-        "    private WebDriver driver;\n"
-        "    private KeepaliveHandler keepaliveHandler;\n"
-        "    private Map<String, Map<String, Object>> objectRepo;\n"
-        "    private Map<String, Object> testData;\n"
-    )
-    before = (
-        "    @Before\n"
-        "    public void setUp() throws Exception {\n"
-        "        driver = new ChromeDriver();\n"
-        "        keepaliveHandler = new KeepaliveHandler(driver);\n"
-        "        keepaliveHandler.start();\n"
-        "        objectRepo = DataHelper.loadObjectRepo(\"generated/object_repo.json\");\n"
-        "        testData = DataHelper.loadTestData(\"generated/test_data.json\");\n"
-        "    }\n"
-    )
-    after = (
-        "    @After\n"
-        "    public void tearDown() {\n"
-        "        if (keepaliveHandler != null) keepaliveHandler.stop();\n"
-        "        if (driver != null) driver.quit();\n"
-        "    }\n"
-    )
-    step_lines = []
-    seen_steps = set()
-    for action in actions:
-        obj = obj_map.get(action.get("objectName"), {})
-        if action.get("eventType") == "pageload" and "pageload" not in seen_steps:
-            step_lines.append(
-                '    @Given("the page is loaded: {url}")\n'
-                '    public void page_loaded(String url) {\n'
-                '        driver.get(url);\n'
-                '    }\n'
-            )
-            seen_steps.add("pageload")
-        elif action.get("eventType") == "click" and "click" not in seen_steps:
-            step_lines.append(
-                '    @When("the user clicks on {object}")\n'
-                '    public void user_clicks_on(String object) {\n'
-                '        String xpath = (String)objectRepo.get(object).get("chosenXpath");\n'
-                '        driver.findElement(By.xpath(xpath)).click();\n'
-                '    }\n'
-            )
-            seen_steps.add("click")
-        elif action.get("eventType") in ["input", "change", "blur", "enter"] and "input" not in seen_steps:
-            step_lines.append(
-                '    @And("the user enters {value} into {object}")\n'
-                '    public void user_enters(String value, String object) {\n'
-                '        String xpath = (String)objectRepo.get(object).get("chosenXpath");\n'
-                '        driver.findElement(By.xpath(xpath)).sendKeys(value);\n'
-                '    }\n'
-            )
-            seen_steps.add("input")
-        elif action.get("eventType") == "keepalive" and "keepalive" not in seen_steps:
-            step_lines.append(
-                '    @And("session keepalive popup is handled automatically")\n'
-                '    public void session_keepalive_handled() { /* handled by KeepaliveHandler */ }\n'
-            )
-            seen_steps.add("keepalive")
-    class_end = "}\n"
-    data_helper = """
-class DataHelper {
-    public static Map<String, Map<String, Object>> loadObjectRepo(String path) {
-        try {
-            String json = new String(java.nio.file.Files.readAllBytes(java.nio.file.Paths.get(path)));
-            org.json.JSONArray arr = new org.json.JSONArray(json);
-            Map<String, Map<String, Object>> map = new HashMap<>();
-            for (int i = 0; i < arr.length(); i++) {
-                org.json.JSONObject o = arr.getJSONObject(i);
-                Map<String, Object> entry = new HashMap<>();
-                for(String k : o.keySet()) entry.put(k, o.get(k));
-                map.put(o.getString("objectName"), entry);
-            }
-            return map;
-        } catch (Exception e) { throw new RuntimeException(e); }
-    }
-    public static Map<String, Object> loadTestData(String path) {
-        try {
-            String json = new String(java.nio.file.Files.readAllBytes(java.nio.file.Paths.get(path)));
-            org.json.JSONArray arr = new org.json.JSONArray(json);
-            Map<String, Object> map = new HashMap<>();
-            for (int i = 0; i < arr.length(); i++) {
-                org.json.JSONObject o = arr.getJSONObject(i);
-                map.put(o.getString("objectName"), o.get("actualValue"));
-            }
-            return map;
-        } catch (Exception e) { throw new RuntimeException(e); }
-    }
-}
-"""
-    return imports + class_def + setup_vars + before + after + "".join(step_lines) + class_end + data_helper
-
-def generate_java_cucumber_runner(feature_name):
-    name = feature_name.replace(' ', '_').lower()
-    class_name = feature_name.replace(' ', '') + "Runner"
-    return f"""import org.junit.runner.RunWith;
-import io.cucumber.junit.Cucumber;
-import io.cucumber.junit.CucumberOptions;
-
-@RunWith(Cucumber.class)
-@CucumberOptions(
-    features = "generated/{name}.feature",
-    glue = {{"."}},
-    plugin = {{"pretty", "html:target/cucumber-reports.html"}}
-)
-public class {class_name} {{}}
-"""
+        "test_data_json": test_data,
+    })
+    return result
@@ -0,0 +1,51 @@
+"""
+Memory and CPU of a local WebDriver: the chromedriver process and every Chrome
+process it spawned. Used for /browser/sessions and for AIAutoExecutor's run
+metrics. Needs psutil (in requirements.txt); without it every figure is None
+and ACCOUNTING_AVAILABLE is False.
+"""
+try:
+    import psutil
+except ImportError:  # resource accounting is optional
+    psutil = None
+
+# Reported next to the figures, so a None reads as "not measured" rather than "no usage"
+ACCOUNTING_AVAILABLE = psutil is not None
+
+
+def driver_process_usage(driver):
+    """
+    {"processes", "rss", "cpu_seconds"} summed over the driver's process tree,
+    rss in bytes; None without psutil or when the driver has no local service
+    process (e.g. a remote driver).
+    """
+    process = getattr(getattr(driver, "service", None), "process", None)
+    if psutil is None or process is None:
+        return None
+    try:
+        root = psutil.Process(process.pid)
+        procs = [root] + root.children(recursive=True)
+    except psutil.Error:
+        return None
+    usage = {"processes": 0, "rss": 0, "cpu_seconds": 0.0}
+    for proc in procs:
+        try:
+            rss = proc.memory_info().rss
+            times = proc.cpu_times()
+        except psutil.Error:
+            # Exited while we were walking the tree
+            continue
+        usage["processes"] += 1
+        usage["rss"] += rss
+        usage["cpu_seconds"] += times.user + times.system
+    return usage
+
+
+def own_rss():
+    """RSS of the current process in bytes, None without psutil."""
+    if psutil is None:
+        return None
+    try:
+        return psutil.Process().memory_info().rss
+    except psutil.Error:
+        return None
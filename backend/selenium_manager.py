@@ -1,7 +1,16 @@
+import json
+import queue
 import threading
 import time
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
 from selenium import webdriver
-from selenium.common.exceptions import NoSuchElementException, WebDriverException
+from selenium.common.exceptions import TimeoutException
+from selenium.webdriver.support.ui import WebDriverWait
+from browser_pool import BrowserPool
+from process_usage import ACCOUNTING_AVAILABLE
+from session_registry import SessionRegistry
+from session_worker import PRIORITY_USER, PRIORITY_COLLECT, PRIORITY_KEEPALIVE, PRIORITY_SHUTDOWN
+from keepalive import KeepaliveScheduler, KEEPALIVE_KEYWORDS
 
 RECORDER_JS = """
 (function(){
@@ -215,38 +224,237 @@ RECORDER_JS = """
       });
     }
 
+    // Locators only change when the DOM does, so they are cached per element and
+    // the whole cache is dropped on any mutation.
+    let locatorCache = new WeakMap();
+    let locatorCacheObserver = null;
+
+    function getLocators(el) {
+      if (!locatorCacheObserver && window.MutationObserver && document.documentElement) {
+        locatorCacheObserver = new MutationObserver(() => { locatorCache = new WeakMap(); });
+        locatorCacheObserver.observe(document.documentElement, {
+          childList: true, subtree: true, attributes: true, characterData: true
+        });
+      }
+      let locators = locatorCache.get(el);
+      if (!locators) {
+        locators = generateLocators(el);
+        locatorCache.set(el, locators);
+      }
+      return locators;
+    }
+
     // --- Main persistent recorder logic ---
     if (!window.__robustRecorderInstalled) {
         window.__robustRecorderInstalled = true;
-        if (!localStorage.getItem("robustRecordedActions")) {
-            localStorage.setItem("robustRecordedActions", "[]");
+        var recorderConfig = window.__robustRecorderConfig || {};
+
+        // Sequence numbers are time-based so they keep increasing across origins
+        // (each origin has its own localStorage and therefore its own counter).
+        function nextSeq() {
+            var last = parseInt(localStorage.getItem("robustRecordedSeq") || "0", 10);
+            var seq = Math.max(last + 1, Date.now() * 1000);
+            localStorage.setItem("robustRecordedSeq", String(seq));
+            return seq;
+        }
+        window.__robustNextSeq = nextSeq;
+
+        // --- Chunked action store ---
+        // Actions live in fixed-size localStorage chunks ("robustRecordedActions:<n>")
+        // indexed by a small meta record, so an append only rewrites the current chunk.
+        // The backend drains (moves out) all chunks; if nobody drains, the oldest
+        // chunks are dropped once maxChunks is reached or the quota is hit.
+        var STORE_PREFIX = "robustRecordedActions:";
+        var META_KEY = STORE_PREFIX + "meta";
+        var chunkSize = recorderConfig.chunkSize || 50;
+        var maxChunks = recorderConfig.maxChunks || 100;
+        var maxTargetElementLength = recorderConfig.maxTargetElementLength || 2000;
+
+        function readMeta() {
+            try {
+                var meta = JSON.parse(localStorage.getItem(META_KEY) || "null");
+                if (meta) return meta;
+            } catch (e) {}
+            return { first: 0, next: 0, lastSeq: 0, dropped: 0, storageErrors: 0 };
+        }
+
+        function writeMeta(meta) {
+            try {
+                localStorage.setItem(META_KEY, JSON.stringify(meta));
+            } catch (e) {}
+        }
+
+        function readChunk(idx) {
+            try {
+                return JSON.parse(localStorage.getItem(STORE_PREFIX + idx) || "[]");
+            } catch (e) {
+                return [];
+            }
+        }
+
+        function dropOldestChunk(meta) {
+            if (meta.first >= meta.next - 1) return false;
+            meta.dropped += readChunk(meta.first).length;
+            localStorage.removeItem(STORE_PREFIX + meta.first);
+            meta.first++;
+            return true;
+        }
+
+        function writeChunk(idx, chunk, meta) {
+            var value = JSON.stringify(chunk);
+            while (true) {
+                try {
+                    localStorage.setItem(STORE_PREFIX + idx, value);
+                    return;
+                } catch (e) {
+                    // Quota exceeded: make room by discarding the oldest undrained chunk
+                    if (!dropOldestChunk(meta)) {
+                        meta.storageErrors++;
+                        return;
+                    }
+                }
+            }
+        }
+
+        function appendAction(action) {
+            var meta = readMeta();
+            var idx = meta.next - 1;
+            var chunk = idx >= meta.first ? readChunk(idx) : [];
+            if (action.replacesSeq && chunk.length && chunk[chunk.length - 1].seq === action.replacesSeq) {
+                chunk.pop();
+            }
+            if (idx < meta.first || chunk.length >= chunkSize) {
+                idx = meta.next++;
+                chunk = [];
+            }
+            chunk.push(action);
+            meta.lastSeq = action.seq;
+            while (meta.next - meta.first > maxChunks && dropOldestChunk(meta)) {}
+            writeChunk(idx, chunk, meta);
+            writeMeta(meta);
+        }
+
+        // --- Frame forwarding ---
+        // The backend drains the top document's store only; a cross-site frame's
+        // localStorage belongs to its own origin. Frames therefore post every action
+        // to the top document, which stores those coming from its own frames.
+        var FRAME_ACTION_KEY = "__robustRecorderFrameAction";
+        var isFrame = window.top !== window;
+        var lastForwardedSeq = 0;
+
+        function isOwnFrame(source) {
+            if (!source || source === window) return false;
+            for (var w = source; w !== window; w = w.parent) {
+                if (w === w.parent) return false;
+            }
+            return true;
+        }
+
+        function storeAction(action) {
+            if (!isFrame) {
+                appendAction(action);
+                return;
+            }
+            var message = {};
+            message[FRAME_ACTION_KEY] = action;
+            window.top.postMessage(message, "*");
+            lastForwardedSeq = action.seq;
+        }
+
+        function lastStoredSeq() {
+            return isFrame ? lastForwardedSeq : readMeta().lastSeq;
+        }
+
+        if (!isFrame) {
+            window.addEventListener("message", function(e) {
+                var action = e.data && e.data[FRAME_ACTION_KEY];
+                if (action && isOwnFrame(e.source)) appendAction(action);
+            });
+        }
+
+        window.__robustAppendAction = function(action) {
+            if (!action.seq) action.seq = nextSeq();
+            storeAction(action);
+        };
+
+        window.__robustDrainActions = function() {
+            var meta = readMeta();
+            var actions = [];
+            for (var i = meta.first; i < meta.next; i++) {
+                Array.prototype.push.apply(actions, readChunk(i));
+                localStorage.removeItem(STORE_PREFIX + i);
+            }
+            var result = { actions: actions, dropped: meta.dropped, storageErrors: meta.storageErrors };
+            meta.first = meta.next;
+            meta.dropped = 0;
+            meta.storageErrors = 0;
+            writeMeta(meta);
+            return result;
+        };
+
+        // FNV-1a, used to identify a target element whose outerHTML was truncated
+        function hashString(str) {
+            var hash = 0x811c9dc5;
+            for (var i = 0; i < str.length; i++) {
+                hash ^= str.charCodeAt(i);
+                hash = Math.imul(hash, 0x01000193) >>> 0;
+            }
+            return hash.toString(16);
         }
-        window.recordedActions = JSON.parse(localStorage.getItem("robustRecordedActions") || "[]");
 
-        function saveActions() {
-            localStorage.setItem("robustRecordedActions", JSON.stringify(window.recordedActions));
+        function compactTargetElement(action, html) {
+            action.targetElementHash = hashString(html);
+            if (html.length > maxTargetElementLength) {
+                action.targetElement = html.slice(0, maxTargetElementLength) + "...";
+                action.targetElementLength = html.length;
+            } else {
+                action.targetElement = html;
+            }
+        }
+
+        // Consecutive typing events (input/change/blur/enter) on the same element
+        // within coalesceMs are folded into one action carrying the final value.
+        var coalesceMs = recorderConfig.coalesceMs == null ? 1000 : recorderConfig.coalesceMs;
+        var TYPING_EVENTS = ["input", "change", "blur", "enter"];
+        var lastTyping = null;
+
+        function coalescedPrevious(type, el, now) {
+            if (!coalesceMs || TYPING_EVENTS.indexOf(type) === -1 || !lastTyping) return null;
+            if (lastTyping.el !== el || now - lastTyping.time > coalesceMs) return null;
+            if (lastStoredSeq() !== lastTyping.action.seq) return null;
+            return lastTyping.action;
         }
 
         function recordAction(type, e) {
             var el = e && e.target;
             if (!el || !el.tagName) return;
-            var tag = el.tagName.toLowerCase();
+            var now = Date.now();
+            var previous = coalescedPrevious(type, el, now);
+            var suggestedName = getSuggestedName(el);
+            var elementType = getElementType(el);
+            var locators = getLocators(el);
             var action = {
-                objectName: getSuggestedName(el) + "_" + getElementType(el),
-                suggestedName: getSuggestedName(el),
-                elementType: getElementType(el),
-                locator: generateLocators(el)[0]?.locator || "",
-                locatorType: generateLocators(el)[0]?.locatorType || "",
-                locatorSuggestions: generateLocators(el),
+                seq: nextSeq(),
+                objectName: suggestedName + "_" + elementType,
+                suggestedName: suggestedName,
+                elementType: elementType,
+                locator: locators[0]?.locator || "",
+                locatorType: locators[0]?.locatorType || "",
+                locatorSuggestions: locators,
                 windowTitle: getWindowTitle(),
                 frameChain: getFrameChain(),
                 timestamp: new Date().toISOString(),
-                targetElement: el.outerHTML,
                 actualValue: el.value || '',
                 eventType: type
             };
-            window.recordedActions.push(action);
-            saveActions();
+            compactTargetElement(action, el.outerHTML);
+            if (previous) {
+                // Re-emit under a new seq so cursor-based readers pick up the final value
+                action.replacesSeq = previous.seq;
+                action.coalescedCount = (previous.coalescedCount || 1) + 1;
+            }
+            lastTyping = TYPING_EVENTS.indexOf(type) !== -1 ? { el: el, action: action, time: now } : null;
+            storeAction(action);
         }
 
         document.addEventListener('click', e => recordAction('click', e), true);
@@ -257,38 +465,502 @@ RECORDER_JS = """
             if (e.key === 'Enter') recordAction('enter', e);
         }, true);
 
-        window.addEventListener("load", function() {
-            window.recordedActions = JSON.parse(localStorage.getItem("robustRecordedActions") || "[]");
-        });
+        // --- Keepalive detector ---
+        // Raises a flag only when changed DOM contains a keepalive keyword, so the
+        // backend polls a boolean instead of sweeping the document with XPath.
+        var keepaliveKeywords = recorderConfig.keepaliveKeywords || [];
+        var keepalivePending = false;
+
+        function containsKeepaliveKeyword(node) {
+            var text = ((node && node.textContent) || "").toLowerCase();
+            if (!text) return false;
+            for (var i = 0; i < keepaliveKeywords.length; i++) {
+                if (text.indexOf(keepaliveKeywords[i]) !== -1) return true;
+            }
+            return false;
+        }
+
+        function startKeepaliveObserver() {
+            new MutationObserver(function(mutations) {
+                for (var i = 0; i < mutations.length && !keepalivePending; i++) {
+                    var m = mutations[i];
+                    if (m.type === "childList") {
+                        for (var j = 0; j < m.addedNodes.length && !keepalivePending; j++) {
+                            keepalivePending = containsKeepaliveKeyword(m.addedNodes[j]);
+                        }
+                    } else if (m.target !== document.body && m.target !== document.documentElement) {
+                        // A hidden dialog becoming visible, or its text changing
+                        keepalivePending = containsKeepaliveKeyword(m.target);
+                    }
+                }
+            }).observe(document.documentElement, {
+                childList: true, subtree: true, characterData: true, attributes: true,
+                attributeFilter: ["style", "class", "hidden", "open", "aria-hidden"]
+            });
+            keepalivePending = containsKeepaliveKeyword(document.body);
+        }
+
+        if (keepaliveKeywords.length && window.MutationObserver) {
+            // When registered through CDP the recorder runs before the document is parsed
+            if (document.documentElement) startKeepaliveObserver();
+            else document.addEventListener("DOMContentLoaded", startKeepaliveObserver);
+        }
+
+        // The flag stays set until the backend has clicked a target, so a dialog
+        // that is still hidden or animating in is looked at again on the next check
+        window.__robustKeepalivePending = function() {
+            return keepalivePending;
+        };
+
+        window.__robustClearKeepalivePending = function() {
+            keepalivePending = false;
+        };
+
+        window.__robustRecordKeepalive = function(el, objectName) {
+            var action = {
+                seq: nextSeq(),
+                objectName: objectName,
+                eventType: "keepalive",
+                locator: getLocators(el)[0]?.locator || "",
+                locatorType: "auto",
+                timestamp: new Date().toISOString(),
+                actualValue: "",
+                windowTitle: getWindowTitle(),
+                frameChain: getFrameChain(),
+                elementType: "keepalive",
+                suggestedName: "keepalive",
+                locatorSuggestions: []
+            };
+            compactTargetElement(action, el.outerHTML);
+            storeAction(action);
+        };
+
+        // Exposed for test_data/recorder_benchmark.html
+        window.__robustRecorderLocators = { generate: generateLocators, cached: getLocators };
 
         window.clearRecordedActions = function() {
-            window.recordedActions = [];
-            localStorage.setItem('robustRecordedActions', "[]");
+            var meta = readMeta();
+            for (var i = meta.first; i < meta.next; i++) {
+                localStorage.removeItem(STORE_PREFIX + i);
+            }
+            meta.first = meta.next;
+            meta.dropped = 0;
+            meta.storageErrors = 0;
+            writeMeta(meta);
         };
     }
 })();
 """
 
-class SeleniumSessionManager:
+# Moves every stored action out of the browser (see __robustDrainActions). Frames,
+# cross-site ones included, post their actions to the top document's store.
+DRAIN_ACTIONS_JS = """
+if (!window.__robustDrainActions) return {actions: [], dropped: 0, storageErrors: 0};
+return window.__robustDrainActions();
+"""
+
+# How often a drain also looks for new windows and cross-site frame targets that still need the recorder
+WINDOW_CHECK_INTERVAL = 2
+
+class ActionLog:
+    """
+    Backend copy of a session's recorded actions, ordered by seq. Actions drained
+    from another origin can arrive with an older seq; they are renumbered so the
+    cursor handed to clients never moves backwards.
+    """
     def __init__(self):
-        self.sessions = {}
-        self.keepalive_threads = {}
+        self.actions = []
+        self.cursor = 0
+        self.dropped = 0
+        self.renumbered = {}
+        self.lock = threading.Lock()
+        self.drain_lock = threading.Lock()
+        self.windows_checked_at = 0
 
-    def launch_browser(self, url, session_id):
+    def extend(self, actions):
+        added = []
+        with self.lock:
+            for action in actions:
+                seq = action.get("seq") or 0
+                if seq <= self.cursor:
+                    self.renumbered[seq] = self.cursor + 1
+                    action["seq"] = self.cursor + 1
+                replaces = self.renumbered.get(action.get("replacesSeq"), action.get("replacesSeq"))
+                if replaces:
+                    action["replacesSeq"] = replaces
+                    for idx in range(len(self.actions) - 1, -1, -1):
+                        if self.actions[idx].get("seq") == replaces:
+                            del self.actions[idx]
+                            break
+                self.actions.append(action)
+                self.cursor = action["seq"]
+                added.append(action)
+        return added
+
+    def since(self, since):
+        with self.lock:
+            start = len(self.actions)
+            while start > 0 and (self.actions[start - 1].get("seq") or 0) > since:
+                start -= 1
+            return self.actions[start:]
+
+    def clear(self):
+        with self.lock:
+            self.actions = []
+            self.renumbered = {}
+
+
+class ActionCollector:
+    """
+    Single per-session reader of the recorder store. It drains new actions from the
+    browser at a fixed interval and fans them out to every subscriber queue, so the
+    WebDriver cost does not grow with the number of listeners.
+    """
+    def __init__(self, manager, session_id, interval=0.5, idle_grace=10):
+        self.manager = manager
+        self.session_id = session_id
+        self.interval = interval
+        self.idle_grace = idle_grace
+        self.subscribers = []
+        self.lock = threading.Lock()
+        self.thread = None
+
+    def subscribe(self, since=0):
+        subscriber = queue.Queue()
+        log = self.manager.get_action_log(self.session_id)
+        with self.lock:
+            backlog = log.since(since)
+            subscriber.cursor = max(since, log.cursor)
+            if backlog:
+                subscriber.put({"actions": backlog, "cursor": log.cursor})
+            self.subscribers.append(subscriber)
+            if not self.thread or not self.thread.is_alive():
+                self.thread = threading.Thread(target=self._run, daemon=True)
+                self.thread.start()
+        return subscriber
+
+    def unsubscribe(self, subscriber):
+        with self.lock:
+            if subscriber in self.subscribers:
+                self.subscribers.remove(subscriber)
+
+    def _publish(self, batch):
+        for subscriber in self.subscribers:
+            # Skip what a subscriber already got as backlog while the drain ran
+            actions = [a for a in batch["actions"] if (a.get("seq") or 0) > subscriber.cursor]
+            if batch["actions"] and not actions:
+                continue
+            subscriber.cursor = max(subscriber.cursor, batch["cursor"])
+            subscriber.put({**batch, "actions": actions})
+
+    def _run(self):
+        idle_since = None
+        while True:
+            with self.lock:
+                if not self.subscribers:
+                    idle_since = idle_since or time.time()
+                    if time.time() - idle_since > self.idle_grace:
+                        self.thread = None
+                        return
+                else:
+                    idle_since = None
+            record = self.manager.registry.get(self.session_id)
+            if record is None or record.status == "ready":
+                # Drain on the session's driver thread, outside the lock so subscribers never wait on it
+                try:
+                    result = self.manager.run_in_session(
+                        self.session_id, self.manager.drain_actions, self.session_id, priority=PRIORITY_COLLECT
+                    )
+                except Exception as e:
+                    result = {"actions": [], "cursor": self.manager.get_action_log(self.session_id).cursor,
+                              "error": str(e)}
+                with self.lock:
+                    if result.get("error") and not self.manager.registry.get(self.session_id):
+                        self._publish({"actions": [], "cursor": result["cursor"], "error": result["error"]})
+                        self.thread = None
+                        return
+                    if result["actions"]:
+                        self._publish({"actions": result["actions"], "cursor": result["cursor"]})
+            time.sleep(self.interval)
+
+
+class SeleniumSessionManager:
+    def __init__(self, coalesce_window_ms=1000, chunk_size=50, max_chunks=100, max_target_element_length=2000,
+                 pool_size=0, pool_max_age=1800, max_sessions=5, idle_ttl=1800, launch_wait=30,
+                 disable_site_isolation=False):
+        self.registry = SessionRegistry(max_sessions=max_sessions, idle_ttl=idle_ttl, launch_wait=launch_wait)
+        self.pool = BrowserPool(self._new_driver, size=pool_size, max_age=pool_max_age) if pool_size else None
+        self.coalesce_window_ms = coalesce_window_ms
+        self.chunk_size = chunk_size
+        self.max_chunks = max_chunks
+        self.max_target_element_length = max_target_element_length
+        self.disable_site_isolation = disable_site_isolation
+        self.keepalive = KeepaliveScheduler(self)
+        self.collectors = {}
+        self.collectors_lock = threading.Lock()
+        self.action_logs = {}
+        self.registered_windows = {}
+        self.registered_frames = {}
+        self.failed_launches = {}
+
+    def _new_driver(self):
         options = webdriver.ChromeOptions()
         options.add_experimental_option("detach", True)
+        if self.disable_site_isolation:
+            # Opt-in: cross-site iframes stay in the page's process, so the page's
+            # registration reaches them without attaching to frame targets
+            options.add_argument("--disable-site-isolation-trials")
+            options.add_argument("--disable-features=IsolateOrigins,site-per-process")
         driver = webdriver.Chrome(options=options)
-        driver.get(url)
-        time.sleep(2)
-        self._inject_js_all_windows_and_frames(driver)
-        self.sessions[session_id] = driver
-        self.start_keepalive_monitor(session_id)
-        return session_id
+        self._register_recorder(driver)
+        return driver
+
+    def _register_recorder(self, driver):
+        """
+        Registers the recorder with Page.addScriptToEvaluateOnNewDocument for the
+        current window, so every later document and same-site frame in it records
+        from the start without walking frames over WebDriver. Cross-site frames
+        are registered by _register_frame_targets.
+        """
+        try:
+            driver.execute_cdp_cmd("Page.addScriptToEvaluateOnNewDocument", {"source": self.recorder_script()})
+        except Exception as e:
+            print(f"CDP recorder registration failed, falling back to injection: {e}")
+            return False
+        self.registered_windows.setdefault(id(driver), set()).add(driver.current_window_handle)
+        if not self.disable_site_isolation:
+            self.registered_frames.setdefault(id(driver), set())
+        return True
+
+    def _register_frame_targets(self, driver):
+        """
+        With site isolation a cross-site iframe is its own CDP target, which the
+        page's registration does not reach. Attaches to every iframe target not
+        seen yet and, over that target's session, registers the recorder for its
+        later documents and runs it in the current one. ChromeDriver only relays
+        commands to the page, so the session is a non-flat one driven through
+        Target.sendMessageToTarget; it stays attached, as detaching would drop the
+        registration. Replies on such a session never reach us, so a frame's
+        recorder posts its actions to the top document instead of being drained.
+        """
+        registered = self.registered_frames.get(id(driver))
+        if registered is None:
+            return
+        try:
+            targets = driver.execute_cdp_cmd("Target.getTargets", {})["targetInfos"]
+        except Exception as e:
+            print(f"Could not list frame targets: {e}")
+            return
+        script = self.recorder_script()
+        for info in targets:
+            target_id = info.get("targetId")
+            if info.get("type") != "iframe" or target_id in registered:
+                continue
+            registered.add(target_id)
+            try:
+                session_id = driver.execute_cdp_cmd(
+                    "Target.attachToTarget", {"targetId": target_id, "flatten": False}
+                )["sessionId"]
+                for message_id, (method, params) in enumerate((
+                    ("Page.addScriptToEvaluateOnNewDocument", {"source": script}),
+                    ("Runtime.evaluate", {"expression": script}),
+                ), start=1):
+                    driver.execute_cdp_cmd("Target.sendMessageToTarget", {
+                        "sessionId": session_id,
+                        "message": json.dumps({"id": message_id, "method": method, "params": params}),
+                    })
+            except Exception as e:
+                print(f"Could not register the recorder in frame target {target_id}: {e}")
+
+    def _register_new_windows(self, driver):
+        self._register_frame_targets(driver)
+        registered = self.registered_windows.get(id(driver))
+        if registered is None:
+            return
+        new_handles = [h for h in driver.window_handles if h not in registered]
+        if not new_handles:
+            return
+        original_window = driver.current_window_handle
+        for handle in new_handles:
+            driver.switch_to.window(handle)
+            if self._register_recorder(driver):
+                # The window's current document loaded before the registration
+                self._inject_js_current_frame_and_children(driver, [])
+        driver.switch_to.window(original_window)
+
+    def launch_browser(self, url, session_id):
+        """
+        Reserves a session slot (blocking up to the registry's launch_wait, then
+        SessionLimitError) and starts the launch on the session's own thread. Returns
+        the launch Future; the session's status moves from "launching" to "ready".
+        """
+        if self.registry.get(session_id):
+            self.close_session(session_id, reason="relaunched")
+        self.failed_launches.pop(session_id, None)
+        record = self.registry.reserve(session_id)
+        return record.submit(self._launch, record, url)
+
+    def _launch(self, record, url):
+        try:
+            if self.pool:
+                record.driver = self.pool.checkout()
+                # Checkout switched to a window in a fresh browser context, which
+                # needs its own registration
+                self.registered_windows.pop(id(record.driver), None)
+                self.registered_frames.pop(id(record.driver), None)
+                self._register_recorder(record.driver)
+            else:
+                record.driver = self._new_driver()
+            driver = record.driver
+            driver.get(url)
+            # Cross-site iframes of the first page are separate targets by now
+            self._register_frame_targets(driver)
+            if id(driver) not in self.registered_windows:
+                # No CDP registration: inject into the loaded page the old way
+                try:
+                    WebDriverWait(driver, 10).until(
+                        lambda d: d.execute_script("return document.readyState;") == "complete"
+                    )
+                except TimeoutException:
+                    print(f"Page not fully loaded after 10s, injecting recorder anyway: {url}")
+                self._inject_js_all_windows_and_frames(driver)
+        except Exception as e:
+            print(f"[SESSION] Launch of {record.session_id} failed: {e}")
+            self.failed_launches[record.session_id] = str(e)
+            self.close_session(record.session_id, reason="failed to launch")
+            raise
+        record.status = "ready"
+        record.touch()
+        self.start_keepalive_monitor(record.session_id)
+        return record.session_id
+
+    def launch_status(self, session_id):
+        record = self.registry.get(session_id)
+        if record:
+            return {"session_id": session_id, "status": record.status}
+        if session_id in self.failed_launches:
+            return {"session_id": session_id, "status": "failed", "error": self.failed_launches[session_id]}
+        return {"session_id": session_id, "status": "closed"}
+
+    def submit(self, session_id, fn, *args, priority=PRIORITY_USER, **kwargs):
+        """
+        Queues fn on the session's driver thread and returns a Future. User requests
+        run before action collection, which runs before keepalive checks. Without a
+        live session fn runs inline; the session methods then find no driver and
+        return their usual "no session" result.
+        """
+        record = self.registry.get(session_id)
+        if record is None:
+            future = Future()
+            try:
+                future.set_result(fn(*args, **kwargs))
+            except Exception as e:
+                future.set_exception(e)
+            return future
+        return record.submit(fn, *args, priority=priority, **kwargs)
+
+    def run_in_session(self, session_id, fn, *args, timeout=None, priority=PRIORITY_USER, **kwargs):
+        return self.submit(session_id, fn, *args, priority=priority, **kwargs).result(timeout)
+
+    def close_session(self, session_id, reason="closed"):
+        record = self.registry.remove(session_id)
+        self.keepalive.remove(session_id)
+        with self.collectors_lock:
+            collector = self.collectors.pop(session_id, None)
+            log = self.action_logs.pop(session_id, None)
+        if collector:
+            with collector.lock:
+                collector._publish({"actions": [], "cursor": log.cursor if log else 0, "error": f"Session {reason}"})
+                collector.subscribers = []
+        if not record:
+            return False
+        # Runs after every command already queued; the thread exits afterwards
+        record.submit(self._release_driver, record, reason, priority=PRIORITY_SHUTDOWN)
+        record.shutdown()
+        print(f"[SESSION] Session {session_id} {reason}.")
+        return True
+
+    def _release_driver(self, record, reason):
+        driver = record.driver
+        if driver is None:
+            return
+        if self.pool and reason not in ("dead", "failed to launch"):
+            self.pool.checkin(driver)
+            return
+        self.registered_windows.pop(id(driver), None)
+        self.registered_frames.pop(id(driver), None)
+        if self.pool:
+            self.pool.discard(driver)
+        else:
+            try:
+                driver.quit()
+            except Exception:
+                pass
+
+    def cleanup_sessions(self, check_timeout=10):
+        closed = []
+        for session_id in self.registry.session_ids():
+            record = self.registry.get(session_id)
+            if record is None or record.status == "launching":
+                continue
+            try:
+                alive = record.submit(record.is_alive, priority=PRIORITY_KEEPALIVE).result(check_timeout)
+            except FutureTimeoutError:
+                # The driver thread is busy with a long command; check again next sweep
+                continue
+            except Exception:
+                alive = False
+            if not alive:
+                reason = "dead"
+            elif record.idle_seconds() > self.registry.idle_ttl:
+                reason = "idle"
+            else:
+                continue
+            self.close_session(session_id, reason=reason)
+            closed.append({"session_id": session_id, "reason": reason})
+        if len(self.failed_launches) > 100:
+            self.failed_launches.clear()
+        return closed
+
+    def start_reaper(self, interval=60):
+        def reaper_job():
+            while True:
+                time.sleep(interval)
+                try:
+                    self.cleanup_sessions()
+                except Exception as e:
+                    print(f"[SESSION-REAPER] Exception: {e}")
+
+        threading.Thread(target=reaper_job, daemon=True).start()
+
+    def list_sessions(self):
+        sessions = []
+        for session_id in self.registry.session_ids():
+            record = self.registry.get(session_id)
+            if record is None:
+                continue
+            info = record.to_dict()
+            log = self.action_logs.get(session_id)
+            info["actions"] = len(log.actions) if log else 0
+            info["keepalive_running"] = self.keepalive.is_scheduled(session_id)
+            sessions.append(info)
+        return {
+            **self.registry.stats(),
+            "resource_accounting_available": ACCOUNTING_AVAILABLE,
+            "sessions": sessions,
+        }
+
+    def touch(self, session_id):
+        record = self.registry.get(session_id)
+        if record:
+            record.touch()
 
     def inject_recorder(self, session_id):
         driver = self.get_driver(session_id)
         if driver:
+            self.touch(session_id)
             try:
+                self._register_new_windows(driver)
                 self._inject_js_all_windows_and_frames(driver)
                 return True
             except Exception as e:
@@ -297,25 +969,77 @@ class SeleniumSessionManager:
         return False
 
     def get_driver(self, session_id):
-        return self.sessions.get(session_id)
+        record = self.registry.get(session_id)
+        return record.driver if record else None
 
-    def get_actions(self, session_id):
+    def get_action_log(self, session_id):
+        with self.collectors_lock:
+            return self.action_logs.setdefault(session_id, ActionLog())
+
+    def drain_actions(self, session_id):
+        log = self.get_action_log(session_id)
         driver = self.get_driver(session_id)
-        if driver:
+        if not driver:
+            return {"actions": [], "cursor": log.cursor, "error": "No session/driver"}
+        with log.drain_lock:
             try:
-                actions = driver.execute_script("return JSON.parse(localStorage.getItem('robustRecordedActions') || '[]');")
-                return {"actions": actions}
+                if time.time() - log.windows_checked_at > WINDOW_CHECK_INTERVAL:
+                    log.windows_checked_at = time.time()
+                    self._register_new_windows(driver)
+                result = driver.execute_script(DRAIN_ACTIONS_JS) or {}
             except Exception as e:
-                return {"actions": [], "error": str(e)}
-        return {"actions": [], "error": "No session/driver"}
+                return {"actions": [], "cursor": log.cursor, "error": str(e)}
+            if result.get("dropped") or result.get("storageErrors"):
+                log.dropped += result.get("dropped", 0)
+                print(f"[RECORDER] Session {session_id}: {result.get('dropped', 0)} actions dropped, "
+                      f"{result.get('storageErrors', 0)} storage errors before drain.")
+            added = log.extend(result.get("actions", []))
+        if added:
+            # Activity in the browser keeps the session from being reaped as idle
+            self.touch(session_id)
+        return {"actions": added, "cursor": log.cursor}
+
+    def get_actions(self, session_id, since=0):
+        self.touch(session_id)
+        result = self.drain_actions(session_id)
+        log = self.get_action_log(session_id)
+        response = {"actions": log.since(since), "cursor": log.cursor}
+        if result.get("error"):
+            response["error"] = result["error"]
+        return response
+
+    def subscribe_actions(self, session_id, since=0):
+        with self.collectors_lock:
+            collector = self.collectors.get(session_id)
+            if collector is None:
+                collector = ActionCollector(self, session_id)
+                self.collectors[session_id] = collector
+        return collector.subscribe(since)
+
+    def unsubscribe_actions(self, session_id, subscriber):
+        collector = self.collectors.get(session_id)
+        if collector:
+            collector.unsubscribe(subscriber)
 
     def clear_actions(self, session_id):
         driver = self.get_driver(session_id)
         if driver:
-            driver.execute_script("localStorage.setItem('robustRecordedActions', '[]'); window.recordedActions = [];")
+            self.touch(session_id)
+            driver.execute_script("if (window.clearRecordedActions) window.clearRecordedActions();")
+            self.get_action_log(session_id).clear()
             return {"status": "success"}
         return {"status": "failed"}
 
+    def recorder_script(self):
+        config = {
+            "coalesceMs": self.coalesce_window_ms,
+            "chunkSize": self.chunk_size,
+            "maxChunks": self.max_chunks,
+            "maxTargetElementLength": self.max_target_element_length,
+            "keepaliveKeywords": KEEPALIVE_KEYWORDS,
+        }
+        return f"window.__robustRecorderConfig = {json.dumps(config)};\n" + RECORDER_JS
+
     def _inject_js_all_windows_and_frames(self, driver):
         original_window = driver.current_window_handle
         for window_handle in driver.window_handles:
@@ -328,7 +1052,7 @@ class SeleniumSessionManager:
 
     def _inject_js_current_frame_and_children(self, driver, frame_chain):
         try:
-            driver.execute_script(RECORDER_JS)
+            driver.execute_script(self.recorder_script())
         except Exception as e:
             print(f"JS inject error (framechain {frame_chain}): {e}")
         frames = driver.find_elements("tag name", "iframe") + driver.find_elements("tag name", "frame")
@@ -341,112 +1065,4 @@ class SeleniumSessionManager:
                 print(f"Could not inject JS into frame {idx} (framechain {frame_chain}): {e}")
 
     def start_keepalive_monitor(self, session_id):
-        if session_id in self.keepalive_threads:
-            return
-
-        def is_interactable(element):
-            try:
-                return element.is_displayed() and element.is_enabled()
-            except Exception:
-                return False
-
-        def keepalive_job():
-            driver = self.get_driver(session_id)
-            while True:
-                try:
-                    for keyword in ['session', 'keep alive', 'continue', 'still there', 'timeout']:
-                        modals = driver.find_elements(
-                            "xpath",
-                            "//*[contains(translate(text(), 'ABCDEFGHIJKLMNOPQRSTUVWXYZ', 'abcdefghijklmnopqrstuvwxyz'), '{}')]".format(keyword)
-                        )
-                        for modal in modals:
-                            try:
-                                btns = modal.find_elements("xpath", ".//button|.//input[@type='button' or @type='submit']")
-                                for btn in btns:
-                                    if is_interactable(btn):
-                                        btn.click()
-                                        driver.execute_script("""
-                                        window.recordedActions = window.recordedActions || [];
-                                        window.recordedActions.push({
-                                            objectName: "keepalive_button",
-                                            eventType: "keepalive",
-                                            locator: arguments[0].outerHTML,
-                                            locatorType: "auto",
-                                            timestamp: new Date().toISOString(),
-                                            targetElement: arguments[0].outerHTML,
-                                            actualValue: "",
-                                            windowTitle: document.title,
-                                            frameChain: "",
-                                            elementType: "keepalive",
-                                            suggestedName: "keepalive",
-                                            locatorSuggestions: []
-                                        });
-                                        var actions = JSON.parse(localStorage.getItem('robustRecordedActions') || "[]");
-                                        actions.push({
-                                            objectName: "keepalive_button",
-                                            eventType: "keepalive",
-                                            locator: arguments[0].outerHTML,
-                                            locatorType: "auto",
-                                            timestamp: new Date().toISOString(),
-                                            targetElement: arguments[0].outerHTML,
-                                            actualValue: "",
-                                            windowTitle: document.title,
-                                            frameChain: "",
-                                            elementType: "keepalive",
-                                            suggestedName: "keepalive",
-                                            locatorSuggestions: []
-                                        });
-                                        localStorage.setItem('robustRecordedActions', JSON.stringify(actions));
-                                        """, btn)
-                                        print(f"[KEEPALIVE] Clicked keepalive button for session {session_id}.")
-                                        break
-                                else:
-                                    if is_interactable(modal):
-                                        modal.click()
-                                        driver.execute_script("""
-                                        window.recordedActions = window.recordedActions || [];
-                                        window.recordedActions.push({
-                                            objectName: "keepalive_modal",
-                                            eventType: "keepalive",
-                                            locator: arguments[0].outerHTML,
-                                            locatorType: "auto",
-                                            timestamp: new Date().toISOString(),
-                                            targetElement: arguments[0].outerHTML,
-                                            actualValue: "",
-                                            windowTitle: document.title,
-                                            frameChain: "",
-                                            elementType: "keepalive",
-                                            suggestedName: "keepalive",
-                                            locatorSuggestions: []
-                                        });
-                                        var actions = JSON.parse(localStorage.getItem('robustRecordedActions') || "[]");
-                                        actions.push({
-                                            objectName: "keepalive_modal",
-                                            eventType: "keepalive",
-                                            locator: arguments[0].outerHTML,
-                                            locatorType: "auto",
-                                            timestamp: new Date().toISOString(),
-                                            targetElement: arguments[0].outerHTML,
-                                            actualValue: "",
-                                            windowTitle: document.title,
-                                            frameChain: "",
-                                            elementType: "keepalive",
-                                            suggestedName: "keepalive",
-                                            locatorSuggestions: []
-                                        });
-                                        localStorage.setItem('robustRecordedActions', JSON.stringify(actions));
-                                        """, modal)
-                                        print(f"[KEEPALIVE] Clicked keepalive modal for session {session_id}.")
-                            except Exception as e:
-                                if is_interactable(modal):
-                                    print(f"[KEEPALIVE] Error clicking visible keepalive element: {e}")
-                    time.sleep(3)
-                except (WebDriverException, NoSuchElementException):
-                    break
-                except Exception as e:
-                    print(f"[KEEPALIVE-THREAD] Exception: {e}")
-                    time.sleep(3)
-
-        t = threading.Thread(target=keepalive_job, daemon=True)
-        t.start()
-        self.keepalive_threads[session_id] = t
+        self.keepalive.add(session_id)
@@ -0,0 +1,119 @@
+import threading
+import time
+from process_usage import driver_process_usage
+from session_worker import SessionWorker, PRIORITY_USER
+
+
+class SessionLimitError(Exception):
+    pass
+
+
+class SessionRecord:
+    """
+    A browser session and the worker thread that owns its driver. WebDriver is not
+    thread-safe, so every driver call for the session goes through submit().
+    """
+    def __init__(self, session_id, driver=None):
+        self.session_id = session_id
+        self.driver = driver
+        self.status = "launching"
+        self.created_at = time.time()
+        self.last_active = self.created_at
+        self.worker = SessionWorker(name=f"session-{session_id[:8]}")
+
+    def submit(self, fn, *args, priority=PRIORITY_USER, **kwargs):
+        return self.worker.submit(fn, *args, priority=priority, **kwargs)
+
+    def shutdown(self):
+        self.worker.shutdown()
+
+    def touch(self):
+        self.last_active = time.time()
+
+    def idle_seconds(self):
+        return time.time() - self.last_active
+
+    def is_alive(self):
+        if self.driver is None:
+            return False
+        try:
+            self.driver.current_window_handle
+            return True
+        except Exception:
+            return False
+
+    def resource_usage(self):
+        """
+        Memory and CPU of the chromedriver process and every Chrome process it
+        spawned. Returns None values when psutil is not installed
+        (process_usage.ACCOUNTING_AVAILABLE is then False).
+        """
+        usage = driver_process_usage(self.driver)
+        if usage is None:
+            return {"processes": 0, "memory_rss_mb": None, "cpu_seconds": None}
+        return {
+            "processes": usage["processes"],
+            "memory_rss_mb": round(usage["rss"] / (1024 * 1024), 1),
+            "cpu_seconds": round(usage["cpu_seconds"], 2),
+        }
+
+    def to_dict(self):
+        return {
+            "session_id": self.session_id,
+            "status": self.status,
+            "created_at": self.created_at,
+            "last_active": self.last_active,
+            "idle_seconds": round(self.idle_seconds(), 1),
+            "commands": self.worker.stats(),
+            **self.resource_usage(),
+        }
+
+
+class SessionRegistry:
+    """
+    Live browser sessions with a cap on how many may run at once. A launch
+    reserves a slot, waiting up to `launch_wait` seconds for one to free up
+    before giving up with SessionLimitError.
+    """
+    def __init__(self, max_sessions=5, idle_ttl=1800, launch_wait=30):
+        self.max_sessions = max_sessions
+        self.idle_ttl = idle_ttl
+        self.launch_wait = launch_wait
+        self.records = {}
+        self.condition = threading.Condition()
+
+    def reserve(self, session_id):
+        deadline = time.time() + self.launch_wait
+        with self.condition:
+            while len(self.records) >= self.max_sessions:
+                remaining = deadline - time.time()
+                if remaining <= 0:
+                    raise SessionLimitError(
+                        f"All {self.max_sessions} browser sessions are in use, try again later."
+                    )
+                self.condition.wait(remaining)
+            record = SessionRecord(session_id)
+            self.records[session_id] = record
+            return record
+
+    def remove(self, session_id):
+        with self.condition:
+            record = self.records.pop(session_id, None)
+            self.condition.notify()
+            return record
+
+    def get(self, session_id):
+        return self.records.get(session_id)
+
+    def session_ids(self):
+        with self.condition:
+            return list(self.records)
+
+    def stats(self):
+        with self.condition:
+            return {
+                "max_sessions": self.max_sessions,
+                "active": len(self.records),
+                "launching": sum(1 for r in self.records.values() if r.status == "launching"),
+                "idle_ttl": self.idle_ttl,
+            }
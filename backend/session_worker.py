@@ -0,0 +1,83 @@
+import itertools
+import queue
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+
+# Lower runs first; equal priorities run in submission order
+PRIORITY_USER = 0
+PRIORITY_COLLECT = 1
+PRIORITY_KEEPALIVE = 2
+PRIORITY_SHUTDOWN = 3
+
+PRIORITY_NAMES = {
+    PRIORITY_USER: "user",
+    PRIORITY_COLLECT: "collect",
+    PRIORITY_KEEPALIVE: "keepalive",
+    PRIORITY_SHUTDOWN: "shutdown",
+}
+
+
+class SessionWorker:
+    """
+    The one thread allowed to touch a session's driver. Commands wait in a
+    priority queue so user requests overtake background work (action collection,
+    keepalive checks), and the time each command spent queued is kept per
+    priority for stats().
+    """
+    def __init__(self, name, history=200):
+        self.queue = queue.PriorityQueue()
+        self.counter = itertools.count()
+        self.lock = threading.Lock()
+        self.closed = False
+        self.waits = {priority: deque(maxlen=history) for priority in PRIORITY_NAMES}
+        self.counts = {priority: 0 for priority in PRIORITY_NAMES}
+        self.thread = threading.Thread(target=self._run, name=name, daemon=True)
+        self.thread.start()
+
+    def submit(self, fn, *args, priority=PRIORITY_USER, **kwargs):
+        future = Future()
+        with self.lock:
+            if self.closed:
+                future.set_exception(RuntimeError("Session worker is shut down"))
+                return future
+            self.queue.put((priority, next(self.counter), time.perf_counter(), future, fn, args, kwargs))
+        return future
+
+    def shutdown(self):
+        # Commands already queued still run; the stop marker sorts after all of them
+        with self.lock:
+            if self.closed:
+                return
+            self.closed = True
+            self.queue.put((PRIORITY_SHUTDOWN + 1, next(self.counter), time.perf_counter(), None, None, (), {}))
+
+    def stats(self):
+        stats = {"queued": self.queue.qsize()}
+        for priority, name in PRIORITY_NAMES.items():
+            waits = sorted(self.waits[priority])
+            if not waits:
+                stats[name] = {"count": self.counts[priority]}
+                continue
+            stats[name] = {
+                "count": self.counts[priority],
+                "wait_mean_ms": round(sum(waits) / len(waits) * 1000, 1),
+                "wait_p95_ms": round(waits[min(len(waits) - 1, int(len(waits) * 0.95))] * 1000, 1),
+                "wait_max_ms": round(waits[-1] * 1000, 1),
+            }
+        return stats
+
+    def _run(self):
+        while True:
+            priority, _, queued_at, future, fn, args, kwargs = self.queue.get()
+            if fn is None:
+                return
+            if not future.set_running_or_notify_cancel():
+                continue
+            self.waits[priority].append(time.perf_counter() - queued_at)
+            self.counts[priority] += 1
+            try:
+                future.set_result(fn(*args, **kwargs))
+            except BaseException as e:
+                future.set_exception(e)
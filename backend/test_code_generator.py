@@ -0,0 +1,57 @@
+import os
+
+from code_generator import (
+    REPO_DRIVER_FACTORY_PACKAGE, REPO_DRIVER_FACTORY_PATH, SHARED_GLUE_PACKAGE, build_artifacts, feature_base,
+    generate_driver_factory, shared_glue_path, stream_artifacts,
+)
+
+ACTIONS = [
+    {"eventType": "navigate", "locatorType": "url", "locator": "https://example.com"},
+    {"eventType": "click", "locatorType": "id", "locator": "sign-in"},
+]
+SHARED_STEPS = shared_glue_path(SHARED_GLUE_PACKAGE, "GeneratedSteps")
+
+
+def generate(directory, feature_name, **options):
+    artifacts = build_artifacts(ACTIONS, [], [], feature_name, "Sign in", **options)
+    for _ in stream_artifacts(artifacts, str(directory), owner=feature_base(feature_name)):
+        pass
+    return {artifact.name for artifact in artifacts}
+
+
+def existing(directory, names):
+    return {name for name in names if os.path.exists(os.path.join(directory, name))}
+
+
+def test_two_features_in_one_job_both_survive(tmp_path):
+    first = generate(tmp_path, "Login")
+    second = generate(tmp_path, "Checkout")
+    assert existing(tmp_path, first | second) == first | second
+    # Regenerating the first one leaves the second alone
+    generate(tmp_path, "Login")
+    assert existing(tmp_path, second) == second
+
+
+def test_earlier_mode_of_the_same_feature_is_removed(tmp_path):
+    generate(tmp_path, "Login")
+    generate(tmp_path, "Login", glue_mode="shared", execution="parallel")
+    assert not os.path.exists(tmp_path / "login_Steps.java")
+    generate(tmp_path, "Login", glue_mode="shared")
+    assert not os.path.exists(tmp_path / shared_glue_path(SHARED_GLUE_PACKAGE, "DriverFactory"))
+    assert os.path.exists(tmp_path / SHARED_STEPS)
+
+
+def test_shared_glue_stays_while_any_feature_uses_it(tmp_path):
+    generate(tmp_path, "Login", glue_mode="shared")
+    generate(tmp_path, "Checkout", glue_mode="shared")
+    generate(tmp_path, "Login")
+    assert os.path.exists(tmp_path / SHARED_STEPS)
+    generate(tmp_path, "Checkout")
+    assert not os.path.exists(tmp_path / SHARED_STEPS)
+    steps = {"login_Steps.java", "checkout_Steps.java"}
+    assert existing(tmp_path, steps) == steps
+
+
+def test_repo_driver_factory_is_the_generated_one():
+    with open(REPO_DRIVER_FACTORY_PATH, encoding="utf-8") as f:
+        assert f.read() == generate_driver_factory(REPO_DRIVER_FACTORY_PACKAGE, browser_profile=False)
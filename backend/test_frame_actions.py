@@ -0,0 +1,60 @@
+import functools
+import os
+import threading
+import time
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+by = pytest.importorskip("selenium.webdriver.common.by")
+selenium_manager = pytest.importorskip("selenium_manager")
+
+TEST_DATA = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "test_data")
+SESSION_ID = "cross-origin-frame"
+
+
+@pytest.fixture
+def server():
+    handler = functools.partial(SimpleHTTPRequestHandler, directory=TEST_DATA)
+    httpd = ThreadingHTTPServer(("", 0), handler)
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    yield httpd.server_address[1]
+    httpd.shutdown()
+
+
+@pytest.fixture
+def manager():
+    manager = selenium_manager.SeleniumSessionManager()
+    yield manager
+    manager.close_session(SESSION_ID)
+
+
+def recorded_clicks(manager, target, timeout=10):
+    """Clicks recorded so far, polled until one on `target` is among them."""
+    deadline = time.monotonic() + timeout
+    while True:
+        actions = manager.run_in_session(SESSION_ID, manager.get_actions, SESSION_ID)["actions"]
+        clicks = [a for a in actions if a["eventType"] == "click"]
+        if any(target in a["targetElement"] for a in clicks) or time.monotonic() > deadline:
+            return clicks
+        time.sleep(0.2)
+
+
+def test_cross_site_frame_actions_are_drained(server, manager):
+    try:
+        manager.launch_browser(f"http://localhost:{server}/cross_origin_frame.html", SESSION_ID).result(60)
+    except Exception as e:
+        pytest.skip(f"Chrome is not available: {e}")
+
+    def click_through(driver):
+        driver.find_element(by.By.ID, "top-button").click()
+        driver.switch_to.frame(driver.find_element(by.By.ID, "child"))
+        driver.find_element(by.By.ID, "frame-button").click()
+        driver.switch_to.default_content()
+
+    manager.run_in_session(SESSION_ID, lambda: click_through(manager.get_driver(SESSION_ID)))
+    # Not forwarded to the top document, the frame's click would sit in its own origin's localStorage
+    clicks = recorded_clicks(manager, "frame-button")
+    assert len(clicks) == 2
+    assert "top-button" in clicks[0]["targetElement"]
+    assert "frame-button" in clicks[1]["targetElement"]
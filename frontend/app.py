@@ -58,6 +58,12 @@ if "polling_enabled" not in st.session_state:
     st.session_state.polling_enabled = False
 if "stop_requested" not in st.session_state:
     st.session_state.stop_requested = False
+if "action_cursor" not in st.session_state:
+    st.session_state.action_cursor = 0
+if "action_index" not in st.session_state:
+    st.session_state.action_index = {}
+if "generation_job_id" not in st.session_state:
+    st.session_state.generation_job_id = None
 
 API_URL = "http://localhost:8000"
 
@@ -70,10 +76,26 @@ with colA:
 with colB:
     if st.button("Load URL"):
         resp = requests.post(f"{API_URL}/browser/launch", json={"url": url})
-        st.session_state.session_id = resp.json()["session_id"]
-        st.success("URL loaded in browser. Recording actions...")
-        st.session_state.stop_requested = False
-        st.session_state.polling_enabled = True
+        if resp.status_code == 429:
+            st.error(resp.json().get("detail", "All browser sessions are busy, try again later."))
+        else:
+            launch = resp.json()
+            # The backend launches in the background; wait here until the page is up
+            with st.spinner("Launching browser..."):
+                deadline = time.time() + 120
+                while launch.get("status") == "launching" and time.time() < deadline:
+                    time.sleep(0.5)
+                    launch = requests.get(
+                        f"{API_URL}/browser/launch_status", params={"session_id": launch["session_id"]}
+                    ).json()
+            if launch.get("status") == "ready":
+                st.session_state.session_id = launch["session_id"]
+                st.success("URL loaded in browser. Recording actions...")
+                st.session_state.stop_requested = False
+                st.session_state.polling_enabled = True
+                st.session_state.action_cursor = 0
+            else:
+                st.error(f"Browser failed to launch: {launch.get('error', launch.get('status'))}")
 with colC:
     if st.button("Stop"):
         # Just stop polling, retain all actions/objects/data
@@ -82,33 +104,91 @@ with colC:
         st.info("Polling stopped. You can still view and edit recorded data.")
 with colD:
     if st.button("Clear Session"):
-        # Clear all session data
+        # Clear all session data and release the backend browser
+        if st.session_state.session_id:
+            requests.post(f"{API_URL}/browser/close", json={"session_id": st.session_state.session_id})
         st.session_state.actions = []
         st.session_state.object_repo = []
         st.session_state.test_data = []
         st.session_state.session_id = None
         st.session_state.last_action_count = 0
+        st.session_state.action_cursor = 0
+        st.session_state.action_index = {}
         st.session_state.polling_enabled = False
         st.session_state.stop_requested = False
         st.rerun()
 
+def action_key(action):
+    if action.get("seq"):
+        return action["seq"]
+    return (action.get("timestamp"), action.get("eventType"))
+
 def poll_for_actions():
     if not st.session_state.session_id:
         return 0
     resp = requests.get(
         f"{API_URL}/browser/actions",
-        params={"session_id": st.session_state.session_id}
+        params={"session_id": st.session_state.session_id, "since": st.session_state.action_cursor}
     )
-    actions = resp.json().get("actions", [])
+    result = resp.json()
+    st.session_state.action_cursor = result.get("cursor", st.session_state.action_cursor)
+    return ingest_actions(result.get("actions", []))
+
+def stream_for_actions(placeholder):
+    # Blocks on the backend SSE feed until a batch of actions arrives. Heartbeats
+    # touch the placeholder so Streamlit can still interrupt the run (e.g. Stop).
+    if not st.session_state.session_id:
+        return 0
+    with requests.get(
+        f"{API_URL}/browser/actions/stream",
+        params={"session_id": st.session_state.session_id, "since": st.session_state.action_cursor},
+        stream=True, timeout=(5, 30)
+    ) as resp:
+        for line in resp.iter_lines(decode_unicode=True):
+            if not line:
+                continue
+            if line.startswith(":"):
+                placeholder.info("Listening for browser actions...")
+                continue
+            if line.startswith("data:"):
+                batch = json.loads(line[len("data:"):])
+                if batch.get("error"):
+                    placeholder.error(f"Recording stopped: {batch['error']}")
+                    st.session_state.polling_enabled = False
+                    return 0
+                st.session_state.action_cursor = batch.get("cursor", st.session_state.action_cursor)
+                return ingest_actions(batch.get("actions", []))
+    return 0
+
+def ingest_actions(actions):
     new_count = 0
     element_names = get_element_names()
+    action_index = st.session_state.action_index
     for action in actions:
-        already_exists = any(a.get("timestamp") == action.get("timestamp") and a.get("eventType") == action.get("eventType")
-                             for a in st.session_state.actions if "timestamp" in a and "eventType" in a)
-        if already_exists:
+        key = action_key(action)
+        if key in action_index:
             continue
+        replaced = action_index.pop(action.get("replacesSeq"), None)
+        if replaced:
+            # Coalesced typing: update the earlier partial action in place
+            entry = replaced["action"]
+            entry.update({
+                "seq": action.get("seq"),
+                "eventType": action.get("eventType", ""),
+                "actualValue": action.get("actualValue", ""),
+                "timestamp": action.get("timestamp", ""),
+                "targetElement": action.get("targetElement", ""),
+            })
+            if replaced["test_data"] is not None:
+                replaced["test_data"]["actualValue"] = action.get("actualValue", "")
+                replaced["test_data"]["eventType"] = action.get("eventType", "")
+            action_index[key] = replaced
+            new_count += 1
+            continue
+        action_index[key] = {"action": None, "test_data": None}
         if action.get("type") == "pageload":
             st.session_state.actions.append({
+                "seq": action.get("seq"),
                 "objectName": f"pageload_{len(st.session_state.actions)+1}",
                 "eventType": "pageload",
                 "actualValue": action.get("url", ""),
@@ -128,6 +208,7 @@ def poll_for_actions():
             object_name = get_unique_element_name(object_name, element_names)
             element_names.add(object_name)
             st.session_state.actions.append({
+                "seq": action.get("seq"),
                 "objectName": object_name,
                 "eventType": action.get("eventType", ""),
                 "actualValue": action.get("actualValue", ""),
@@ -161,21 +242,25 @@ def poll_for_actions():
                     "expectedValue": "",
                     "eventType": action.get("eventType", ""),
                 })
+                action_index[key]["test_data"] = st.session_state.test_data[-1]
+        action_index[key]["action"] = st.session_state.actions[-1]
         new_count += 1
     return new_count
 
-# ---- Real-time polling loop (runs only if enabled and not stopped) ----
+# ---- Real-time action stream (runs only if enabled and not stopped) ----
 if st.session_state.session_id and st.session_state.polling_enabled and not st.session_state.stop_requested:
     st.info(f"Session ID: {st.session_state.session_id}")
     fetch_placeholder = st.empty()
-    for _ in range(1000):
+    fetch_placeholder.info("Listening for browser actions...")
+    try:
+        new_count = stream_for_actions(fetch_placeholder)
+    except requests.RequestException:
+        # Stream unavailable: fall back to a single incremental poll
         new_count = poll_for_actions()
-        if new_count:
-            fetch_placeholder.success(f"Added {new_count} new actions.")
-        else:
-            fetch_placeholder.info("Listening for browser actions...")
-        time.sleep(0.1)
-        st.rerun()
+        time.sleep(0.5)
+    if new_count:
+        fetch_placeholder.success(f"Added {new_count} new actions.")
+    st.rerun()
 
 st.header("Recorded Actions")
 if st.button("Add Action"):
@@ -344,6 +429,27 @@ st.write("Test Data JSON:", st.session_state.test_data)
 st.header("Auto-generate All Files (Java BDD Framework)")
 feature_name = st.text_input("Feature Name", value="MyFeature", placeholder="e.g. Login Feature")
 scenario_outline = st.text_area("Scenario Outline (optional)", placeholder="Describe the scenario here.")
+shared_glue = st.checkbox(
+    "Use shared step definitions library",
+    help="Generate only this feature's file and runner; all features share one glue package."
+)
+precompiled_data = st.checkbox(
+    "Precompile object repository and test data into Java",
+    disabled=not shared_glue,
+    help="Emits an ObjectRepositoryIndex class so test runs do no JSON parsing."
+)
+parallel_execution = st.checkbox(
+    "Run scenarios in parallel",
+    disabled=not shared_glue,
+    help="One reused browser per worker thread; scenarios run concurrently on all CPU cores."
+)
+browser_profile = st.selectbox(
+    "Browser profile for test runs",
+    ["default", "headless", "ci"],
+    disabled=not shared_glue,
+    help="ci: headless, small window, no images/fonts, third-party trackers blocked. "
+         "Overridable at run time with -Dbdd.browserProfile."
+)
 
 if st.button("Generate Files"):
     payload = {
@@ -351,17 +457,69 @@ if st.button("Generate Files"):
         "object_repo": st.session_state.object_repo,
         "test_data": st.session_state.test_data,
         "feature_name": feature_name,
-        "scenario_outline": scenario_outline
+        "scenario_outline": scenario_outline,
+        "glue_mode": "shared" if shared_glue else "per_feature",
+        "data_mode": "precompiled" if shared_glue and precompiled_data else "json",
+        "execution": "parallel" if shared_glue and parallel_execution else "serial",
+        "browser_profile": browser_profile if shared_glue else "default",
     }
-    resp = requests.post(f"{API_URL}/generate/all", json=payload)
-    if resp.ok:
-        result = resp.json()
-        st.success("Files generated successfully!")
-        st.download_button("Download Feature File", data=result["feature_file"], file_name=f"{feature_name.replace(' ', '_').lower()}.feature")
-        st.download_button("Download Step Definitions (Java)", data=result["step_definitions"], file_name=f"{feature_name.replace(' ', '_').lower()}_Steps.java")
-        st.download_button("Download Cucumber Runner (Java)", data=result["runner"], file_name=f"{feature_name.replace(' ', '_').lower()}_Runner.java")
-        st.download_button("Download Actions JSON", data=json.dumps(result["actions_json"], indent=2), file_name="actions.json")
-        st.download_button("Download Object Repo JSON", data=json.dumps(result["object_repo_json"], indent=2), file_name="object_repo.json")
-        st.download_button("Download Test Data JSON", data=json.dumps(result["test_data_json"], indent=2), file_name="test_data.json")
-    else:
+    # Artifacts arrive as NDJSON chunks; each file's text is kept as sent, ready for download
+    contents = {}
+    statuses = {}
+    kinds = {}
+    progress = st.empty()
+    ok = False
+    # Regenerate into the same backend job so files whose inputs did not change are reused
+    if st.session_state.generation_job_id:
+        payload["job_id"] = st.session_state.generation_job_id
+    resp = requests.post(f"{API_URL}/generate/all", params={"format": "ndjson"}, json=payload, stream=True)
+    if resp.status_code == 404 and "job_id" in payload:
+        # The job was garbage-collected on the backend; start a new one
+        resp.close()
+        payload.pop("job_id")
+        resp = requests.post(f"{API_URL}/generate/all", params={"format": "ndjson"}, json=payload, stream=True)
+    busy = resp.status_code == 409
+    with resp:
+        if busy:
+            st.warning("A generation for this feature is still running, try again in a moment.")
+        elif resp.ok:
+            for line in resp.iter_lines(decode_unicode=True):
+                if not line:
+                    continue
+                event = json.loads(line)
+                if event["event"] == "job":
+                    st.session_state.generation_job_id = event["job_id"]
+                elif event["event"] == "chunk":
+                    contents.setdefault(event["name"], []).append(event["data"])
+                elif event["event"] == "start":
+                    kinds[event["name"]] = event["kind"]
+                    progress.info(f"Generating {event['name']}...")
+                elif event["event"] == "end":
+                    statuses[event["name"]] = event["status"]
+                elif event["event"] == "done":
+                    ok = True
+    progress.empty()
+    if ok:
+        unchanged = [name for name, status in statuses.items() if status == "unchanged"]
+        st.success("Files generated successfully!" + (f" Unchanged: {', '.join(unchanged)}" if unchanged else ""))
+        labels = {
+            "feature_file": "Download Feature File",
+            "step_definitions": "Download Step Definitions (Java)",
+            "runner": "Download Cucumber Runner (Java)",
+            "shared_step_definitions": "Download Shared Step Definitions (Java)",
+            "shared_data_helper": "Download Shared DataHelper (Java)",
+            "object_repository_index": "Download Object Repository Index (Java)",
+            "driver_factory": "Download DriverFactory (Java)",
+            "browser_profile": "Download BrowserProfile (Java)",
+            "junit_platform_properties": "Download junit-platform.properties",
+            "actions_json": "Download Actions JSON",
+            "object_repo_json": "Download Object Repo JSON",
+            "test_data_json": "Download Test Data JSON",
+        }
+        for name, kind in kinds.items():
+            st.download_button(
+                labels.get(kind, f"Download {name}"), data="".join(contents.get(name, [])),
+                file_name=name.rsplit("/", 1)[-1], key=f"download_{name}"
+            )
+    elif not busy:
         st.error("Generation failed!")
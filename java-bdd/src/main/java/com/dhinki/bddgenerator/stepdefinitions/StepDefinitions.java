@@ -1,16 +1,23 @@
 package com.dhinki.bddgenerator.stepdefinitions;
 
+import io.cucumber.java.After;
 import io.cucumber.java.en.When;
+import com.dhinki.bddgenerator.utils.DriverFactory;
 import com.dhinki.bddgenerator.utils.ObjectRepositoryUtil;
 import com.dhinki.bddgenerator.utils.DataUtil;
 import org.openqa.selenium.WebDriver;
 import org.openqa.selenium.WebElement;
 
 public class StepDefinitions {
-    private WebDriver driver; // Should be managed by your test framework
+    @After
+    public void resetBrowser() {
+        // The browser stays open for the next scenario on this thread
+        DriverFactory.reset();
+    }
 
     @When("^I perform the action \"([^\"]*)\" on element \"([^\"]*)\" with value \"([^\"]*)\"$")
     public void performActionWithValue(String action, String element, String value) throws Exception {
+        WebDriver driver = DriverFactory.get();
         WebElement el = ObjectRepositoryUtil.findElement(driver, element);
         switch (action.toLowerCase()) {
             case "entered":
@@ -7,11 +7,14 @@ import java.util.*;
 
 public class DataUtil {
     private static final String DATA_JSON_PATH = "/data.json";
-    private static Map<String, String> dataMap = null;
 
-    private static void loadData() {
-        if (dataMap != null) return;
-        dataMap = new HashMap<>();
+    // Loaded once, on first use, by the JVM's thread-safe class initialization
+    private static final class Data {
+        static final Map<String, String> VALUES = loadData();
+    }
+
+    private static Map<String, String> loadData() {
+        Map<String, String> dataMap = new HashMap<>();
         try (InputStream is = DataUtil.class.getResourceAsStream(DATA_JSON_PATH)) {
             ObjectMapper mapper = new ObjectMapper();
             List<Map<String, Object>> dataList = mapper.readValue(is, List.class);
@@ -25,10 +28,10 @@ public class DataUtil {
         } catch (Exception e) {
             throw new RuntimeException("Failed to read data.json: " + e.getMessage(), e);
         }
+        return Collections.unmodifiableMap(dataMap);
     }
 
     public static String getValue(String key) {
-        loadData();
-        return dataMap.getOrDefault(key, "");
+        return Data.VALUES.getOrDefault(key, "");
     }
 }
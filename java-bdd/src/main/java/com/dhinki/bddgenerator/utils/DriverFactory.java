@@ -0,0 +1,71 @@
+package com.dhinki.bddgenerator.utils;
+
+import org.openqa.selenium.JavascriptExecutor;
+import org.openqa.selenium.WebDriver;
+import org.openqa.selenium.WebDriverException;
+import org.openqa.selenium.chrome.ChromeDriver;
+import java.util.*;
+import java.util.concurrent.ConcurrentLinkedQueue;
+
+// Cucumber runs each scenario on one thread from start to finish, so a browser kept
+// per thread is never shared, and there are never more browsers than threads
+public final class DriverFactory {
+    private static final Queue<WebDriver> DRIVERS = new ConcurrentLinkedQueue<>();
+    private static final ThreadLocal<WebDriver> DRIVER = new ThreadLocal<>();
+    // The window each browser started with; getWindowHandles() has no order to find it by
+    private static final ThreadLocal<String> HOME_WINDOW = new ThreadLocal<>();
+
+    static {
+        Runtime.getRuntime().addShutdownHook(new Thread(() -> {
+            for (WebDriver driver : DRIVERS) {
+                try { driver.quit(); } catch (Exception ignored) { }
+            }
+        }));
+    }
+
+    private DriverFactory() { }
+
+    /** The calling thread's browser, started on first use. */
+    public static WebDriver get() {
+        WebDriver driver = DRIVER.get();
+        if (driver == null) {
+            driver = new ChromeDriver();
+            DRIVERS.add(driver);
+            DRIVER.set(driver);
+            HOME_WINDOW.set(driver.getWindowHandle());
+        }
+        return driver;
+    }
+
+    /** Clears what one scenario left behind; a browser that no longer responds is quit and replaced on next use. */
+    public static void reset() {
+        WebDriver driver = DRIVER.get();
+        if (driver == null) return;
+        try {
+            String home = HOME_WINDOW.get();
+            for (String handle : driver.getWindowHandles()) {
+                if (!handle.equals(home)) {
+                    driver.switchTo().window(handle).close();
+                }
+            }
+            // A scenario that closed the home window leaves no window to reuse: the browser is replaced
+            driver.switchTo().window(home);
+            driver.manage().deleteAllCookies();
+            ((JavascriptExecutor) driver).executeScript(
+                "try { window.localStorage.clear(); window.sessionStorage.clear(); } catch (e) { }");
+            driver.get("about:blank");
+        } catch (WebDriverException e) {
+            discard();
+        }
+    }
+
+    /** Quits the calling thread's browser. */
+    public static void discard() {
+        WebDriver driver = DRIVER.get();
+        DRIVER.remove();
+        HOME_WINDOW.remove();
+        if (driver == null) return;
+        DRIVERS.remove(driver);
+        try { driver.quit(); } catch (Exception ignored) { }
+    }
+}
@@ -7,42 +7,43 @@ import java.util.*;
 
 public class ObjectRepositoryUtil {
     private static final String OBJ_REPO_JSON_PATH = "/object_repository.json";
-    private static Map<String, Map<String, Object>> locatorMap = null;
 
-    private static void loadRepo() {
-        if (locatorMap != null) return;
-        locatorMap = new HashMap<>();
+    // Loaded once, on first use, by the JVM's thread-safe class initialization
+    private static final class Repo {
+        static final Map<String, Map<String, Object>> LOCATORS = loadRepo();
+    }
+
+    private static Map<String, Map<String, Object>> loadRepo() {
+        Map<String, Map<String, Object>> locatorMap = new HashMap<>();
         try (InputStream is = ObjectRepositoryUtil.class.getResourceAsStream(OBJ_REPO_JSON_PATH)) {
             ObjectMapper mapper = new ObjectMapper();
             List<Map<String, Object>> repoList = mapper.readValue(is, List.class);
             for (Map<String, Object> entry : repoList) {
                 String name = (String) entry.get("object name");
                 if (name != null) {
-                    locatorMap.put(name, entry);
+                    locatorMap.put(name, Collections.unmodifiableMap(entry));
                 }
             }
         } catch (Exception e) {
             throw new RuntimeException("Failed to read object_repository.json: " + e.getMessage(), e);
         }
+        return Collections.unmodifiableMap(locatorMap);
     }
 
     public static String getLocator(String elementName) {
-        loadRepo();
-        Map<String, Object> obj = locatorMap.get(elementName);
+        Map<String, Object> obj = Repo.LOCATORS.get(elementName);
         return obj == null ? null : (String) obj.get("locator");
     }
 
     public static int getWindowNumber(String elementName) {
-        loadRepo();
-        Map<String, Object> obj = locatorMap.get(elementName);
+        Map<String, Object> obj = Repo.LOCATORS.get(elementName);
         if (obj == null) return 1;
         Object win = obj.get("window number");
         return win == null ? 1 : (win instanceof Integer ? (Integer)win : Integer.parseInt(win.toString()));
     }
 
     public static String getFrameChain(String elementName) {
-        loadRepo();
-        Map<String, Object> obj = locatorMap.get(elementName);
+        Map<String, Object> obj = Repo.LOCATORS.get(elementName);
         return obj == null ? "" : (String) obj.getOrDefault("framechain", "");
     }
 
@@ -1 +1,14 @@
+package com.dhinki.bddgenerator;
 
+import org.junit.platform.suite.api.ConfigurationParameter;
+import org.junit.platform.suite.api.IncludeEngines;
+import org.junit.platform.suite.api.SelectClasspathResource;
+import org.junit.platform.suite.api.Suite;
+
+// Parallelism comes from the surefire configuration in pom.xml
+@Suite
+@IncludeEngines("cucumber")
+@SelectClasspathResource("features")
+@ConfigurationParameter(key = "cucumber.glue", value = "com.dhinki.bddgenerator.stepdefinitions")
+@ConfigurationParameter(key = "cucumber.plugin", value = "summary, html:target/cucumber-reports.html")
+public class BDDTests {}